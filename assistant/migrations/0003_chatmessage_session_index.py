@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:35
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build indexes without locking writes on large tables
+    atomic = False
+
+    dependencies = [
+        ("assistant", "0002_chatsession_list_index"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="chatmessage",
+            index=models.Index(fields=["session", "created_at"], name="assistant_c_session_1d652c_idx"),
+        ),
+    ]
@@ -19,6 +19,10 @@ class ChatSession(models.Model):
         verbose_name = "チャットセッション"
         verbose_name_plural = "チャットセッション"
         ordering = ["-updated_at"]
+        indexes = [
+            # Keyset pagination of the session list (core.pagination)
+            models.Index(fields=["user", "-updated_at", "-id"]),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.user.username})"
@@ -47,6 +51,10 @@ class ChatMessage(models.Model):
         verbose_name = "チャットメッセージ"
         verbose_name_plural = "チャットメッセージ"
         ordering = ["created_at"]
+        indexes = [
+            # A session's messages in order, without a sort
+            models.Index(fields=["session", "created_at"]),
+        ]
 
     def __str__(self):
         return f"{self.role}: {self.content[:50]}..."
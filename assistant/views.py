@@ -5,22 +5,26 @@ Assistant views for MemoScribe chat.
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db.models import Count
 from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 
 from assistant.models import ChatSession, ChatMessage
+from core.pagination import is_partial, next_page_url, paginate_request
 from retrieval.services import RetrievalService
 from core.llm import llm_provider
 from core.utils import calculate_token_estimate
-from audits.models import AuditLog
+from audits.writer import log_event
 
 
 @login_required
 def session_list(request):
     """List all chat sessions for the current user."""
-    sessions = ChatSession.objects.filter(user=request.user)
-    context = {"sessions": sessions}
-    return render(request, "assistant/list.html", context)
+    sessions = ChatSession.objects.filter(user=request.user).annotate(message_count=Count("messages"))
+    page = paginate_request(request, sessions)
+    context = {"sessions": page, "next_page_url": next_page_url(request, page)}
+    template = "assistant/_items.html" if is_partial(request) else "assistant/list.html"
+    return render(request, template, context)
 
 
 @login_required
@@ -101,16 +105,12 @@ def send_message(request, pk):
 
     # Log LLM call
     if llm_provider.is_available():
-        AuditLog.objects.create(
-            user=request.user,
-            event_type="llm_call",
-            payload={
-                "action": "assistant_response",
-                "session_id": session.pk,
-                "tokens": calculate_token_estimate(user_message + str(context_items)),
-                "context_count": len(context_items),
-            },
-        )
+        log_event(request.user, "llm_call", {
+            "action": "assistant_response",
+            "session_id": session.pk,
+            "tokens": calculate_token_estimate(user_message + str(context_items)),
+            "context_count": len(context_items),
+        })
 
     return redirect("assistant:session", pk=pk)
 
@@ -175,16 +175,12 @@ def generate_writing(request, pk):
 
     # Log LLM call
     if llm_provider.is_available():
-        AuditLog.objects.create(
-            user=request.user,
-            event_type="llm_call",
-            payload={
-                "action": "generate_writing",
-                "template": template_type,
-                "session_id": session.pk,
-                "tokens": calculate_token_estimate(user_input + str(context_items)),
-            },
-        )
+        log_event(request.user, "llm_call", {
+            "action": "generate_writing",
+            "template": template_type,
+            "session_id": session.pk,
+            "tokens": calculate_token_estimate(user_input + str(context_items)),
+        })
 
     return redirect("assistant:session", pk=pk)
 
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from audits.models import AuditLog
+from audits.models import AuditLog, LLMUsageDaily
 
 
 @admin.register(AuditLog)
@@ -14,3 +14,11 @@ class AuditLogAdmin(admin.ModelAdmin):
 
     def has_change_permission(self, request, obj=None):
         return False
+
+
+@admin.register(LLMUsageDaily)
+class LLMUsageDailyAdmin(admin.ModelAdmin):
+    list_display = ["user", "date", "calls", "tokens"]
+    list_filter = ["date"]
+    search_fields = ["user__username"]
+    readonly_fields = ["user", "date", "calls", "tokens", "updated_at"]
@@ -5,3 +5,6 @@ class AuditsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "audits"
     verbose_name = "監査ログ"
+
+    def ready(self):
+        import audits.signals  # noqa
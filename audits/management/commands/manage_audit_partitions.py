@@ -0,0 +1,62 @@
+"""
+Create upcoming audit log partitions and archive expired ones.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from audits import partitions
+
+
+class Command(BaseCommand):
+    help = "Create future monthly audit log partitions and archive partitions past the retention period"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead", type=int, default=settings.AUDIT_PARTITIONS_AHEAD,
+            help="Months after the current one to create partitions for",
+        )
+        parser.add_argument(
+            "--retention-months", type=int, default=settings.AUDIT_RETENTION_MONTHS,
+            help="Full months kept in the table before the current one; 0 keeps everything",
+        )
+        parser.add_argument("--archive-dir", default=settings.AUDIT_ARCHIVE_DIR)
+        parser.add_argument("--create-only", action="store_true", help="Only create partitions")
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be archived")
+
+    def handle(self, *args, **options):
+        if not partitions.is_partitioned():
+            raise CommandError("audits_auditlog is not a partitioned PostgreSQL table (run migrate)")
+
+        today = timezone.localdate()
+        if not options["dry_run"]:
+            for name in partitions.ensure_partitions(options["months_ahead"], today):
+                self.stdout.write(f"Created {name}")
+
+        stray = partitions.default_partition_rows()
+        if stray:
+            self.stderr.write(self.style.WARNING(
+                f"{stray} audit rows are in {partitions.DEFAULT_PARTITION}; create partitions for their months"
+            ))
+
+        if options["create_only"] or options["retention_months"] <= 0:
+            return
+
+        # Finish partitions a previous run detached but did not archive
+        pending = sorted(partitions.detached_partitions())
+        expired = partitions.expired_partitions(options["retention_months"], today)
+        if options["dry_run"]:
+            for name in pending + expired:
+                self.stdout.write(f"Would archive {name}")
+            return
+
+        for name in expired:
+            partitions.detach_partition(name)
+        for name in pending + expired:
+            path, rows = partitions.archive_partition(name, options["archive_dir"])
+            self.stdout.write(f"Archived {rows} rows from {name} to {path}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Audit partitions up to date ({len(pending) + len(expired)} archived)"
+        ))
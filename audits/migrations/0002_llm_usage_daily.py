@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import IntegerField, Sum, Value
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast, Coalesce, TruncDate
+
+
+def backfill_usage(apps, schema_editor):
+    """Roll up existing llm_call events, aggregated in the database per user and local day."""
+    AuditLog = apps.get_model("audits", "AuditLog")
+    LLMUsageDaily = apps.get_model("audits", "LLMUsageDaily")
+    rows = (
+        AuditLog.objects.filter(event_type="llm_call")
+        .annotate(day=TruncDate("created_at"))
+        .values("user_id", "day")
+        .annotate(
+            calls=Sum(Coalesce(Cast(KeyTextTransform("llm_calls", "payload"), IntegerField()), Value(1))),
+            tokens=Coalesce(Sum(Cast(KeyTextTransform("tokens", "payload"), IntegerField())), 0),
+        )
+        .order_by()
+    )
+    LLMUsageDaily.objects.bulk_create(
+        (LLMUsageDaily(user_id=r["user_id"], date=r["day"], calls=r["calls"], tokens=r["tokens"]) for r in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audits", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LLMUsageDaily",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField(verbose_name="日付")),
+                ("calls", models.PositiveIntegerField(default=0, verbose_name="呼び出し回数")),
+                ("tokens", models.PositiveBigIntegerField(default=0, verbose_name="トークン数")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="更新日時")),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="llm_usage_days",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "LLM利用量（日次）",
+                "verbose_name_plural": "LLM利用量（日次）",
+                "ordering": ["-date"],
+                "constraints": [models.UniqueConstraint(fields=("user", "date"), name="unique_llm_usage_per_user_day")],
+            },
+        ),
+        migrations.RunPython(backfill_usage, migrations.RunPython.noop),
+    ]
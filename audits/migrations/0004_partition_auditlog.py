@@ -0,0 +1,124 @@
+"""
+Convert audits_auditlog into a table range-partitioned by month on created_at.
+
+PostgreSQL requires the partition key in every unique constraint, so the
+primary key becomes (id, created_at); Django still treats id as the primary
+key, which stays unique through the shared sequence. Identity columns are not
+supported on partitioned tables before PostgreSQL 17, so id takes its default
+from a plain sequence owned by the column.
+"""
+
+import datetime
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import migrations
+
+TABLE = "audits_auditlog"
+MONTHS_AHEAD = 3
+
+INDEXES = [
+    ("audits_audi_user_id_d11f41_idx", "(user_id, event_type)"),
+    ("audits_audi_created_61fc5f_idx", "(created_at)"),
+]
+
+
+def _bound(year: int, month: int) -> str:
+    year, month = year + (month - 1) // 12, (month - 1) % 12 + 1
+    return datetime.datetime(year, month, 1, tzinfo=ZoneInfo(settings.TIME_ZONE)).isoformat()
+
+
+def _restore_indexes(schema_editor, cursor, table: str):
+    # The foreign key's own index, named as Django names it
+    user_index = schema_editor._create_index_name(TABLE, ["user_id"], suffix="")
+    for name, columns in [*INDEXES, (user_index, "(user_id)")]:
+        cursor.execute(f"CREATE INDEX {name} ON {table} {columns}")
+    cursor.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT audits_auditlog_user_id_fk_auth_user_id "
+        "FOREIGN KEY (user_id) REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED"
+    )
+
+
+def partition_auditlog(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_unpartitioned")
+        cursor.execute(f"""
+            CREATE TABLE {TABLE} (
+                id bigint NOT NULL,
+                event_type varchar(50) NOT NULL,
+                payload jsonb NOT NULL,
+                created_at timestamptz NOT NULL,
+                user_id integer NOT NULL
+            ) PARTITION BY RANGE (created_at)
+        """)
+        cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+
+        # One partition per month from the oldest existing row through MONTHS_AHEAD months ahead
+        tz = ZoneInfo(settings.TIME_ZONE)
+        cursor.execute(f"SELECT min(created_at) FROM {TABLE}_unpartitioned")
+        oldest = cursor.fetchone()[0]
+        today = datetime.datetime.now(tz).date()
+        first = oldest.astimezone(tz).date() if oldest else today
+        start, end = first.year * 12 + first.month - 1, today.year * 12 + today.month - 1 + MONTHS_AHEAD
+        for index in range(start, end + 1):
+            year, month = index // 12, index % 12 + 1
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{year:04d}{month:02d} PARTITION OF {TABLE} "
+                f"FOR VALUES FROM ('{_bound(year, month)}') TO ('{_bound(year, month + 1)}')"
+            )
+
+        cursor.execute(
+            f"INSERT INTO {TABLE} (id, event_type, payload, created_at, user_id) "
+            f"SELECT id, event_type, payload, created_at, user_id FROM {TABLE}_unpartitioned"
+        )
+        cursor.execute(f"DROP TABLE {TABLE}_unpartitioned")
+
+        cursor.execute(f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, created_at)")
+        _restore_indexes(schema_editor, cursor, TABLE)
+        cursor.execute(f"CREATE SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id")
+        cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_seq')")
+        cursor.execute(f"SELECT setval('{TABLE}_id_seq', coalesce(max(id), 0) + 1, false) FROM {TABLE}")
+
+
+def unpartition_auditlog(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_partitioned")
+        # Free the names the plain table needs; secondary indexes go with the DROP below
+        cursor.execute(f"ALTER INDEX {TABLE}_pkey RENAME TO {TABLE}_partitioned_pkey")
+        cursor.execute(f"ALTER TABLE {TABLE}_partitioned ALTER COLUMN id DROP DEFAULT")
+        cursor.execute(f"DROP SEQUENCE {TABLE}_id_seq")
+        cursor.execute(f"""
+            CREATE TABLE {TABLE} (
+                id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+                event_type varchar(50) NOT NULL,
+                payload jsonb NOT NULL,
+                created_at timestamptz NOT NULL,
+                user_id integer NOT NULL
+            )
+        """)
+        cursor.execute(
+            f"INSERT INTO {TABLE} (id, event_type, payload, created_at, user_id) "
+            f"SELECT id, event_type, payload, created_at, user_id FROM {TABLE}_partitioned"
+        )
+        cursor.execute(f"DROP TABLE {TABLE}_partitioned")
+        _restore_indexes(schema_editor, cursor, TABLE)
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), coalesce(max(id), 0) + 1, false) FROM {TABLE}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audits", "0003_audit_created_at_default"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_auditlog, unpartition_auditlog),
+    ]
@@ -0,0 +1,55 @@
+"""
+Give every audit event a unique id, so replayed buffer batches are deduplicated.
+
+Existing rows get random ids. On PostgreSQL the column is added with a
+gen_random_uuid() default (volatile, so each row gets its own value) that is
+dropped afterwards; Django assigns ids in Python from then on.
+"""
+
+import uuid
+
+from django.db import migrations, models
+
+TABLE = "audits_auditlog"
+
+
+def add_event_id(apps, schema_editor):
+    AuditLog = apps.get_model("audits", "AuditLog")
+    if schema_editor.connection.vendor != "postgresql":
+        schema_editor.add_field(AuditLog, AuditLog._meta.get_field("event_id"))
+        for pk in AuditLog.objects.values_list("pk", flat=True):
+            AuditLog.objects.filter(pk=pk).update(event_id=uuid.uuid4())
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {TABLE} ADD COLUMN event_id uuid NOT NULL DEFAULT gen_random_uuid()")
+        cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN event_id DROP DEFAULT")
+
+
+def remove_event_id(apps, schema_editor):
+    AuditLog = apps.get_model("audits", "AuditLog")
+    schema_editor.remove_field(AuditLog, AuditLog._meta.get_field("event_id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audits", "0004_partition_auditlog"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name="auditlog",
+                    name="event_id",
+                    field=models.UUIDField(default=uuid.uuid4, editable=False, verbose_name="イベントID"),
+                ),
+            ],
+        ),
+        migrations.RunPython(add_event_id, remove_event_id),
+        migrations.AddConstraint(
+            model_name="auditlog",
+            constraint=models.UniqueConstraint(fields=["event_id", "created_at"], name="audits_auditlog_event_uniq"),
+        ),
+    ]
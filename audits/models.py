@@ -2,12 +2,19 @@
 Audit log models for MemoScribe.
 """
 
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class AuditLog(models.Model):
-    """Audit log for tracking important events."""
+    """
+    Audit log for tracking important events.
+
+    Stored in monthly range partitions on created_at (see audits.partitions).
+    """
 
     EVENT_TYPES = [
         ("llm_call", "LLM呼び出し"),
@@ -20,7 +27,10 @@ class AuditLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="audit_logs")
     event_type = models.CharField("イベント種類", max_length=50, choices=EVENT_TYPES)
     payload = models.JSONField("ペイロード", default=dict, blank=True)
-    created_at = models.DateTimeField("作成日時", auto_now_add=True)
+    # Set by the writer at event time, not insert time (events are written in batches)
+    created_at = models.DateTimeField("作成日時", default=timezone.now, editable=False)
+    # Assigned when the event is buffered, so a replayed batch is not inserted twice
+    event_id = models.UUIDField("イベントID", default=uuid.uuid4, editable=False)
 
     class Meta:
         verbose_name = "監査ログ"
@@ -30,6 +40,31 @@ class AuditLog(models.Model):
             models.Index(fields=["user", "event_type"]),
             models.Index(fields=["created_at"]),
         ]
+        constraints = [
+            # Unique constraints on the partitioned table must include the partition key
+            models.UniqueConstraint(fields=["event_id", "created_at"], name="audits_auditlog_event_uniq"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.event_type} - {self.created_at}"
+
+
+class LLMUsageDaily(models.Model):
+    """Per-user, per-day LLM usage rolled up from llm_call audit events."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="llm_usage_days")
+    date = models.DateField("日付")
+    calls = models.PositiveIntegerField("呼び出し回数", default=0)
+    tokens = models.PositiveBigIntegerField("トークン数", default=0)
+    updated_at = models.DateTimeField("更新日時", auto_now=True)
+
+    class Meta:
+        verbose_name = "LLM利用量（日次）"
+        verbose_name_plural = "LLM利用量（日次）"
+        ordering = ["-date"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date"], name="unique_llm_usage_per_user_day"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date}: {self.calls} calls, {self.tokens} tokens"
@@ -0,0 +1,172 @@
+"""
+Monthly range partitions of the audit log table (PostgreSQL).
+
+audits_auditlog is partitioned by created_at, one partition per calendar
+month in TIME_ZONE (named audits_auditlog_pYYYYMM) plus a default partition
+catching rows outside every range. Old months are detached, written to a
+gzipped JSON lines file and dropped, which is far cheaper than DELETE and
+leaves nothing for vacuum to clean up. Daily usage totals live in
+LLMUsageDaily and are unaffected by archiving.
+"""
+
+import datetime
+import gzip
+import os
+import re
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import connection, transaction
+
+TABLE = "audits_auditlog"
+DEFAULT_PARTITION = f"{TABLE}_default"
+_PARTITION_RE = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(day: datetime.date) -> datetime.date:
+    return day.replace(day=1)
+
+
+def add_months(month: datetime.date, months: int) -> datetime.date:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def partition_month(name: str) -> datetime.date | None:
+    match = _PARTITION_RE.match(name)
+    return datetime.date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def _bound(month: datetime.date) -> str:
+    """Month start in TIME_ZONE as a timestamptz literal, so partitions follow local months."""
+    start = datetime.datetime(month.year, month.month, 1, tzinfo=ZoneInfo(settings.TIME_ZONE))
+    return start.isoformat()
+
+
+def is_partitioned() -> bool:
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def attached_partitions() -> dict[str, datetime.date]:
+    """Monthly partitions currently attached, mapped to their month."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return {name: month for name in names if (month := partition_month(name))}
+
+
+def detached_partitions() -> dict[str, datetime.date]:
+    """Monthly partition tables left detached (e.g. by an archive run that failed before dropping them)."""
+    attached = attached_partitions()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND relname LIKE %s AND pg_table_is_visible(oid)",
+            [f"{TABLE}\\_p%"],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return {name: month for name in names if name not in attached and (month := partition_month(name))}
+
+
+def create_partition(month: datetime.date) -> bool:
+    """
+    Create the partition for `month`; returns False if it already exists.
+
+    PostgreSQL refuses to create a partition while the default partition holds
+    rows in its range (written while the month had no partition), so those
+    rows are moved: the default partition is detached, the new partition
+    created, the rows re-inserted through the parent and the default
+    partition attached again, all in one transaction.
+    """
+    name = partition_name(month)
+    if name in attached_partitions():
+        return False
+    quote = connection.ops.quote_name
+    start, end = _bound(month), _bound(add_months(month, 1))
+    in_range = f"created_at >= '{start}' AND created_at < '{end}'"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {quote(DEFAULT_PARTITION)} WHERE {in_range})")
+        stray = cursor.fetchone()[0]
+        if stray:
+            cursor.execute(f"ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(DEFAULT_PARTITION)}")
+        cursor.execute(
+            f"CREATE TABLE {quote(name)} PARTITION OF {quote(TABLE)} FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+        if stray:
+            cursor.execute(f"INSERT INTO {quote(TABLE)} SELECT * FROM {quote(DEFAULT_PARTITION)} WHERE {in_range}")
+            cursor.execute(f"DELETE FROM {quote(DEFAULT_PARTITION)} WHERE {in_range}")
+            cursor.execute(f"ALTER TABLE {quote(TABLE)} ATTACH PARTITION {quote(DEFAULT_PARTITION)} DEFAULT")
+    return True
+
+
+def ensure_partitions(months_ahead: int, today: datetime.date | None = None) -> list[str]:
+    """Create partitions from the current month through `months_ahead` months ahead; returns the new ones."""
+    current = month_start(today or datetime.date.today())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if create_partition(month):
+            created.append(partition_name(month))
+    return created
+
+
+def expired_partitions(retention_months: int, today: datetime.date | None = None) -> list[str]:
+    """Attached partitions whose whole month is older than the retention period, oldest first."""
+    cutoff = add_months(month_start(today or datetime.date.today()), -retention_months)
+    partitions = attached_partitions()
+    return sorted((name for name, month in partitions.items() if month < cutoff), key=partitions.get)
+
+
+def detach_partition(name: str):
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {quote(TABLE)} DETACH PARTITION {quote(name)}")
+
+
+def archive_partition(name: str, directory: str) -> tuple[str, int]:
+    """
+    Write a detached partition to <directory>/<name>.jsonl.gz and drop it.
+
+    The file is written under a temporary name and renamed once complete, so a
+    partition is only dropped after its archive is safely on disk.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.jsonl.gz")
+    partial = f"{path}.partial"
+    rows = 0
+    quote = connection.ops.quote_name
+    with transaction.atomic():
+        # Server-side cursor: the partition is streamed, not loaded into memory
+        with connection.chunked_cursor() as cursor, gzip.open(partial, "wt", encoding="utf-8") as out:
+            cursor.execute(f"SELECT row_to_json(t)::text FROM {quote(name)} t ORDER BY id")
+            while batch := cursor.fetchmany(5000):
+                out.writelines(f"{line}\n" for line, in batch)
+                rows += len(batch)
+        os.replace(partial, path)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {quote(name)}")
+    return path, rows
+
+
+def default_partition_rows() -> int:
+    """Rows that fell outside every monthly partition (should stay 0)."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {connection.ops.quote_name(DEFAULT_PARTITION)}")
+        return cursor.fetchone()[0]
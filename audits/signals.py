@@ -0,0 +1,16 @@
+"""
+Signal handlers for audits app.
+"""
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from audits.models import AuditLog
+
+
+@receiver(post_save, sender=AuditLog)
+def audit_log_created(sender, instance, created, **kwargs):
+    """Keep the daily LLM usage rollup current."""
+    if created and instance.event_type == "llm_call":
+        from audits.usage import record_llm_usage
+        record_llm_usage([instance])
@@ -0,0 +1,31 @@
+"""
+Celery tasks for audit logging.
+"""
+
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=5)
+def flush_audit_events(self):
+    """Write buffered audit events with bulk_create."""
+    from audits.writer import flush
+
+    try:
+        written = flush()
+    except Exception as e:
+        logger.error(f"Failed to flush audit events: {e}")
+        raise self.retry(exc=e, countdown=30)
+    if written:
+        logger.info(f"Flushed {written} audit events")
+
+
+@shared_task(ignore_result=True)
+def manage_audit_partitions():
+    """Create upcoming audit log partitions and archive expired ones (scheduled daily by celery beat)."""
+    from django.core.management import call_command
+
+    call_command("manage_audit_partitions")
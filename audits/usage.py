@@ -0,0 +1,110 @@
+"""
+LLM usage rollup maintenance and lookup.
+"""
+
+import datetime
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, IntegerField, Sum, Value
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from audits.models import AuditLog, LLMUsageDaily
+
+ROLLUP_MIGRATION = "0002_llm_usage_daily"
+
+
+def _event_usage(log: AuditLog) -> tuple[int, int]:
+    """(calls, tokens) for one llm_call event; batched events such as document summaries carry llm_calls."""
+    payload = log.payload or {}
+    return int(payload.get("llm_calls", 1) or 0), int(payload.get("tokens", 0) or 0)
+
+
+def record_llm_usage(logs: list[AuditLog]):
+    """Add llm_call events to the daily rollup, one upsert per (user, day)."""
+    totals = defaultdict(lambda: [0, 0])
+    for log in logs:
+        if log.event_type != "llm_call":
+            continue
+        created = log.created_at or timezone.now()
+        calls, tokens = _event_usage(log)
+        key = (log.user_id, timezone.localdate(created))
+        totals[key][0] += calls
+        totals[key][1] += tokens
+
+    from core import dashboard
+
+    for (user_id, day), (calls, tokens) in totals.items():
+        _add_usage(user_id, day, calls, tokens)
+        dashboard.invalidate(user_id, dashboard.USAGE_FRAGMENTS)
+
+
+def _add_usage(user_id: int, day: datetime.date, calls: int, tokens: int):
+    rows = LLMUsageDaily.objects.filter(user_id=user_id, date=day)
+    if rows.update(calls=F("calls") + calls, tokens=F("tokens") + tokens):
+        return
+    try:
+        with transaction.atomic():
+            LLMUsageDaily.objects.create(user_id=user_id, date=day, calls=calls, tokens=tokens)
+    except IntegrityError:
+        # Another process created the row first
+        rows.update(calls=F("calls") + calls, tokens=F("tokens") + tokens)
+
+
+def aggregate_llm_usage(logs) -> dict:
+    """Sum calls and tokens of llm_call audit events in the database (JSON payload aggregate)."""
+    return logs.filter(event_type="llm_call").aggregate(
+        calls=Coalesce(Sum(Coalesce(Cast(KeyTextTransform("llm_calls", "payload"), IntegerField()), Value(1))), 0),
+        tokens=Coalesce(Sum(Cast(KeyTextTransform("tokens", "payload"), IntegerField())), 0),
+    )
+
+
+_rollup_started = None
+
+
+def rollup_start_date() -> datetime.date | None:
+    """Local day the rollup was created (its migration applied); every write path has maintained it since."""
+    global _rollup_started
+    if _rollup_started is None:
+        from django.db.migrations.recorder import MigrationRecorder
+
+        applied = (
+            MigrationRecorder.Migration.objects.filter(app="audits", name=ROLLUP_MIGRATION)
+            .values_list("applied", flat=True)
+            .first()
+        )
+        if applied is not None:
+            _rollup_started = timezone.localdate(applied)
+    return _rollup_started
+
+
+def get_llm_usage(user, day: datetime.date) -> tuple[int, int]:
+    """
+    (calls, tokens) for a user's day.
+
+    Reads the rollup with one unique-index lookup. From the day the rollup was
+    created, a missing row means no calls. Earlier days fall back to
+    aggregating that day's audit partition once; the result is cached.
+    """
+    usage = LLMUsageDaily.objects.filter(user=user, date=day).values_list("calls", "tokens").first()
+    if usage is not None:
+        return usage
+    started = rollup_start_date()
+    if started is not None and day >= started:
+        return 0, 0
+
+    cache_key = f"audits:llm_usage:{user.pk}:{day.isoformat()}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return tuple(cached)
+    # An aware range (not created_at__date) lets PostgreSQL prune to one monthly partition
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    end = timezone.make_aware(datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time.min))
+    totals = aggregate_llm_usage(AuditLog.objects.filter(user=user, created_at__gte=start, created_at__lt=end))
+    usage = totals["calls"], totals["tokens"]
+    cache.set(cache_key, usage, settings.LLM_USAGE_FALLBACK_CACHE_TTL)
+    return usage
@@ -0,0 +1,188 @@
+"""
+Buffered audit log writer.
+
+Hot paths call log_event() instead of AuditLog.objects.create(). In "redis"
+mode (the default) the event is appended to a Redis list and written later
+with bulk_create by the flush_audit_events task, which runs once
+AUDIT_FLUSH_SIZE events are buffered or AUDIT_FLUSH_INTERVAL seconds after
+the first buffered event. "sync" mode writes immediately (used by tests).
+
+Delivery is at-least-once: a flush moves a batch to a processing list
+atomically and removes it only after the database transaction commits, so a
+crashed flush is replayed by the next one. Every event carries an event_id,
+and events already in the table are skipped, so a replay neither duplicates
+rows nor counts LLM usage twice. Events that cannot be written (malformed,
+or whose user was deleted meanwhile) go to the DEAD_LETTER_KEY list instead
+of blocking every later flush. If Redis is unreachable the event is written
+synchronously instead.
+"""
+
+import json
+import logging
+import uuid
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+
+from audits.models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+BUFFER_KEY = "audits:buffer"
+PROCESSING_KEY = "audits:buffer:processing"
+LOCK_KEY = "audits:buffer:lock"
+SCHEDULED_KEY = "audits:buffer:scheduled"
+DEAD_LETTER_KEY = "audits:buffer:dead"
+
+# Move up to ARGV[1] events from the buffer to the processing list in one step
+_CLAIM_SCRIPT = """
+local items = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #items > 0 then
+    redis.call('LTRIM', KEYS[1], #items, -1)
+    redis.call('RPUSH', KEYS[2], unpack(items))
+end
+return #items
+"""
+
+
+def _redis():
+    from documents.status import get_redis
+    return get_redis()
+
+
+def log_event(user, event_type: str, payload: dict | None = None):
+    """Record an audit event (buffered unless AUDIT_SINK is "sync")."""
+    payload = payload or {}
+    if settings.AUDIT_SINK == "sync":
+        AuditLog.objects.create(user=user, event_type=event_type, payload=payload)
+        return
+
+    event = json.dumps({
+        "event_id": str(uuid.uuid4()),
+        "user_id": user.pk,
+        "event_type": event_type,
+        "payload": payload,
+        "created_at": timezone.now().isoformat(),
+    }, ensure_ascii=False)
+    try:
+        length = _redis().rpush(BUFFER_KEY, event)
+    except Exception as e:
+        logger.warning(f"Audit buffer unavailable, writing directly: {e}")
+        AuditLog.objects.create(user=user, event_type=event_type, payload=payload)
+        return
+    _schedule_flush(length)
+
+
+def _schedule_flush(length: int):
+    """Queue a flush on the size threshold, or a delayed one for the first buffered event."""
+    from audits.tasks import flush_audit_events
+
+    try:
+        if length >= settings.AUDIT_FLUSH_SIZE:
+            flush_audit_events.delay()
+        elif _redis().set(SCHEDULED_KEY, 1, nx=True, ex=settings.AUDIT_FLUSH_INTERVAL * 2):
+            flush_audit_events.apply_async(countdown=settings.AUDIT_FLUSH_INTERVAL)
+    except Exception as e:
+        # The event is buffered; the next flush will pick it up
+        logger.warning(f"Failed to schedule audit flush: {e}")
+
+
+def _parse_event(raw: bytes | str, position: int) -> AuditLog:
+    """AuditLog for a buffered event; raises ValueError, KeyError or TypeError if malformed."""
+    from django.utils.dateparse import parse_datetime
+
+    event = json.loads(raw)
+    created_at = parse_datetime(event["created_at"])
+    if created_at is None:
+        raise ValueError(f"invalid created_at {event['created_at']!r}")
+    # Events buffered before event ids existed get one derived from their place
+    # in the processing list, which a replay of the same batch reproduces
+    if event.get("event_id"):
+        event_id = uuid.UUID(event["event_id"])
+    else:
+        event_id = uuid.uuid5(uuid.NAMESPACE_URL, f"audit:{position}:{raw if isinstance(raw, str) else raw.decode()}")
+    return AuditLog(
+        event_id=event_id,
+        user_id=int(event["user_id"]),
+        event_type=event["event_type"],
+        payload=event["payload"],
+        created_at=created_at,
+    )
+
+
+def _insert(logs: list[AuditLog]) -> int:
+    """Insert events not written yet and roll up their LLM usage, in one transaction."""
+    from audits.usage import record_llm_usage
+
+    created = [log.created_at for log in logs]
+    with transaction.atomic():
+        # The created_at bounds let PostgreSQL prune partitions for the lookup
+        existing = set(AuditLog.objects.filter(
+            event_id__in=[log.event_id for log in logs],
+            created_at__gte=min(created),
+            created_at__lte=max(created),
+        ).values_list("event_id", flat=True))
+        new = [log for log in logs if log.event_id not in existing]
+        # A concurrent direct write cannot reuse an id, but never fail on a duplicate
+        AuditLog.objects.bulk_create(new, ignore_conflicts=True)
+        # bulk_create sends no post_save, so maintain the usage rollup here
+        record_llm_usage(new)
+    return len(new)
+
+
+def _write_batch(raw_events: list[bytes]) -> tuple[int, list[bytes]]:
+    """Write a batch; returns the number of events written and the events that cannot be written."""
+    logs, raws, dead = [], [], []
+    for position, raw in enumerate(raw_events):
+        try:
+            logs.append(_parse_event(raw, position))
+            raws.append(raw)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Dead-lettering malformed audit event ({e}): {raw[:200]!r}")
+            dead.append(raw)
+    if not logs:
+        return 0, dead
+
+    try:
+        return _insert(logs), dead
+    except (IntegrityError, DataError) as e:
+        logger.warning(f"Audit batch rejected ({e}), writing events one by one")
+
+    # Isolate the events the database rejects (e.g. the user was deleted)
+    written = 0
+    for log, raw in zip(logs, raws):
+        try:
+            written += _insert([log])
+        except (IntegrityError, DataError) as e:
+            logger.error(f"Dead-lettering audit event {log.event_id} ({e})")
+            dead.append(raw)
+    return written, dead
+
+
+def flush(batch_size: int | None = None) -> int:
+    """Write buffered events to the database; returns the number written."""
+    redis = _redis()
+    batch_size = batch_size or settings.AUDIT_FLUSH_SIZE
+    lock = redis.lock(LOCK_KEY, timeout=300, blocking_timeout=0)
+    if not lock.acquire():
+        return 0  # Another flush is running
+
+    written = 0
+    try:
+        redis.delete(SCHEDULED_KEY)
+        claim = redis.register_script(_CLAIM_SCRIPT)
+        while True:
+            # Replay a batch left by a crashed flush before claiming a new one
+            if not redis.llen(PROCESSING_KEY) and not claim(keys=[BUFFER_KEY, PROCESSING_KEY], args=[batch_size]):
+                break
+            count, dead = _write_batch(redis.lrange(PROCESSING_KEY, 0, -1))
+            written += count
+            pipe = redis.pipeline()
+            if dead:
+                pipe.rpush(DEAD_LETTER_KEY, *dead)
+            pipe.delete(PROCESSING_KEY)
+            pipe.execute()
+    finally:
+        lock.release()
+    return written
@@ -0,0 +1,356 @@
+"""
+End-to-end benchmark for ingest, retrieval and the main views.
+
+Runs against the configured database and Redis (use a disposable database,
+e.g. the docker compose stack) with a local fake LLM server, so results do
+not depend on a real API:
+
+- process_document on synthetic PDFs of varying page counts, with Celery in
+  eager mode so the whole pipeline (including chunk embeddings) is timed
+- RetrievalService.retrieve with 1k / 100k / 1M embeddings for one user
+- the search, dashboard and send_message views through the test client
+
+Each case reports p50/p95 latency, DB query count and peak Python memory.
+Synthetic data belongs to the ``bench`` user and is reused between runs.
+
+Usage:
+    python -m benchmarks.bench_e2e [--embeddings 1000,100000,1000000]
+        [--pdf-pages 1,10,100] [--repeat N] [--output results.json]
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import django
+
+WORDS = (
+    "project schedule meeting review budget report release design customer "
+    "deadline quality search index document summary travel health invoice "
+    "contract roadmap feedback training hiring planning research"
+).split()
+
+QUERIES = ["project schedule", "budget report", "customer feedback", "release planning"]
+
+BENCH_USERNAME = "bench"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(func, repeat: int, setup=None, warmup: int = 1) -> dict:
+    """
+    Time `func` over `repeat` runs.
+
+    `setup`, if given, is called before every run (untimed) and its return value
+    is passed to `func`. Peak memory comes from one extra run under tracemalloc
+    so tracing overhead does not skew the latencies.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def call():
+        return func(setup()) if setup else func()
+
+    for _ in range(warmup):
+        call()
+
+    timings, queries = [], []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            func(arg) if setup else func()
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(ctx.captured_queries))
+
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "runs": repeat,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "mean_ms": round(sum(timings) / len(timings), 2),
+        "queries": int(percentile(queries, 50)),
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def make_pdf(pages: int, lines_per_page: int = 45, seed: int = 0) -> bytes:
+    """Build a minimal text PDF (Helvetica, ASCII sentences) without extra dependencies."""
+    rng = random.Random(seed)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages, filled in once the kids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for _ in range(pages):
+        lines = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12))).capitalize() + "."
+            for _ in range(lines_per_page)
+        ]
+        text = " ".join(f"({line}) Tj T*" for line in lines)
+        stream = f"BT /F1 10 Tf 14 TL 50 780 Td {text} ET".encode("ascii")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def get_bench_user():
+    from django.contrib.auth.models import User
+
+    user, created = User.objects.get_or_create(username=BENCH_USERNAME)
+    if created:
+        user.set_unusable_password()
+        user.save()
+    return user
+
+
+def use_fake_llm(server):
+    """Point the global LLM provider at the fake server."""
+    from core.llm import llm_provider
+
+    llm_provider.enabled = True
+    llm_provider.api_key = "fake"
+    llm_provider.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    llm_provider.embedding_backend_setting = "openai"
+    llm_provider._client = None
+
+
+def ensure_embeddings(user, count: int, batch_size: int = 2000):
+    """
+    Top the user's synthetic embeddings up to `count` rows.
+
+    Synthetic rows use negative content ids so they never collide with real
+    content. Vectors are random unit vectors labelled with the active backend.
+    """
+    import numpy as np
+
+    from core.llm import llm_provider
+    from core.utils import PII_MASKING_VERSION
+    from retrieval.models import Embedding
+
+    backend = llm_provider.embedding_backend
+    existing = Embedding.objects.filter(user=user, content_type="note", content_id__lt=0).count()
+    rng = np.random.default_rng(existing)
+    for start in range(existing, count, batch_size):
+        size = min(batch_size, count - start)
+        vectors = rng.standard_normal((size, 1536)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        rows = []
+        for offset, vector in enumerate(vectors):
+            index = start + offset
+            text = " ".join(WORDS[(index + i) % len(WORDS)] for i in range(12))
+            rows.append(Embedding(
+                user=user,
+                content_type="note",
+                content_id=-(index + 1),
+                content_text=text,
+                content_title=f"Synthetic note {index + 1}",
+                vector=vector,
+                vector_backend=backend,
+                snippet=text,
+                masked_snippet=text,
+                masking_version=PII_MASKING_VERSION,
+            ))
+        Embedding.objects.bulk_create(rows, batch_size=batch_size)
+
+
+def bench_documents(user, page_counts: list[int], repeat: int) -> dict:
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+
+    from documents.models import Document
+    from documents.tasks import process_document
+
+    created = []
+
+    def setup():
+        # bulk_create skips the post_save signal, so the pipeline only runs when timed
+        name = default_storage.save("documents/files/bench.pdf", ContentFile(pdf))
+        doc = Document(user=user, title=f"Benchmark {pages} pages", file=name, file_type="pdf")
+        Document.objects.bulk_create([doc])
+        created.append(doc)
+        return doc.pk
+
+    results = {}
+    try:
+        for pages in page_counts:
+            pdf = make_pdf(pages, seed=pages)
+            stats = measure(process_document, repeat, setup=setup, warmup=0)
+            doc = Document.objects.get(pk=created[-1].pk)
+            stats.update({
+                "pdf_kb": round(len(pdf) / 1024, 1),
+                "status": doc.status,
+                "chunks": doc.chunks.count(),
+                "stage_timings": doc.stage_timings,
+            })
+            results[f"pages_{pages}"] = stats
+    finally:
+        for doc in created:
+            doc.file.delete(save=False)
+            doc.delete()
+    return results
+
+
+def bench_retrieval(user, sizes: list[int], repeat: int) -> dict:
+    from retrieval.services import RetrievalService
+
+    results = {}
+    queries = iter(QUERIES * (repeat + 2))
+    for size in sorted(sizes):
+        started = time.perf_counter()
+        ensure_embeddings(user, size)
+        seed_seconds = time.perf_counter() - started
+        service = RetrievalService(user)
+        stats = measure(lambda: service.retrieve(next(queries)), repeat)
+        stats["seed_seconds"] = round(seed_seconds, 1)
+        results[f"embeddings_{size}"] = stats
+    return results
+
+
+def bench_views(user, repeat: int) -> dict:
+    from django.conf import settings
+    from django.test import Client
+    from django.urls import reverse
+
+    from assistant.models import ChatSession
+
+    if "testserver" not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+    client = Client()
+    client.force_login(user)
+    session = ChatSession.objects.create(user=user, title="Benchmark")
+    send_url = reverse("assistant:send", args=[session.pk])
+
+    def get(url):
+        response = client.get(url)
+        assert response.status_code == 200, f"{url} returned {response.status_code}"
+
+    def send():
+        response = client.post(send_url, {"message": "What is on the project schedule this week?"})
+        assert response.status_code == 302, f"{send_url} returned {response.status_code}"
+
+    try:
+        return {
+            "search_view": measure(lambda: get(reverse("search") + "?q=project"), repeat),
+            "dashboard": measure(lambda: get(reverse("dashboard")), repeat),
+            "send_message": measure(send, repeat),
+        }
+    finally:
+        session.delete()
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(embedding_sizes: list[int], pdf_pages: list[int], repeat: int, doc_repeat: int,
+        chat_latency_ms: float, embedding_latency_ms: float) -> dict:
+    from config.celery import app as celery_app
+    from core.fake_llm import FakeLLMConfig, start_fake_llm_server
+
+    # Run the document pipeline inline so it is timed end to end
+    celery_app.conf.task_always_eager = True
+    celery_app.conf.task_eager_propagates = True
+
+    server = start_fake_llm_server(config=FakeLLMConfig(
+        chat_latency_ms=chat_latency_ms,
+        embedding_latency_ms=embedding_latency_ms,
+        latency_distribution="fixed",
+    ))
+    use_fake_llm(server)
+    user = get_bench_user()
+
+    try:
+        results = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "git_revision": git_revision(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "fake_llm": {"chat_latency_ms": chat_latency_ms, "embedding_latency_ms": embedding_latency_ms},
+            },
+            "process_document": bench_documents(user, pdf_pages, doc_repeat),
+            "retrieve": bench_retrieval(user, embedding_sizes, repeat),
+            "views": bench_views(user, repeat),
+        }
+        results["meta"]["llm_requests"] = server.stats.as_dict()["requests"]
+        return results
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embeddings", type=_int_list, default=[1000, 100000, 1000000])
+    parser.add_argument("--pdf-pages", type=_int_list, default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--doc-repeat", type=int, default=3)
+    parser.add_argument("--chat-latency-ms", type=float, default=200.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=20.0)
+    parser.add_argument("--output", help="Write the JSON results to this file as well")
+    args = parser.parse_args()
+
+    django.setup()
+    results = run(
+        args.embeddings, args.pdf_pages, args.repeat, args.doc_repeat,
+        args.chat_latency_ms, args.embedding_latency_ms,
+    )
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    import os
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    main()
@@ -0,0 +1,90 @@
+r"""
+Benchmark for LLM-free keyword extraction.
+
+Compares extract_keywords with the previous implementation (regex \w{2,}
+split, stopword set rebuilt per call) and shows the keywords each produces
+for a Japanese sample, since the old tokenizer treated whole Japanese
+sentences as single words.
+
+Usage:
+    python -m benchmarks.bench_keywords [--repeat N]
+"""
+
+import argparse
+import json
+import re
+import time
+
+import django
+
+from benchmarks.bench_pii import PLAIN_SAMPLES, build_corpus
+
+
+def legacy_extract_keywords(text: str, max_keywords: int = 5) -> list[str]:
+    """Previous implementation, kept here as the comparison baseline."""
+    if not text:
+        return []
+    from core.utils import STOPWORDS
+
+    stopwords = set(STOPWORDS)
+    words = re.findall(r"\b\w{2,}\b", text.lower())
+    word_counts: dict[str, int] = {}
+    for word in words:
+        if word not in stopwords and not word.isdigit():
+            word_counts[word] = word_counts.get(word, 0) + 1
+    sorted_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
+    return [word for word, _ in sorted_words[:max_keywords]]
+
+
+def time_it(func, texts: list[str], repeat: int) -> float:
+    """Best-of-`repeat` time in milliseconds for processing every text once."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run(repeat: int = 5) -> dict:
+    from core.tokenizers import BigramTokenizer, get_tokenizer
+    from core.utils import extract_keywords
+
+    results = {"tokenizer": get_tokenizer().name}
+    for name, size, count in [("log_1k", 1000, 500), ("document_10k", 10000, 50)]:
+        corpus = build_corpus(size, count, pii_ratio=0.0)
+        legacy_ms = time_it(legacy_extract_keywords, corpus, repeat)
+        bigram = BigramTokenizer()
+        bigram_ms = time_it(lambda t: extract_keywords(t, tokenizer=bigram), corpus, repeat)
+        configured_ms = time_it(extract_keywords, corpus, repeat)
+        results[name] = {
+            "texts": count,
+            "chars": size,
+            "legacy_ms": round(legacy_ms, 2),
+            "bigram_ms": round(bigram_ms, 2),
+            "configured_ms": round(configured_ms, 2),
+        }
+
+    sample = " ".join(PLAIN_SAMPLES[:3])
+    results["sample_keywords"] = {
+        "legacy": legacy_extract_keywords(sample),
+        "current": extract_keywords(sample),
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    django.setup()
+    print(json.dumps(run(args.repeat), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    import os
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark for PII masking.
+
+Compares the single-pass masking engine with the previous implementation
+(seven sequential re.sub passes) on retrieval-sized and document-sized texts.
+"mismatches" counts texts masked differently; the sample corpora have no
+overlapping matches (such as card numbers starting with 0), where the
+single pass deliberately masks the whole number.
+
+Usage:
+    python -m benchmarks.bench_pii [--repeat N]
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+
+import django
+
+SAMPLES = [
+    "連絡先は test@example.com です。",
+    "電話番号は 090-1234-5678 です。",
+    "カード番号 1234-5678-9012-3456 で支払い。",
+    "郵便番号 123-4567 の住所に送付。",
+    "学籍番号 12345678901 を確認。",
+    "Call +81-90-1234-5678 tomorrow.",
+    "今日は会議が3つあった。午後はコードレビューに集中できた。",
+    "The quarterly report is due next Friday, please review section 2.",
+]
+
+# Most retrieved text contains no PII at all
+PLAIN_SAMPLES = [
+    "今日は朝から会議があり、プロジェクトの進捗報告と来週のスケジュール調整をした。",
+    "午後はコードレビューに集中できた。夜は早めに帰宅して本を読んだ。",
+    "品質を優先し、締め切りより質を重視する。チームワークを大切にする。",
+    "We discussed the roadmap and agreed to ship the search improvements first.",
+    "Remember to water the plants and call the dentist about the appointment.",
+]
+
+
+def legacy_mask_pii(text: str) -> str:
+    """Previous implementation, kept here as the comparison baseline."""
+    if not text:
+        return text
+    text = re.sub(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b", "[EMAIL]", text)
+    text = re.sub(r"\b0\d{1,4}[-\s]?\d{1,4}[-\s]?\d{3,4}\b", "[PHONE]", text)
+    text = re.sub(r"\+\d{1,3}[-\s]?\d{1,4}[-\s]?\d{1,4}[-\s]?\d{3,4}", "[PHONE]", text)
+    text = re.sub(r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b", "[CREDIT_CARD]", text)
+    text = re.sub(r"\b\d{3}[-]?\d{4}\b", "[POSTAL]", text)
+    text = re.sub(r"\b\d{8,}\b", "[ID_NUMBER]", text)
+    text = re.sub(r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}\b", "[MY_NUMBER]", text)
+    return text
+
+
+def build_corpus(size: int, count: int, pii_ratio: float = 0.2, seed: int = 0) -> list[str]:
+    """Random texts of `size` characters; about `pii_ratio` of the sentences contain PII."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        parts = []
+        length = 0
+        while length < size:
+            sample = rng.choice(SAMPLES) if rng.random() < pii_ratio else rng.choice(PLAIN_SAMPLES)
+            parts.append(sample)
+            length += len(sample)
+        corpus.append(" ".join(parts)[:size])
+    return corpus
+
+
+def time_it(func, texts: list[str], repeat: int) -> float:
+    """Best-of-`repeat` time in milliseconds for masking every text once."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run(repeat: int = 5) -> dict:
+    from core.utils import mask_pii
+
+    results = {}
+    cases = [
+        ("retrieval_500", 500, 2000, 0.2),
+        ("document_10k", 10000, 200, 0.2),
+        ("pii_dense_500", 500, 2000, 1.0),
+        ("no_pii_500", 500, 2000, 0.0),
+    ]
+    for name, size, count, pii_ratio in cases:
+        corpus = build_corpus(size, count, pii_ratio)
+        legacy_ms = time_it(legacy_mask_pii, corpus, repeat)
+        current_ms = time_it(mask_pii, corpus, repeat)
+        mismatches = sum(legacy_mask_pii(t) != mask_pii(t) for t in corpus)
+        results[name] = {
+            "texts": count,
+            "chars": size,
+            "legacy_ms": round(legacy_ms, 2),
+            "current_ms": round(current_ms, 2),
+            "speedup": round(legacy_ms / current_ms, 2) if current_ms else None,
+            "mismatches": mismatches,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    django.setup()
+    print(json.dumps(run(args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    import os
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    main()
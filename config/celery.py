@@ -15,6 +15,10 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 # Auto-discover tasks in all installed apps
 app.autodiscover_tasks()
 
+# Task metrics and trace propagation (connect Celery signals)
+import core.metrics  # noqa: E402, F401
+import core.tracing  # noqa: E402, F401
+
 
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
@@ -0,0 +1,23 @@
+"""
+Gunicorn configuration for MemoScribe.
+"""
+
+import os
+
+bind = "0.0.0.0:8000"
+
+# Threaded workers: a document status stream (server-sent events) holds one
+# thread for DOCUMENT_STATUS_STREAM_SECONDS rather than a whole sync worker,
+# and long requests do not block the worker heartbeat behind `timeout`
+worker_class = "gthread"
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+timeout = 30
+
+
+def child_exit(server, worker):
+    # Drop the exited worker's live gauges from the multiprocess metrics files
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -6,7 +6,10 @@ Personal Life Secretary - A Django-based personal assistant with RAG
 import os
 from pathlib import Path
 
+from celery.schedules import crontab
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
+from kombu import Queue
 
 load_dotenv()
 
@@ -42,6 +45,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.TracingMiddleware",
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.PerformanceMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -84,6 +90,31 @@ DATABASES = {
     }
 }
 
+# Database connections: pool (psycopg connection pool per process), persistent
+# (one connection per thread kept for DB_CONN_MAX_AGE seconds) or pgbouncer
+# (persistent connections to PgBouncer in transaction pooling mode)
+DB_CONNECTIONS = os.getenv("DB_CONNECTIONS", "pool")
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True  # Reused connections are checked before use
+if DB_CONNECTIONS == "pool":
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+            # One connection per gunicorn thread, so a busy worker never waits on the pool
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", os.getenv("GUNICORN_THREADS", "8"))),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),  # Seconds a request waits for a free connection
+            "max_idle": 300,
+        },
+    }
+elif DB_CONNECTIONS in ("persistent", "pgbouncer"):
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+    if DB_CONNECTIONS == "pgbouncer":
+        # Transaction pooling hands each transaction a different server
+        # connection: no server-side cursors or prepared statements
+        DATABASES["default"]["DISABLE_SERVER_SIDE_CURSORS"] = True
+        DATABASES["default"]["OPTIONS"] = {"prepare_threshold": None}
+else:
+    raise ImproperlyConfigured(f"DB_CONNECTIONS must be pool, persistent or pgbouncer, got {DB_CONNECTIONS!r}")
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -115,14 +146,65 @@ LOGIN_URL = "/login/"
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/"
 
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+
+# Cache (shared by web and Celery workers)
+CACHES = {
+    "default": {
+        "BACKEND": "core.perf.InstrumentedRedisCache",
+        "LOCATION": os.getenv("CACHE_URL", "redis://redis:6379/1"),
+    }
+}
+
 # Celery Configuration
-CELERY_BROKER_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
-CELERY_RESULT_BACKEND = os.getenv("REDIS_URL", "redis://redis:6379/0")
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 
+# Celery queues: one per workload so bulk ingest never delays interactive freshness.
+#   interactive - small per-object embedding updates/deletes triggered by user edits
+#   digest      - daily log digest generation (one LLM call each)
+#   embed       - document chunk embeddings (fan-out from ingest)
+#   ingest      - document extraction/summarization (long running)
+CELERY_TASK_QUEUES = (
+    Queue("interactive"),
+    Queue("digest"),
+    Queue("embed"),
+    Queue("ingest"),
+)
+CELERY_TASK_DEFAULT_QUEUE = "interactive"
+CELERY_TASK_ROUTES = {
+    "documents.tasks.*": {"queue": "ingest"},
+    "retrieval.tasks.update_chunk_embedding": {"queue": "embed", "priority": 6},
+    "retrieval.tasks.refresh_snippets": {"queue": "ingest", "priority": 9},
+    "retrieval.tasks.delete_*": {"queue": "interactive", "priority": 0},
+    "retrieval.tasks.update_*": {"queue": "interactive", "priority": 3},
+    "logs.tasks.generate_digest": {"queue": "digest", "priority": 3},
+    # Archiving a month of audit log can take minutes: keep it off the interactive worker
+    "audits.tasks.manage_audit_partitions": {"queue": "ingest"},
+    "audits.tasks.*": {"queue": "interactive", "priority": 8},
+}
+# Periodic jobs, run by the beat service (docker-compose.yml)
+CELERY_BEAT_SCHEDULE = {
+    "manage-audit-partitions": {
+        "task": "audits.tasks.manage_audit_partitions",
+        "schedule": crontab(hour=3, minute=30),
+    },
+}
+# Redis emulates priorities with one list per step (0 = highest).
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "queue_order_strategy": "priority",
+    "priority_steps": list(range(10)),
+    "sep": ":",
+}
+CELERY_TASK_DEFAULT_PRIORITY = 5
+# Long ingest tasks must not sit prefetched behind a busy worker process.
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+CELERY_TASK_ACKS_LATE = True
+
 # LLM Settings
 LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
 LLM_API_KEY = os.getenv("LLM_API_KEY", "")
@@ -130,6 +212,19 @@ LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.openai.com/v1")
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
 LLM_ENABLED = os.getenv("LLM_ENABLED", "true").lower() in ("true", "1", "yes")
+# Embedding backend: "openai" (API), "local" (offline hashed n-grams, CPU only)
+# or "auto" (API when the LLM is available, local otherwise)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "auto")
+
+# Tokenizer for LLM-free keyword extraction: "bigram" (pure Python), "fugashi"
+# (MeCab, optional dependency) or "auto" (fugashi when installed)
+KEYWORD_TOKENIZER = os.getenv("KEYWORD_TOKENIZER", "auto")
+
+# Long document summarization (map-reduce)
+LLM_SUMMARY_CONCURRENCY = int(os.getenv("LLM_SUMMARY_CONCURRENCY", "4"))
+LLM_SUMMARY_CHUNK_CHARS = 4000  # Characters per map step input
+LLM_SUMMARY_REDUCE_FANIN = 5  # Summaries combined per reduce step
+LLM_SUMMARY_CACHE_TTL = 60 * 60 * 24 * 30  # Partial summaries are kept for 30 days
 
 # Privacy Settings
 SEND_NOTES = os.getenv("SEND_NOTES", "true").lower() in ("true", "1", "yes")
@@ -138,11 +233,76 @@ SEND_DOCS = os.getenv("SEND_DOCS", "false").lower() in ("true", "1", "yes")
 SEND_RAW_LOGS = os.getenv("SEND_RAW_LOGS", "false").lower() in ("true", "1", "yes")
 PII_MASKING = os.getenv("PII_MASKING", "true").lower() in ("true", "1", "yes")
 
+# Rows per page of the keyset-paginated list views (core.pagination)
+LIST_PAGE_SIZE = 50
+
+# Tags shown in the note/task list tag clouds (core.tags)
+TAG_FACET_LIMIT = 30
+
+# Per-user dashboard fragments (core.dashboard), invalidated by model signals
+DASHBOARD_CACHE_TTL = 60 * 60
+
+# Rendered note bodies (notes.rendering), keyed on updated_at so edits need no invalidation
+NOTE_HTML_CACHE_TTL = 60 * 60 * 24 * 7
+
+# Per-user privacy settings and preferences read by retrieval (preferences.snapshot)
+USER_SNAPSHOT_CACHE_TTL = 60 * 60
+
+# Document processing status push
+DOCUMENT_STATUS_CACHE_TTL = 60 * 60 * 24  # Cached status per document
+DOCUMENT_STATUS_STREAM_SECONDS = 25  # SSE connection lifetime before the browser reconnects (below gunicorn's timeout)
+
+# Chunked document upload
+DOCUMENT_UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024  # Max bytes per uploaded part
+DOCUMENT_UPLOAD_MAX_SIZE = int(os.getenv("DOCUMENT_UPLOAD_MAX_SIZE", str(500 * 1024 * 1024)))
+DOCUMENT_UPLOAD_EXPIRY = 60 * 60 * 24  # Seconds an upload session lives after its last part (expire_uploads)
+
 # RAG Settings
 RAG_TOP_K = 8
 RAG_RERANK_N = 5
 EMBEDDING_DIMENSIONS = 1536  # For text-embedding-3-small
 
+# Per-request performance instrumentation (core.middleware.PerformanceMiddleware)
+PERF_SAMPLE_RATE = float(os.getenv("PERF_SAMPLE_RATE", "1.0" if DEBUG else "0.1"))  # Share of requests measured
+# Server-Timing exposes query counts and timings to clients, so it is off unless DEBUG or opted in
+PERF_SERVER_TIMING = os.getenv("PERF_SERVER_TIMING", "true" if DEBUG else "false").lower() in ("true", "1", "yes")
+PERF_QUERY_WARN_THRESHOLD = 50  # Queries per request logged at WARNING
+PERF_SLOW_REQUEST_MS = 1000
+
+# Audit events: "redis" buffers them and writes in batches (audits.writer), "sync" writes each immediately
+AUDIT_SINK = os.getenv("AUDIT_SINK", "redis")
+AUDIT_FLUSH_SIZE = int(os.getenv("AUDIT_FLUSH_SIZE", "500"))  # Buffered events that trigger a flush
+AUDIT_FLUSH_INTERVAL = int(os.getenv("AUDIT_FLUSH_INTERVAL", "10"))  # Max seconds an event waits in the buffer
+# Monthly audit log partitions (manage_audit_partitions): created ahead, archived after the retention period
+AUDIT_PARTITIONS_AHEAD = 3
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "12"))  # 0 keeps everything
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", str(BASE_DIR / "archive" / "audits"))
+
+# Usage of days before the LLM usage rollup existed, aggregated from the audit log (audits.usage)
+LLM_USAGE_FALLBACK_CACHE_TTL = 60 * 60 * 24 * 7
+
+# Prometheus exposition at /metrics; when set, scrapers must send "Authorization: Bearer <token>"
+METRICS_AUTH_TOKEN = os.getenv("METRICS_AUTH_TOKEN", "")
+METRICS_BACKLOG_CACHE_TTL = 30  # Seconds the embedding/document backlog gauges are reused between scrapes
+
+# Tracing: "" (off), "file" (JSON lines at TRACING_FILE) or "otlp" (OTLP/HTTP JSON collector)
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "")
+TRACING_FILE = os.getenv("TRACING_FILE", str(BASE_DIR / "traces.jsonl"))
+TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))  # Share of new traces recorded
+TRACING_SERVICE_NAME = "memoscribe"
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "memoscribe.perf": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
 # WhiteNoise static files
 if not DEBUG:
     STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
@@ -8,7 +8,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.auth import views as auth_views
 
-from core.views import home, dashboard, settings_view, search_view, signup
+from core.views import home, dashboard, settings_view, search_view, signup, metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -21,6 +21,7 @@ urlpatterns = [
     path("dashboard/", dashboard, name="dashboard"),
     path("settings/", settings_view, name="settings"),
     path("search/", search_view, name="search"),
+    path("metrics", metrics_view, name="metrics"),
     # Apps
     path("notes/", include("notes.urls")),
     path("logs/", include("logs.urls")),
@@ -0,0 +1,145 @@
+"""
+Per-user dashboard fragments cached in Django's cache.
+
+Each fragment holds the data behind one dashboard panel and is dropped by the
+post_save/post_delete signals of the models it shows (see invalidate()), so a
+warm dashboard is one cache round trip and no queries. Fragments also expire
+after DASHBOARD_CACHE_TTL as a safety net for writes that bypass signals
+(queryset.update()). Cache errors fall back to the database.
+"""
+
+import datetime
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Fragments each model's changes invalidate
+NOTE_FRAGMENTS = ("notes", "onboarding")
+LOG_FRAGMENTS = ("logs", "onboarding")
+DOCUMENT_FRAGMENTS = ("onboarding",)
+TASK_FRAGMENTS = ("tasks",)
+USAGE_FRAGMENTS = ("usage",)
+
+
+def fragment_key(user_id: int, name: str) -> str:
+    return f"dashboard:{user_id}:{name}"
+
+
+def _upcoming_tasks(user, today):
+    from tasks.models import Task
+
+    # Due by the end of the third day from today, as a bare due_at range (a
+    # due_at__date lookup casts the column and cannot use tasks_task_open_due_idx)
+    end = datetime.datetime.combine(today + datetime.timedelta(days=4), datetime.time.min)
+    return list(
+        Task.objects.filter(
+            user=user,
+            status__in=["todo", "doing"],
+            due_at__lt=timezone.make_aware(end),
+        ).order_by("due_at", "-priority")[:5]
+    )
+
+
+def _recent_notes(user, today):
+    from notes.models import Note
+
+    return list(Note.objects.filter(user=user).order_by("-created_at")[:5])
+
+
+def _recent_logs(user, today):
+    from logs.models import DailyLog
+
+    return list(DailyLog.objects.filter(user=user).order_by("-date")[:5])
+
+
+def _onboarding(user, today):
+    from django.contrib.auth.models import User
+    from django.db.models import Exists, OuterRef
+
+    from documents.models import Document
+    from logs.models import DailyLog
+    from notes.models import Note
+
+    # One query for the three checks
+    return (
+        User.objects.filter(pk=user.pk)
+        .annotate(
+            has_log=Exists(DailyLog.objects.filter(user=OuterRef("pk"))),
+            has_note=Exists(Note.objects.filter(user=OuterRef("pk"))),
+            has_document=Exists(Document.objects.filter(user=OuterRef("pk"))),
+        )
+        .values("has_log", "has_note", "has_document")
+        .get()
+    )
+
+
+def _usage(user, today):
+    from audits.usage import get_llm_usage
+
+    return get_llm_usage(user, today)
+
+
+BUILDERS = {
+    "tasks": _upcoming_tasks,
+    "notes": _recent_notes,
+    "logs": _recent_logs,
+    "onboarding": _onboarding,
+    "usage": _usage,
+}
+
+
+def get_fragments(user) -> dict:
+    """
+    Return every dashboard fragment for `user`, building and caching the missing ones.
+
+    Fragments are stored with the local date they were built for; one built
+    on an earlier day (due dates and usage are relative to today) counts as
+    a miss.
+    """
+    today = timezone.localdate()
+    keys = {name: fragment_key(user.pk, name) for name in BUILDERS}
+    try:
+        cached = cache.get_many(keys.values())
+    except Exception as e:
+        logger.warning(f"Dashboard cache unavailable: {e}")
+        cached = None
+
+    fragments = {}
+    missing = {}
+    for name, key in keys.items():
+        entry = (cached or {}).get(key)
+        if entry is not None and entry[0] == today:
+            fragments[name] = entry[1]
+        else:
+            fragments[name] = BUILDERS[name](user, today)
+            missing[key] = (today, fragments[name])
+
+    if missing and cached is not None:
+        try:
+            cache.set_many(missing, settings.DASHBOARD_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to cache dashboard fragments: {e}")
+    return fragments
+
+
+def invalidate(user_id: int, fragments: tuple[str, ...]):
+    """
+    Drop cached fragments for a user once the current transaction commits.
+
+    Deleting after commit keeps a concurrent dashboard load from caching the
+    pre-commit state again.
+    """
+    keys = [fragment_key(user_id, name) for name in fragments]
+
+    def delete():
+        try:
+            cache.delete_many(keys)
+        except Exception as e:
+            logger.warning(f"Failed to invalidate dashboard cache for user {user_id}: {e}")
+
+    transaction.on_commit(delete)
@@ -0,0 +1,73 @@
+"""
+Local embedding backend for MemoScribe.
+
+Produces fixed-size vectors on CPU with no network access, so retrieval keeps
+working when the LLM is disabled or the deployment is air-gapped.
+"""
+
+import unicodedata
+
+import numpy as np
+
+# Deterministic hashing constants (64-bit multiplicative hashing)
+_PRIMES = np.array([0x9E3779B185EBCA87, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64)
+_MIX = np.uint64(0xFF51AFD7ED558CCD)
+
+
+class LocalEmbedder:
+    """
+    Hashed character n-gram embeddings.
+
+    Character n-grams (default 1-3) of the NFKC-normalized, lowercased text
+    are hashed into ``dimensions`` buckets with a random sign (the hashing
+    trick). Counts are dampened with sublinear TF (1 + log tf), longer n-grams
+    are weighted higher as a stand-in for IDF, and the vector is L2-normalized
+    so L2 distance ranks like cosine similarity. Works for Japanese without a
+    tokenizer because character n-grams need no word boundaries.
+    """
+
+    version = "v1"
+
+    def __init__(self, dimensions: int, ngram_range: tuple[int, int] = (1, 3)):
+        self.dimensions = dimensions
+        self.ngram_range = ngram_range
+
+    @property
+    def name(self) -> str:
+        return f"local:{self.version}"
+
+    def _ngram_hashes(self, codes: np.ndarray, n: int) -> np.ndarray:
+        """Stable 64-bit hash of every character n-gram (vectorized)."""
+        count = len(codes) - n + 1
+        hashes = np.full(count, n, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for i in range(n):
+                hashes = hashes * _PRIMES[i] + codes[i:i + count]
+            hashes ^= hashes >> np.uint64(33)
+            hashes *= _MIX
+            hashes ^= hashes >> np.uint64(33)
+        return hashes
+
+    def embed(self, text: str) -> list[float] | None:
+        """Embed text; returns None for empty input like the API backend."""
+        if not text or not text.strip():
+            return None
+
+        normalized = " ".join(unicodedata.normalize("NFKC", text).lower().split())
+        codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+
+        vector = np.zeros(self.dimensions, dtype=np.float64)
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            if len(codes) < n:
+                break
+            hashes = self._ngram_hashes(codes, n)
+            buckets, counts = np.unique(hashes, return_counts=True)
+            weights = (1.0 + np.log(counts)) * n
+            signs = np.where(buckets >> np.uint64(63), -1.0, 1.0)
+            np.add.at(vector, (buckets % np.uint64(self.dimensions)).astype(np.intp), signs * weights)
+
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return (vector / norm).tolist()
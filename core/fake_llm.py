@@ -0,0 +1,311 @@
+"""
+Local stand-in for an OpenAI-compatible API, for load and latency testing.
+
+Implements /chat/completions (including streaming), /embeddings and /models
+with deterministic outputs, configurable latency distributions, error rates
+and 429 rate limiting. Start it with ``manage.py fake_llm_server`` and point
+LLM_BASE_URL at it.
+"""
+
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from core.embeddings import LocalEmbedder
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+
+@dataclass
+class FakeLLMConfig:
+    """Behaviour of the fake server. Latencies are in milliseconds."""
+
+    chat_latency_ms: float = 500.0
+    embedding_latency_ms: float = 50.0
+    token_latency_ms: float = 20.0  # Delay between streamed chunks
+    latency_distribution: str = "lognormal"
+    latency_spread: float = 0.5  # Relative spread (sigma / mean) for non-fixed distributions
+    error_rate: float = 0.0  # Share of requests answered with HTTP 500
+    rate_limit_rate: float = 0.0  # Share of requests answered with HTTP 429
+    requests_per_minute: int = 0  # Token bucket limit; 0 disables it
+    seed: int = 0
+    embedding_dimensions: int = 1536
+
+
+@dataclass
+class FakeLLMStats:
+    """Request counters, exposed at GET /stats."""
+
+    requests: dict = field(default_factory=dict)
+    errors: int = 0
+    rate_limited: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def count(self, endpoint: str):
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def as_dict(self) -> dict:
+        with self.lock:
+            return {"requests": dict(self.requests), "errors": self.errors, "rate_limited": self.rate_limited}
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the fake API's configuration and state."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], config: FakeLLMConfig):
+        super().__init__(address, FakeLLMHandler)
+        self.config = config
+        self.stats = FakeLLMStats()
+        self.embedder = LocalEmbedder(config.embedding_dimensions)
+        self._random = random.Random(config.seed)
+        self._random_lock = threading.Lock()
+        self._bucket_tokens = float(config.requests_per_minute)
+        self._bucket_updated = time.monotonic()
+        self._bucket_lock = threading.Lock()
+
+    def random(self) -> float:
+        with self._random_lock:
+            return self._random.random()
+
+    def sample_latency(self, mean_ms: float) -> float:
+        """Draw a latency in seconds from the configured distribution."""
+        if mean_ms <= 0:
+            return 0.0
+        spread = max(self.config.latency_spread, 0.0)
+        with self._random_lock:
+            rng = self._random
+            dist = self.config.latency_distribution
+            if dist == "uniform":
+                value = rng.uniform(mean_ms * (1 - spread), mean_ms * (1 + spread))
+            elif dist == "normal":
+                value = rng.gauss(mean_ms, mean_ms * spread)
+            elif dist == "lognormal":
+                # Parameterized so the distribution's mean equals mean_ms
+                sigma = spread
+                value = rng.lognormvariate(0, sigma) * mean_ms / pow(2.718281828459045, sigma * sigma / 2)
+            elif dist == "exponential":
+                value = rng.expovariate(1 / mean_ms)
+            else:
+                value = mean_ms
+        return max(value, 0.0) / 1000
+
+    def take_rate_limit_token(self) -> bool:
+        """Token bucket for requests_per_minute; False means the request must get a 429."""
+        rpm = self.config.requests_per_minute
+        if rpm <= 0:
+            return True
+        with self._bucket_lock:
+            now = time.monotonic()
+            self._bucket_tokens = min(rpm, self._bucket_tokens + (now - self._bucket_updated) * rpm / 60)
+            self._bucket_updated = now
+            if self._bucket_tokens < 1:
+                return False
+            self._bucket_tokens -= 1
+            return True
+
+
+def _estimate_tokens(text: str) -> int:
+    # Same rough estimate as core.utils.calculate_token_estimate
+    return int(len(text) * 0.7)
+
+
+def fake_completion(messages: list[dict]) -> str:
+    """
+    Deterministic completion for a conversation.
+
+    Prompts asking for JSON get an object containing every key MemoScribe's
+    parsers look for; other prompts get a short plain-text summary.
+    """
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system")
+    user = " ".join(m.get("content", "") for m in messages if m.get("role") != "system")
+    digest = hashlib.sha256((system + "\0" + user).encode("utf-8")).hexdigest()[:8]
+    excerpt = " ".join(user.split())[:80]
+
+    if "JSON" in system:
+        return json.dumps(
+            {
+                "summary": f"[fake:{digest}] {excerpt}",
+                "tags": ["fake", digest[:4]],
+                "topics": ["fake"],
+                "actions": [],
+                "answer": f"[fake:{digest}] {excerpt} [1]",
+                "next_questions": [],
+                "citations": [{"ref": 1, "type": "note", "title": "fake", "quote": excerpt[:40]}],
+                "output": f"[fake:{digest}] {excerpt}",
+                "missing_info": [],
+            },
+            ensure_ascii=False,
+        )
+    return f"[fake:{digest}] {excerpt}"
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """Request handler for the OpenAI-compatible endpoints."""
+
+    server: FakeLLMServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _route(self) -> str:
+        path = self.path.split("?", 1)[0].rstrip("/")
+        return path[3:] if path.startswith("/v1") else path
+
+    def _send_json(self, status: int, body: dict, headers: dict | None = None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, message: str, error_type: str, headers: dict | None = None):
+        self._send_json(status, {"error": {"message": message, "type": error_type, "code": None}}, headers)
+
+    def _inject_failure(self) -> bool:
+        """Answer with a 429 or 500 according to the configuration; True if a failure was sent."""
+        server = self.server
+        if not server.take_rate_limit_token() or server.random() < server.config.rate_limit_rate:
+            with server.stats.lock:
+                server.stats.rate_limited += 1
+            self._send_error(429, "Rate limit reached (fake)", "rate_limit_exceeded", {"Retry-After": "1"})
+            return True
+        if server.random() < server.config.error_rate:
+            with server.stats.lock:
+                server.stats.errors += 1
+            self._send_error(500, "Internal error (fake)", "server_error")
+            return True
+        return False
+
+    def do_GET(self):
+        route = self._route()
+        if route == "/models":
+            self._send_json(200, {"object": "list", "data": [{"id": "fake-model", "object": "model", "owned_by": "fake"}]})
+        elif route == "/stats":
+            self._send_json(200, self.server.stats.as_dict())
+        else:
+            self._send_error(404, f"Unknown endpoint {self.path}", "invalid_request_error")
+
+    def do_POST(self):
+        route = self._route()
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_error(400, "Invalid JSON body", "invalid_request_error")
+            return
+
+        if route not in ("/chat/completions", "/embeddings"):
+            self._send_error(404, f"Unknown endpoint {self.path}", "invalid_request_error")
+            return
+
+        self.server.stats.count(route)
+        if self._inject_failure():
+            return
+
+        if route == "/chat/completions":
+            self._chat_completion(body)
+        else:
+            self._embeddings(body)
+
+    def _chat_completion(self, body: dict):
+        config = self.server.config
+        messages = body.get("messages", [])
+        model = body.get("model", "fake-model")
+        content = fake_completion(messages)
+        prompt_tokens = sum(_estimate_tokens(m.get("content", "")) for m in messages)
+        completion_tokens = _estimate_tokens(content)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        time.sleep(self.server.sample_latency(config.chat_latency_ms))
+
+        if not body.get("stream"):
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send_chunk(delta: dict, finish_reason=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        send_chunk({"role": "assistant", "content": ""})
+        for start in range(0, len(content), 8):
+            time.sleep(self.server.sample_latency(config.token_latency_ms))
+            send_chunk({"content": content[start:start + 8]})
+        send_chunk({}, finish_reason="stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _embeddings(self, body: dict):
+        inputs = body.get("input", "")
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        embedder = self.server.embedder
+        dimensions = body.get("dimensions")
+        if dimensions and dimensions != embedder.dimensions:
+            embedder = LocalEmbedder(int(dimensions))
+
+        time.sleep(self.server.sample_latency(self.server.config.embedding_latency_ms))
+
+        data = []
+        for index, text in enumerate(inputs):
+            vector = embedder.embed(str(text)) or [0.0] * embedder.dimensions
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+        tokens = sum(_estimate_tokens(str(text)) for text in inputs)
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "fake-embedding"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+
+def start_fake_llm_server(host: str = "127.0.0.1", port: int = 0, config: FakeLLMConfig | None = None):
+    """Start the server on a background thread (port 0 picks a free port); returns the server."""
+    server = FakeLLMServer((host, port), config or FakeLLMConfig())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
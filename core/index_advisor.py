@@ -0,0 +1,177 @@
+"""
+Missing-index candidates from the captured query workload (pg_stat_statements).
+
+Statements are taken from pg_stat_statements by total execution time and
+read with a deliberately simple heuristic that fits the SQL Django emits
+("table"."column" references): per table, the equality-filtered columns
+followed by the ORDER BY columns (or else the first range-filtered column)
+make the index that would serve the statement. A candidate is reported when
+no existing index starts with those columns, and jsonb containment (@>)
+filters are reported when the column has no GIN index. Candidates are
+hints to check with EXPLAIN, not indexes to create blindly.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from django.db import connection
+
+# "table"."column" followed by a comparison
+_CONDITION_RE = re.compile(
+    r'"(\w+)"\."(\w+)"\s*(=|<=|>=|<|>|@>|IN\b|IS NULL\b)', re.IGNORECASE
+)
+_ORDER_RE = re.compile(r'"(\w+)"\."(\w+)"\s*(ASC|DESC)?', re.IGNORECASE)
+_WHERE_RE = re.compile(r"\bWHERE\b(.*?)(?:\bGROUP BY\b|\bORDER BY\b|\bLIMIT\b|$)", re.IGNORECASE | re.DOTALL)
+_ORDER_BY_RE = re.compile(r"\bORDER BY\b(.*?)(?:\bLIMIT\b|\bOFFSET\b|\bFOR\b|$)", re.IGNORECASE | re.DOTALL)
+
+_EQUALITY = {"=", "IN", "IS NULL"}
+_RANGE = {"<", ">", "<=", ">="}
+
+
+@dataclass
+class Candidate:
+    table: str
+    columns: list[str]
+    equality: int  # Leading columns compared for equality, in any order
+    method: str = "btree"
+    statements: list[dict] = field(default_factory=list)
+
+    @property
+    def total_time(self) -> float:
+        return sum(s["total_time"] for s in self.statements)
+
+    @property
+    def calls(self) -> int:
+        return sum(s["calls"] for s in self.statements)
+
+    def __str__(self):
+        using = "" if self.method == "btree" else f"USING {self.method} "
+        return f"{self.table} {using}({', '.join(self.columns)})"
+
+
+def statement_indexes(sql: str) -> list[tuple[str, list[str], int, str]]:
+    """(table, columns, equality columns, index method) that would serve one statement."""
+    where = _WHERE_RE.search(sql)
+    order_by = _ORDER_BY_RE.search(sql)
+
+    equality: dict[str, list[str]] = {}
+    ranges: dict[str, list[str]] = {}
+    contains: dict[str, list[str]] = {}
+    for table, column, op in _CONDITION_RE.findall(where[1] if where else ""):
+        op = op.upper()
+        target = equality if op in _EQUALITY else ranges if op in _RANGE else contains
+        columns = target.setdefault(table, [])
+        if column not in columns:
+            columns.append(column)
+
+    ordering: dict[str, list[str]] = {}
+    for table, column, _ in _ORDER_RE.findall(order_by[1] if order_by else ""):
+        ordering.setdefault(table, []).append(column)
+
+    indexes = []
+    for table in {*equality, *ranges, *ordering}:
+        leading = equality.get(table, [])
+        trailing = [c for c in ordering.get(table, []) if c not in leading]
+        if not trailing:
+            trailing = [c for c in ranges.get(table, []) if c not in leading][:1]
+        columns = leading + trailing
+        if columns:
+            indexes.append((table, columns, len(leading), "btree"))
+    for table, columns in contains.items():
+        indexes.extend((table, [column], 0, "gin") for column in columns)
+    return indexes
+
+
+def existing_indexes() -> dict[str, list[tuple[list[str], str]]]:
+    """Index columns (None for expressions) and access method per table."""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT t.relname, am.amname, array_agg(a.attname ORDER BY k.ord)
+            FROM pg_index ix
+            JOIN pg_class t ON t.oid = ix.indrelid
+            JOIN pg_class i ON i.oid = ix.indexrelid
+            JOIN pg_am am ON am.oid = i.relam
+            CROSS JOIN LATERAL unnest(ix.indkey) WITH ORDINALITY AS k(attnum, ord)
+            LEFT JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+            WHERE pg_table_is_visible(t.oid)
+            GROUP BY t.relname, am.amname, i.oid
+        """)
+        indexes: dict[str, list[tuple[list[str], str]]] = {}
+        for table, method, columns in cursor.fetchall():
+            indexes.setdefault(table, []).append((columns, method))
+    return indexes
+
+
+def is_covered(columns: list[str], equality: int, method: str, indexes: list[tuple[list[str], str]]) -> bool:
+    """
+    Whether an index already serves `columns`.
+
+    A btree index must lead with the same columns, where the first `equality`
+    columns may come in any order; a gin index only needs the column.
+    """
+    for index_columns, index_method in indexes:
+        if method == "gin":
+            if index_method == "gin" and columns[0] in index_columns:
+                return True
+            continue
+        if index_method != "btree" or len(index_columns) < len(columns):
+            continue
+        head = index_columns[:len(columns)]
+        if set(head[:equality]) == set(columns[:equality]) and head[equality:] == columns[equality:]:
+            return True
+    return False
+
+
+def ensure_extension():
+    """Create pg_stat_statements if needed; raises if the library is not preloaded."""
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_stat_statements")
+        cursor.execute("SELECT 1 FROM pg_stat_statements LIMIT 1")
+
+
+def top_statements(limit: int, min_calls: int) -> list[dict]:
+    """This database's SELECT statements by total execution time."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT query, calls, total_exec_time, mean_exec_time, rows FROM pg_stat_statements "
+            "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database()) "
+            "AND calls >= %s AND query ~* '^\\s*SELECT' "
+            "ORDER BY total_exec_time DESC LIMIT %s",
+            [min_calls, limit],
+        )
+        return [
+            {"query": query, "calls": calls, "total_time": total, "mean_time": mean, "rows": rows}
+            for query, calls, total, mean, rows in cursor.fetchall()
+        ]
+
+
+def missing_index_candidates(limit: int = 50, min_calls: int = 10) -> list[Candidate]:
+    """Uncovered indexes for the top statements, heaviest first."""
+    tables = set(connection.introspection.table_names())
+    indexes = existing_indexes()
+    candidates: dict[tuple, Candidate] = {}
+    for statement in top_statements(limit, min_calls):
+        for table, columns, equality, method in statement_indexes(statement["query"]):
+            if table not in tables or is_covered(columns, equality, method, indexes.get(table, [])):
+                continue
+            key = (table, tuple(columns), method)
+            candidate = candidates.setdefault(key, Candidate(table, columns, equality, method))
+            candidate.statements.append(statement)
+    return sorted(candidates.values(), key=lambda c: c.total_time, reverse=True)
+
+
+def seq_scan_tables(min_rows: int) -> list[tuple]:
+    """(table, seq scans, rows read by them, index scans, live rows) for tables mostly read sequentially."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname, seq_scan, seq_tup_read, coalesce(idx_scan, 0), n_live_tup "
+            "FROM pg_stat_user_tables WHERE seq_scan > coalesce(idx_scan, 0) AND n_live_tup >= %s "
+            "ORDER BY seq_tup_read DESC LIMIT 20",
+            [min_rows],
+        )
+        return cursor.fetchall()
+
+
+def reset_statements():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_stat_statements_reset()")
@@ -3,11 +3,22 @@ LLM provider abstraction for MemoScribe.
 Supports OpenAI-compatible APIs.
 """
 
+import hashlib
 import json
 import logging
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Optional
 
 from django.conf import settings
+from django.core.cache import cache
+
+from core import tracing
+from core.metrics import observe_llm_call
+from core.perf import record_llm_call
 
 logger = logging.getLogger(__name__)
 
@@ -21,7 +32,9 @@ class LLMProvider:
         self.base_url = settings.LLM_BASE_URL
         self.model = settings.LLM_MODEL
         self.embedding_model = settings.EMBEDDING_MODEL
+        self.embedding_backend_setting = settings.EMBEDDING_BACKEND
         self._client = None
+        self._local_embedder = None
 
     @property
     def client(self):
@@ -47,6 +60,7 @@ class LLMProvider:
         messages: list[dict[str, str]],
         temperature: float = 0.7,
         max_tokens: int = 2000,
+        operation: str = "chat_completion",
     ) -> Optional[str]:
         """
         Generate a chat completion.
@@ -55,6 +69,7 @@ class LLMProvider:
             messages: List of message dicts with 'role' and 'content'
             temperature: Sampling temperature
             max_tokens: Maximum tokens in response
+            operation: Label for metrics (the calling feature)
 
         Returns:
             Generated text or None if failed
@@ -63,17 +78,58 @@ class LLMProvider:
             logger.warning("LLM not available, returning None")
             return None
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            logger.error(f"Chat completion failed: {e}")
-            return None
+        started = time.perf_counter()
+        with tracing.span("llm.chat_completion", operation=operation, model=self.model):
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+                self._record_call(operation, started, response.usage)
+                return response.choices[0].message.content
+            except Exception as e:
+                self._record_call(operation, started, error=e)
+                logger.error(f"Chat completion failed: {e}")
+                return None
+
+    def _record_call(self, operation: str, started: float, usage=None, error: Optional[Exception] = None):
+        """Report one API call to the request counters, Prometheus and the current trace span."""
+        duration = time.perf_counter() - started
+        tokens = usage.total_tokens if usage else 0
+        record_llm_call(duration, tokens, error is not None)
+        observe_llm_call(operation, duration, tokens, error is not None)
+        span = tracing.current_span()
+        if span is not None:
+            span.set_attribute("llm.tokens", tokens)
+            if error is not None:
+                span.record_exception(error)
+
+    @property
+    def local_embedder(self):
+        """Lazy load the offline embedding backend."""
+        if self._local_embedder is None:
+            from core.embeddings import LocalEmbedder
+            self._local_embedder = LocalEmbedder(settings.EMBEDDING_DIMENSIONS)
+        return self._local_embedder
+
+    @property
+    def embedding_backend(self) -> str:
+        """
+        Name of the backend generate_embedding currently uses.
+
+        Vectors from different backends live in different spaces, so this name
+        is stored with every embedding and retrieval only compares like with like.
+        """
+        backend = self.embedding_backend_setting
+        if backend == "local" or (backend == "auto" and not self.is_available()):
+            return self.local_embedder.name
+        return f"openai:{self.embedding_model}"
+
+    def embeddings_available(self) -> bool:
+        """Check if generate_embedding can produce vectors (the local backend always can)."""
+        return self.embedding_backend.startswith("local:") or self.is_available()
 
     def generate_embedding(self, text: str) -> Optional[list[float]]:
         """
@@ -85,23 +141,30 @@ class LLMProvider:
         Returns:
             Embedding vector or None if failed
         """
-        if not self.is_available():
-            logger.warning("LLM not available for embedding")
-            return None
-
         if not text or not text.strip():
             return None
 
-        try:
-            response = self.client.embeddings.create(
-                model=self.embedding_model,
-                input=text[:8000],  # Truncate to avoid token limits
-            )
-            return response.data[0].embedding
-        except Exception as e:
-            logger.error(f"Embedding generation failed: {e}")
+        if self.embedding_backend.startswith("local:"):
+            return self.local_embedder.embed(text[:8000])
+
+        if not self.is_available():
+            logger.warning("LLM not available for embedding")
             return None
 
+        started = time.perf_counter()
+        with tracing.span("llm.embedding", model=self.embedding_model):
+            try:
+                response = self.client.embeddings.create(
+                    model=self.embedding_model,
+                    input=text[:8000],  # Truncate to avoid token limits
+                )
+                self._record_call("embedding", started, response.usage)
+                return response.data[0].embedding
+            except Exception as e:
+                self._record_call("embedding", started, error=e)
+                logger.error(f"Embedding generation failed: {e}")
+                return None
+
     def generate_digest(self, text: str) -> dict[str, Any]:
         """
         Generate a digest (summary, tags, topics, actions) from text.
@@ -142,6 +205,7 @@ class LLMProvider:
                 ],
                 temperature=0.3,
                 max_tokens=500,
+                operation="generate_digest",
             )
 
             if response:
@@ -165,6 +229,74 @@ class LLMProvider:
             "actions": [],
         }
 
+    def summarize_long_text(self, text: str) -> dict[str, Any]:
+        """
+        Summarize a long text with map-reduce.
+
+        The text is split into sections that are summarized in parallel (map),
+        then the section summaries are merged in groups, level by level, until a
+        single summary remains (reduce). Every partial summary is cached by the
+        hash of its input, so after a small edit only the changed section and
+        the reduce steps above it call the LLM again.
+
+        Returns:
+            Dict with summary, llm_calls and tokens (estimated, uncached calls only)
+        """
+        from core.utils import simple_summary
+
+        if not self.is_available() or not text or not text.strip():
+            return {"summary": simple_summary(text), "llm_calls": 0, "tokens": 0}
+
+        stats = {"llm_calls": 0, "tokens": 0, "lock": threading.Lock()}
+        sections = split_for_summary(text, settings.LLM_SUMMARY_CHUNK_CHARS)
+        if len(sections) == 1:
+            summary = self._cached_summary(SUMMARY_FINAL_PROMPT, sections[0], stats)
+            return {"summary": summary, "llm_calls": stats["llm_calls"], "tokens": stats["tokens"]}
+
+        with ThreadPoolExecutor(max_workers=max(1, settings.LLM_SUMMARY_CONCURRENCY)) as pool:
+            # propagate() keeps pool threads inside the caller's trace
+            summarize = tracing.propagate(self._cached_summary)
+            summaries = list(pool.map(lambda s: summarize(SUMMARY_MAP_PROMPT, s, stats), sections))
+
+            fan_in = max(2, settings.LLM_SUMMARY_REDUCE_FANIN)
+            while len(summaries) > 1:
+                groups = ["\n\n".join(summaries[i:i + fan_in]) for i in range(0, len(summaries), fan_in)]
+                prompt = SUMMARY_FINAL_PROMPT if len(groups) == 1 else SUMMARY_REDUCE_PROMPT
+                summaries = list(pool.map(lambda g: summarize(prompt, g, stats), groups))
+
+        return {"summary": summaries[0], "llm_calls": stats["llm_calls"], "tokens": stats["tokens"]}
+
+    def _cached_summary(self, system_prompt: str, text: str, stats: dict) -> str:
+        """Summarize one map/reduce input, reusing a cached result when the input is unchanged."""
+        from core.utils import calculate_token_estimate, simple_summary
+
+        digest = hashlib.sha256(f"{self.model}\0{system_prompt}\0{text}".encode("utf-8")).hexdigest()
+        cache_key = f"llm:summary:{digest}"
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        response = self.chat_completion(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": text},
+            ],
+            temperature=0.3,
+            max_tokens=500,
+            operation="summarize_document",
+        )
+        with stats["lock"]:
+            stats["llm_calls"] += 1
+            stats["tokens"] += calculate_token_estimate(text)
+
+        if not response:
+            # Do not cache fallbacks so the next run retries the LLM
+            return simple_summary(text)
+
+        summary = response.strip()
+        cache.set(cache_key, summary, settings.LLM_SUMMARY_CACHE_TTL)
+        return summary
+
     def generate_assistant_response(
         self,
         question: str,
@@ -236,6 +368,7 @@ class LLMProvider:
                 ],
                 temperature=0.5,
                 max_tokens=1500,
+                operation="generate_assistant_response",
             )
 
             if response:
@@ -344,6 +477,7 @@ class LLMProvider:
                 ],
                 temperature=0.6,
                 max_tokens=1500,
+                operation="generate_writing",
             )
 
             if response:
@@ -363,5 +497,50 @@ class LLMProvider:
         }
 
 
+SUMMARY_MAP_PROMPT = """あなたは文書を整理する秘書です。
+以下は長い文書の一部です。この部分の要点を3-5文で要約してください。
+- 事実のみを含め、推測しないこと
+- 固有名詞や数値は残すこと
+- 要約本文のみを返すこと"""
+
+SUMMARY_REDUCE_PROMPT = """あなたは文書を整理する秘書です。
+以下は長い文書の連続する部分の要約です。重複を除いて一つの要約（5文以内）に統合してください。
+- 事実のみを含め、推測しないこと
+- 要約本文のみを返すこと"""
+
+SUMMARY_FINAL_PROMPT = """あなたは文書を整理する秘書です。
+以下の文書（または文書の部分要約）から、文書全体の要約を2-3文で作成してください。
+- 事実のみを含め、推測しないこと
+- 要約本文のみを返すこと"""
+
+
+def split_for_summary(text: str, max_chars: int) -> list[str]:
+    """
+    Split text into sections of at most ~max_chars on paragraph boundaries.
+
+    Section boundaries are content-defined (chosen from a hash of the paragraph
+    text) rather than purely positional, so inserting or deleting text only
+    changes the section it falls in instead of shifting every later section.
+    """
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    sections = []
+    current: list[str] = []
+    size = 0
+    for paragraph in paragraphs:
+        for start in range(0, len(paragraph), max_chars):
+            piece = paragraph[start:start + max_chars]
+            if current and size + len(piece) > max_chars:
+                sections.append("\n\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece)
+            if size >= max_chars // 2 and zlib.crc32(piece.encode("utf-8")) % 4 == 0:
+                sections.append("\n\n".join(current))
+                current, size = [], 0
+    if current:
+        sections.append("\n\n".join(current))
+    return sections
+
+
 # Global instance
 llm_provider = LLMProvider()
@@ -0,0 +1,49 @@
+"""
+Run a local fake OpenAI-compatible API for load and latency testing.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.fake_llm import LATENCY_DISTRIBUTIONS, FakeLLMConfig, FakeLLMServer
+
+
+class Command(BaseCommand):
+    help = "Run a fake OpenAI-compatible server (set LLM_BASE_URL=http://<host>:<port>/v1)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8001)
+        parser.add_argument("--chat-latency-ms", type=float, default=500.0, help="Mean chat completion latency")
+        parser.add_argument("--embedding-latency-ms", type=float, default=50.0, help="Mean embedding latency")
+        parser.add_argument("--token-latency-ms", type=float, default=20.0, help="Mean delay between streamed chunks")
+        parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+        parser.add_argument("--latency-spread", type=float, default=0.5, help="Relative spread (sigma / mean)")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 500")
+        parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests failing with 429")
+        parser.add_argument("--rpm", type=int, default=0, help="Requests per minute before 429s (0 = unlimited)")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for latency and failure sampling")
+        parser.add_argument("--embedding-dimensions", type=int, default=1536)
+
+    def handle(self, *args, **options):
+        config = FakeLLMConfig(
+            chat_latency_ms=options["chat_latency_ms"],
+            embedding_latency_ms=options["embedding_latency_ms"],
+            token_latency_ms=options["token_latency_ms"],
+            latency_distribution=options["latency_distribution"],
+            latency_spread=options["latency_spread"],
+            error_rate=options["error_rate"],
+            rate_limit_rate=options["rate_limit_rate"],
+            requests_per_minute=options["rpm"],
+            seed=options["seed"],
+            embedding_dimensions=options["embedding_dimensions"],
+        )
+        server = FakeLLMServer((options["host"], options["port"]), config)
+        host, port = server.server_address[:2]
+        self.stdout.write(self.style.SUCCESS(f"Fake LLM server listening on http://{host}:{port}/v1"))
+        self.stdout.write(f"Set LLM_BASE_URL=http://{host}:{port}/v1 and any non-empty LLM_API_KEY. Stats: /v1/stats")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping")
+        finally:
+            server.server_close()
@@ -0,0 +1,52 @@
+"""
+Report missing-index candidates from pg_stat_statements.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+
+from core import index_advisor
+
+
+class Command(BaseCommand):
+    help = "Report indexes the captured query workload (pg_stat_statements) is missing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=50, help="Statements to examine, by total time")
+        parser.add_argument("--min-calls", type=int, default=10, help="Ignore statements called fewer times")
+        parser.add_argument(
+            "--min-rows", type=int, default=10000,
+            help="Only report sequentially scanned tables with at least this many rows",
+        )
+        parser.add_argument("--reset", action="store_true", help="Reset the statistics after reporting")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("pg_stat_statements needs PostgreSQL")
+        try:
+            index_advisor.ensure_extension()
+        except DatabaseError as e:
+            raise CommandError(
+                f"pg_stat_statements is unavailable ({e}); start PostgreSQL with "
+                "shared_preload_libraries=pg_stat_statements (see docker-compose.yml)"
+            ) from e
+
+        candidates = index_advisor.missing_index_candidates(options["limit"], options["min_calls"])
+        for candidate in candidates:
+            self.stdout.write(self.style.WARNING(
+                f"{candidate}: {candidate.calls} calls, {candidate.total_time:.0f} ms total"
+            ))
+            for statement in candidate.statements[:3]:
+                self.stdout.write(f"  {statement['mean_time']:.2f} ms  {' '.join(statement['query'].split())[:200]}")
+
+        for table, seq_scans, seq_rows, idx_scans, live_rows in index_advisor.seq_scan_tables(options["min_rows"]):
+            self.stdout.write(
+                f"{table}: {seq_scans} sequential scans ({seq_rows} rows read) vs {idx_scans} index scans, "
+                f"{live_rows} rows"
+            )
+
+        if options["reset"]:
+            index_advisor.reset_statements()
+            self.stdout.write("Statement statistics reset")
+
+        self.stdout.write(self.style.SUCCESS(f"{len(candidates)} missing-index candidates"))
@@ -0,0 +1,19 @@
+"""
+Recount note and task tags after writes that bypass signals.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.tags import TAGGED_TABLES, rebuild_tag_counts
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user tag counts behind the note/task tag clouds"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--type", choices=list(TAGGED_TABLES), help="Only this content type")
+        parser.add_argument("--user-id", type=int, help="Only this user")
+
+    def handle(self, *args, **options):
+        rebuild_tag_counts(options["type"], user_id=options["user_id"])
+        self.stdout.write(self.style.SUCCESS("Tag counts rebuilt"))
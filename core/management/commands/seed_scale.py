@@ -0,0 +1,294 @@
+"""
+Generate large synthetic datasets for index and query testing.
+"""
+
+import datetime
+import random
+import time
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from core.tags import rebuild_tag_counts
+from core.utils import PII_MASKING_VERSION, build_snippets
+
+SENTENCES = [
+    "今日は朝から会議があり、プロジェクトの進捗報告と来週のスケジュール調整をした。",
+    "午後はコードレビューに集中できた。夜は早めに帰宅して本を読んだ。",
+    "品質を優先し、締め切りより質を重視する。チームワークを大切にする。",
+    "健康のために30分散歩した。明日はコーディングに着手する予定。",
+    "新機能の設計書を完成させた。次はテスト計画を作成する。",
+    "顧客からのフィードバックをまとめ、改善案を検討した。",
+    "予算の見直しについて経理と打ち合わせをした。",
+    "We discussed the roadmap and agreed to ship the search improvements first.",
+    "Remember to water the plants and call the dentist about the appointment.",
+    "The quarterly report is due next Friday, please review section 2.",
+]
+
+TAGS = ["仕事", "計画", "読書", "健康", "開発", "アイデア", "個人", "定期", "家族", "学習"]
+
+
+class Command(BaseCommand):
+    help = "Generate N synthetic users with large volumes of content for index and query testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10)
+        parser.add_argument("--notes", type=int, default=1000, help="Notes per user")
+        parser.add_argument("--logs", type=int, default=365, help="Daily logs (each with a digest) per user")
+        parser.add_argument("--documents", type=int, default=20, help="Documents per user")
+        parser.add_argument("--chunks", type=int, default=50, help="Chunks per document")
+        parser.add_argument("--tasks", type=int, default=200, help="Tasks per user")
+        parser.add_argument(
+            "--embeddings", choices=["none", "random", "local"], default="random",
+            help="random: unit vectors labelled with the active backend; local: LocalEmbedder vectors",
+        )
+        parser.add_argument("--spread-days", type=int, default=365, help="Spread created_at over this many days")
+        parser.add_argument("--prefix", default="scale", help="Username prefix")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--no-copy", action="store_true", help="Use bulk_create instead of COPY for embeddings")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["embeddings"] != "none" and connection.vendor != "postgresql":
+            raise CommandError("Embeddings require PostgreSQL with pgvector")
+
+        self.options = options
+        self.batch_size = options["batch_size"]
+        self.rng = random.Random(options["seed"])
+        self.np_rng = np.random.default_rng(options["seed"])
+        self.now = timezone.now()
+        self.embedder = None
+        if options["embeddings"] == "local":
+            from core.embeddings import LocalEmbedder
+            self.embedder = LocalEmbedder(1536)
+            self.vector_backend = self.embedder.name
+        else:
+            from core.llm import llm_provider
+            self.vector_backend = llm_provider.embedding_backend
+
+        started = time.monotonic()
+        users = self._create_users()
+        totals = {}
+        for index, user in enumerate(users, start=1):
+            with transaction.atomic():
+                for name, count in self._seed_user(user).items():
+                    totals[name] = totals.get(name, 0) + count
+            self.stdout.write(f"[{index}/{len(users)}] {user.username}")
+
+        elapsed = time.monotonic() - started
+        summary = ", ".join(f"{count} {name}" for name, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary} in {elapsed:.1f}s"))
+
+    def _text(self, sentences: int) -> str:
+        return "".join(self.rng.choice(SENTENCES) for _ in range(sentences))
+
+    def _tags(self) -> list[str]:
+        return self.rng.sample(TAGS, self.rng.randint(0, 3))
+
+    def _created_at(self) -> datetime.datetime:
+        return self.now - datetime.timedelta(seconds=self.rng.uniform(0, self.options["spread_days"] * 86400))
+
+    def _create_users(self) -> list[User]:
+        prefix = self.options["prefix"]
+        usernames = [f"{prefix}{i:05d}" for i in range(self.options["users"])]
+        existing = set(User.objects.filter(username__in=usernames).values_list("username", flat=True))
+        # Hash once: make_password is deliberately slow
+        password = make_password(f"{prefix}1234")
+        User.objects.bulk_create(
+            [User(username=name, password=password) for name in usernames if name not in existing],
+            batch_size=self.batch_size,
+        )
+        return list(User.objects.filter(username__in=usernames).order_by("username"))
+
+    def _bulk_create(self, model, objs: list) -> list:
+        objs = model.objects.bulk_create(objs, batch_size=self.batch_size)
+        self._backdate(model, objs)
+        return objs
+
+    def _backdate(self, model, objs: list):
+        """Spread timestamps (auto_now_add ignores values passed to bulk_create)."""
+        if not objs or not hasattr(objs[0], "created_at"):
+            return
+        fields = ["created_at"]
+        for obj in objs:
+            obj.created_at = self._created_at()
+            if hasattr(obj, "updated_at"):
+                obj.updated_at = obj.created_at
+        if hasattr(objs[0], "updated_at"):
+            fields.append("updated_at")
+        # One UPDATE ... FROM (VALUES ...) per batch; bulk_update's CASE expression is far slower at this size
+        with connection.cursor() as cursor:
+            table = model._meta.db_table
+            assignments = ", ".join(f"{field} = v.{field}" for field in fields)
+            placeholders = ", ".join(["(%s" + ", %s" * len(fields) + ")"] * len(objs))
+            values = [value for obj in objs for value in (obj.pk, *(getattr(obj, f) for f in fields))]
+            cursor.execute(
+                f"UPDATE {table} AS t SET {assignments} FROM (VALUES {placeholders}) "
+                f"AS v(id, {', '.join(fields)}) WHERE t.id = v.id",
+                values,
+            )
+
+    def _seed_user(self, user: User) -> dict:
+        from documents.models import Document, DocumentChunk
+        from logs.models import DailyDigest, DailyLog
+        from notes.models import Note
+        from tasks.models import Task
+
+        opts = self.options
+        counts = {}
+        self.embedded = 0
+        embed_sources = []  # (content_type, content_id, title, text)
+
+        for start in range(0, opts["notes"], self.batch_size):
+            notes = self._bulk_create(Note, [
+                Note(
+                    user=user,
+                    title=f"メモ {start + i + 1}",
+                    body=self._text(self.rng.randint(2, 8)),
+                    tags=self._tags(),
+                    importance=self.rng.randint(1, 4),
+                )
+                for i in range(min(self.batch_size, opts["notes"] - start))
+            ])
+            embed_sources.extend(("note", n.pk, n.title, f"{n.title}\n{n.body}") for n in notes)
+            counts["notes"] = counts.get("notes", 0) + len(notes)
+            embed_sources = self._flush_embeddings(user, embed_sources)
+
+        # Logs fill the days before the user's oldest existing log (unique per user and date)
+        oldest = DailyLog.objects.filter(user=user).aggregate(oldest=models.Min("date"))["oldest"]
+        first_day = (oldest or self.now.date() + datetime.timedelta(days=1)) - datetime.timedelta(days=1)
+        for start in range(0, opts["logs"], self.batch_size):
+            logs = self._bulk_create(DailyLog, [
+                DailyLog(
+                    user=user,
+                    date=first_day - datetime.timedelta(days=start + i),
+                    raw_text=self._text(self.rng.randint(2, 6)),
+                    mood=self.rng.randint(1, 5),
+                )
+                for i in range(min(self.batch_size, opts["logs"] - start))
+            ])
+            digests = self._bulk_create(DailyDigest, [
+                DailyDigest(
+                    user=user,
+                    log=log,
+                    summary=f"{log.date}の記録。{log.raw_text[:50]}",
+                    tags=self._tags(),
+                    topics=self._tags(),
+                    actions=[],
+                )
+                for log in logs
+            ])
+            embed_sources.extend(
+                ("digest", d.pk, f"ダイジェスト: {d.log.date}", d.summary) for d in digests
+            )
+            counts["daily logs"] = counts.get("daily logs", 0) + len(logs)
+            counts["digests"] = counts.get("digests", 0) + len(digests)
+            embed_sources = self._flush_embeddings(user, embed_sources)
+
+        for start in range(0, opts["documents"], self.batch_size):
+            documents = self._bulk_create(Document, [
+                Document(
+                    user=user,
+                    title=f"文書 {start + i + 1}",
+                    file=f"documents/files/seed_scale_{start + i + 1}.txt",
+                    file_type="txt",
+                    extracted_text=self._text(10),
+                    summary=self._text(2),
+                    status="completed",
+                    processing_stage="embedded",
+                )
+                for i in range(min(self.batch_size, opts["documents"] - start))
+            ])
+            counts["documents"] = counts.get("documents", 0) + len(documents)
+            chunks = [
+                DocumentChunk(document=doc, chunk_index=index, content=self._text(self.rng.randint(5, 15)))
+                for doc in documents
+                for index in range(opts["chunks"])
+            ]
+            for offset in range(0, len(chunks), self.batch_size):
+                batch = self._bulk_create(DocumentChunk, chunks[offset:offset + self.batch_size])
+                embed_sources.extend(
+                    ("chunk", c.pk, f"{c.document.title} - Chunk {c.chunk_index}", c.content) for c in batch
+                )
+                counts["chunks"] = counts.get("chunks", 0) + len(batch)
+                embed_sources = self._flush_embeddings(user, embed_sources)
+
+        statuses = ["todo", "doing", "done"]
+        for start in range(0, opts["tasks"], self.batch_size):
+            tasks = self._bulk_create(Task, [
+                Task(
+                    user=user,
+                    title=f"タスク {start + i + 1}",
+                    description=self._text(self.rng.randint(1, 3)),
+                    due_at=self.now + datetime.timedelta(days=self.rng.randint(-30, 60)),
+                    priority=self.rng.randint(1, 4),
+                    status=self.rng.choice(statuses),
+                    tags=self._tags(),
+                )
+                for i in range(min(self.batch_size, opts["tasks"] - start))
+            ])
+            embed_sources.extend(("task", t.pk, t.title, f"{t.title}\n{t.description}") for t in tasks)
+            counts["tasks"] = counts.get("tasks", 0) + len(tasks)
+            embed_sources = self._flush_embeddings(user, embed_sources)
+
+        self._flush_embeddings(user, embed_sources, force=True)
+        counts["embeddings"] = self.embedded
+
+        # bulk_create skips the signals that maintain tag counts
+        rebuild_tag_counts(user_id=user.pk)
+        return counts
+
+    def _flush_embeddings(self, user: User, sources: list, force: bool = False) -> list:
+        """Write embeddings once a batch has accumulated; returns the sources still pending."""
+        if self.options["embeddings"] == "none":
+            return []
+        if not sources or (len(sources) < self.batch_size and not force):
+            return sources
+
+        from retrieval.models import Embedding
+
+        if self.embedder:
+            vectors = [self.embedder.embed(text) for _, _, _, text in sources]
+        else:
+            vectors = self.np_rng.standard_normal((len(sources), 1536)).astype(np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+        rows = []
+        for (content_type, content_id, title, text), vector in zip(sources, vectors):
+            content_text = text[:10000]
+            snippet, masked_snippet = build_snippets(content_text)
+            rows.append(Embedding(
+                user=user,
+                content_type=content_type,
+                content_id=content_id,
+                content_text=content_text,
+                content_title=title[:255],
+                vector=vector,
+                vector_backend=self.vector_backend,
+                snippet=snippet,
+                masked_snippet=masked_snippet,
+                masking_version=PII_MASKING_VERSION,
+                created_at=self.now,
+                updated_at=self.now,
+            ))
+
+        if self.options["no_copy"]:
+            Embedding.objects.bulk_create(rows, batch_size=self.batch_size)
+        else:
+            copy_rows(Embedding, rows)
+        self.embedded += len(rows)
+        return []
+
+
+def copy_rows(model, objs: list):
+    """Insert unsaved model instances with PostgreSQL COPY (no signals, no returned ids)."""
+    fields = [f for f in model._meta.concrete_fields if not isinstance(f, models.AutoField)]
+    columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+    with connection.cursor() as cursor:
+        with cursor.copy(f"COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN") as copy:
+            for obj in objs:
+                copy.write_row([f.get_db_prep_save(getattr(obj, f.attname), connection) for f in fields])
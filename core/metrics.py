@@ -0,0 +1,209 @@
+"""
+Prometheus metrics for the web process and Celery workers.
+
+Set PROMETHEUS_MULTIPROC_DIR (an empty directory per container) before the
+process starts so gunicorn workers and Celery prefork children write to shared
+files; the exposition then aggregates them. The web app serves /metrics;
+each Celery worker serves its own on CELERY_METRICS_PORT.
+"""
+
+import os
+import time
+
+from celery import signals
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    "memoscribe_http_request_duration_seconds",
+    "HTTP request latency by view",
+    ["view", "method", "status"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+LLM_LATENCY = Histogram(
+    "memoscribe_llm_request_duration_seconds",
+    "LLM API call latency by operation",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 60),
+)
+LLM_ERRORS = Counter("memoscribe_llm_errors_total", "Failed LLM API calls by operation", ["operation"])
+LLM_TOKENS = Counter("memoscribe_llm_tokens_total", "Tokens used by operation (provider-reported)", ["operation"])
+TASK_DURATION = Histogram(
+    "memoscribe_celery_task_duration_seconds",
+    "Celery task run time",
+    ["task", "state"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+TASK_QUEUE_LAG = Histogram(
+    "memoscribe_celery_task_queue_lag_seconds",
+    "Time from publishing a Celery task to a worker starting it",
+    ["task", "queue"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+)
+
+
+def observe_request(view: str, method: str, status: int, duration: float):
+    REQUEST_LATENCY.labels(view, method, str(status)).observe(duration)
+
+
+def observe_llm_call(operation: str, duration: float, tokens: int = 0, error: bool = False):
+    LLM_LATENCY.labels(operation).observe(duration)
+    if error:
+        LLM_ERRORS.labels(operation).inc()
+    if tokens:
+        LLM_TOKENS.labels(operation).inc(tokens)
+
+
+BACKLOG_CACHE_KEY = "metrics:backlog"
+
+
+def backlog_counts() -> dict:
+    """
+    Embedding backlog per content type and documents per pipeline status.
+
+    Counted at most once per METRICS_BACKLOG_CACHE_TTL across all processes,
+    so frequent scrapes do not each scan the embeddings table.
+    """
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.db.models import Count, Q
+
+    from core.llm import llm_provider
+    from documents.models import Document
+    from retrieval.models import Embedding
+
+    try:
+        counts = cache.get(BACKLOG_CACHE_KEY)
+    except Exception:
+        counts = None
+    if counts is not None:
+        return counts
+
+    embeddings = (
+        Embedding.objects.filter(Q(vector__isnull=True) | ~Q(vector_backend=llm_provider.embedding_backend))
+        .values_list("content_type")
+        .order_by()
+        .annotate(count=Count("id"))
+    )
+    documents = (
+        Document.objects.filter(status__in=["pending", "processing"])
+        .values_list("status")
+        .order_by()
+        .annotate(count=Count("id"))
+    )
+    counts = {"embeddings": dict(embeddings), "documents": {"pending": 0, "processing": 0, **dict(documents)}}
+    try:
+        cache.set(BACKLOG_CACHE_KEY, counts, settings.METRICS_BACKLOG_CACHE_TTL)
+    except Exception:
+        pass
+    return counts
+
+
+class BacklogCollector:
+    """Gauges read at scrape time: embedding and document backlogs (cached briefly) and Celery queue depth."""
+
+    def collect(self):
+        from django.conf import settings
+
+        counts = backlog_counts()
+        stale = GaugeMetricFamily(
+            "memoscribe_embedding_backlog",
+            "Embeddings without a vector from the current backend",
+            labels=["content_type"],
+        )
+        for content_type, count in counts["embeddings"].items():
+            stale.add_metric([content_type], count)
+        yield stale
+
+        documents = GaugeMetricFamily(
+            "memoscribe_documents_in_pipeline", "Documents waiting for or in processing", labels=["status"]
+        )
+        for status, count in counts["documents"].items():
+            documents.add_metric([status], count)
+        yield documents
+
+        queues = GaugeMetricFamily("memoscribe_celery_queue_length", "Messages waiting per queue", labels=["queue"])
+        try:
+            from documents.status import get_redis
+
+            redis = get_redis()
+            sep = settings.CELERY_BROKER_TRANSPORT_OPTIONS["sep"]
+            steps = settings.CELERY_BROKER_TRANSPORT_OPTIONS["priority_steps"]
+            for queue in settings.CELERY_TASK_QUEUES:
+                # Kombu keeps one list per priority step; step 0 uses the bare queue name
+                names = [queue.name] + [f"{queue.name}{sep}{step}" for step in steps if step]
+                queues.add_metric([queue.name], sum(redis.llen(name) for name in names))
+        except Exception:
+            pass
+        yield queues
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry to expose: aggregated across processes when PROMETHEUS_MULTIPROC_DIR is set."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics(include_backlog: bool = True) -> tuple[bytes, str]:
+    registry = metrics_registry()
+    output = generate_latest(registry)
+    if include_backlog:
+        backlog = CollectorRegistry(auto_describe=False)
+        backlog.register(BacklogCollector())
+        output += generate_latest(backlog)
+    return output, CONTENT_TYPE_LATEST
+
+
+# Celery instrumentation. The publish timestamp travels as a message header so
+# the worker can measure how long the task waited in the queue.
+
+@signals.before_task_publish.connect
+def _stamp_publish_time(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+_task_started = {}
+
+
+@signals.task_prerun.connect
+def _task_prerun(task_id=None, task=None, **kwargs):
+    now = time.time()
+    _task_started[task_id] = time.perf_counter()
+    published_at = getattr(task.request, "published_at", None)
+    if published_at and not task.request.is_eager:
+        queue = (task.request.delivery_info or {}).get("routing_key", "")
+        TASK_QUEUE_LAG.labels(task.name, queue).observe(max(0.0, now - float(published_at)))
+
+
+@signals.task_postrun.connect
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task.name, (state or "").lower()).observe(time.perf_counter() - started)
+
+
+@signals.worker_ready.connect
+def _start_worker_metrics_server(**kwargs):
+    port = int(os.environ.get("CELERY_METRICS_PORT", "0"))
+    if port:
+        from prometheus_client import start_http_server
+
+        start_http_server(port, registry=metrics_registry())
+
+
+@signals.worker_process_shutdown.connect
+def _mark_worker_process_dead(pid=None, **kwargs):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid or os.getpid())
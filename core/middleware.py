@@ -0,0 +1,132 @@
+"""
+Middleware for MemoScribe.
+"""
+
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from core import metrics, perf, tracing
+
+logger = logging.getLogger("memoscribe.perf")
+
+
+class TracingMiddleware:
+    """Open the root span for a request, continuing an incoming traceparent header."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        span, token = tracing.start_span(
+            f"http {request.method}",
+            traceparent=request.headers.get("traceparent", ""),
+            **{"http.method": request.method, "http.path": request.path},
+        )
+        if span is None:
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+            span.set_attribute("http.status_code", response.status_code)
+            response["traceresponse"] = span.traceparent
+            return response
+        except Exception as e:
+            span.record_exception(e)
+            raise
+        finally:
+            match = request.resolver_match
+            if match:
+                span.name = f"http {request.method} {match.view_name}"
+            tracing.end_span(span, token)
+
+
+class MetricsMiddleware:
+    """Observe every request's latency in the Prometheus histogram, labelled by view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = request.resolver_match
+        view = match.view_name if match else "<unresolved>"
+        metrics.observe_request(view, request.method, response.status_code, time.perf_counter() - started)
+        return response
+
+
+class PerformanceMiddleware:
+    """
+    Record wall time, DB, LLM and cache usage for a sample of requests.
+
+    Sampled requests get a Server-Timing header (visible in browser dev tools)
+    and one structured log line on the ``memoscribe.perf`` logger. SQL that
+    runs more than once is listed in the log line to make N+1 patterns easy to
+    find; slow requests and requests over PERF_QUERY_WARN_THRESHOLD queries
+    are logged at WARNING.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PERF_SAMPLE_RATE
+        self.server_timing = settings.PERF_SERVER_TIMING
+        self.query_warn_threshold = settings.PERF_QUERY_WARN_THRESHOLD
+        self.slow_ms = settings.PERF_SLOW_REQUEST_MS
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        metrics = perf.RequestMetrics()
+        token = perf.activate(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(perf.db_execute_wrapper))
+                response = self.get_response(request)
+        finally:
+            perf.deactivate(token)
+        total_ms = (time.perf_counter() - started) * 1000
+
+        if self.server_timing:
+            response["Server-Timing"] = self._server_timing(metrics, total_ms)
+        self._log(request, response, metrics, total_ms)
+        return response
+
+    def _server_timing(self, metrics: perf.RequestMetrics, total_ms: float) -> str:
+        return ", ".join([
+            f'db;dur={metrics.db_ms:.1f};desc="{metrics.db_queries} queries"',
+            f'llm;dur={metrics.llm_ms:.1f};desc="{metrics.llm_calls} calls"',
+            f'cache;dur={metrics.cache_ms:.1f};desc="{metrics.cache_hits} hits, {metrics.cache_misses} misses"',
+            f"total;dur={total_ms:.1f}",
+        ])
+
+    def _log(self, request, response, metrics: perf.RequestMetrics, total_ms: float):
+        match = request.resolver_match
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": match.view_name if match else "",
+            "status": response.status_code,
+            "duration_ms": round(total_ms, 1),
+            "db_queries": metrics.db_queries,
+            "db_duplicate_queries": metrics.duplicate_queries,
+            "db_ms": round(metrics.db_ms, 1),
+            "llm_calls": metrics.llm_calls,
+            "llm_errors": metrics.llm_errors,
+            "llm_tokens": metrics.llm_tokens,
+            "llm_ms": round(metrics.llm_ms, 1),
+            "cache_hits": metrics.cache_hits,
+            "cache_misses": metrics.cache_misses,
+        }
+        if metrics.duplicate_queries:
+            record["repeated_sql"] = metrics.top_repeated_sql()
+        slow = total_ms > self.slow_ms or metrics.db_queries > self.query_warn_threshold
+        level = logging.WARNING if slow else logging.INFO
+        logger.log(level, json.dumps(record, ensure_ascii=False))
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_tag_counts(apps, schema_editor):
+    """Count existing note and task tags per user in the database."""
+    with schema_editor.connection.cursor() as cursor:
+        for content_type, table in (("note", "notes_note"), ("task", "tasks_task")):
+            cursor.execute(
+                "INSERT INTO core_tagcount (user_id, content_type, tag, count) "
+                "SELECT t.user_id, %s, tag, count(DISTINCT t.id) "
+                f"FROM {table} t, jsonb_array_elements_text("
+                "CASE WHEN jsonb_typeof(t.tags) = 'array' THEN t.tags ELSE '[]'::jsonb END) AS tag "
+                "WHERE tag <> '' GROUP BY t.user_id, tag",
+                [content_type],
+            )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("notes", "0003_note_tags_gin"),
+        ("tasks", "0003_task_tags_gin"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TagCount",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "content_type",
+                    models.CharField(
+                        choices=[("note", "メモ"), ("task", "タスク")], max_length=20, verbose_name="コンテンツ種類"
+                    ),
+                ),
+                ("tag", models.TextField(verbose_name="タグ")),
+                ("count", models.PositiveIntegerField(default=0, verbose_name="件数")),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tag_counts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "タグ集計",
+                "verbose_name_plural": "タグ集計",
+                "ordering": ["-count", "tag"],
+                "constraints": [
+                    models.UniqueConstraint(fields=("user", "content_type", "tag"), name="unique_tag_count")
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_tag_counts, migrations.RunPython.noop),
+    ]
@@ -1 +1,29 @@
-"""Core models (empty - using other apps for models)."""
+"""Core models shared across apps."""
+
+from django.db import models
+from django.contrib.auth.models import User
+
+
+class TagCount(models.Model):
+    """Per-user tag usage counts for notes and tasks, maintained by signals (see core.tags)."""
+
+    CONTENT_TYPES = [
+        ("note", "メモ"),
+        ("task", "タスク"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tag_counts")
+    content_type = models.CharField("コンテンツ種類", max_length=20, choices=CONTENT_TYPES)
+    tag = models.TextField("タグ")
+    count = models.PositiveIntegerField("件数", default=0)
+
+    class Meta:
+        verbose_name = "タグ集計"
+        verbose_name_plural = "タグ集計"
+        ordering = ["-count", "tag"]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "content_type", "tag"], name="unique_tag_count"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.content_type}:{self.tag} ({self.count})"
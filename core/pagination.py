@@ -0,0 +1,168 @@
+"""
+Keyset (cursor) pagination for list views.
+
+Pages follow the queryset's ordering (the model's Meta.ordering by default)
+with the primary key appended as a tie-breaker, and continue from an opaque
+cursor holding the last row's ordering values. Each page is one
+"WHERE (ordering) after cursor ORDER BY ... LIMIT n" query. The "after"
+condition is an OR tree PostgreSQL cannot use as an index bound, so it is
+ANDed with a redundant range on the leading ordering column; an index on
+(user, ordering fields, id) then starts its scan at the cursor and serves
+the page in constant time however deep it is, unlike OFFSET. NULLs sort last in ascending and first in descending order
+(PostgreSQL's default, so plain indexes match).
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from django.utils.http import urlencode
+
+
+@dataclass
+class KeysetPage:
+    items: list
+    next_cursor: str = ""
+    after: list | None = None  # Ordering values of the row before this page (None on the first page)
+
+    @property
+    def has_next(self) -> bool:
+        return bool(self.next_cursor)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _ordering(queryset) -> list[tuple[str, bool]]:
+    """(field name, descending) pairs for the queryset's ordering, ending with the primary key."""
+    names = list(queryset.query.order_by or queryset.model._meta.ordering)
+    fields = []
+    for name in names:
+        if not isinstance(name, str) or "__" in name or name == "?":
+            raise ValueError(f"Keyset pagination needs plain field ordering, got {name!r}")
+        descending = name.startswith("-")
+        name = name.lstrip("-")
+        fields.append(("pk" if name == queryset.model._meta.pk.name else name, descending))
+    if not any(name == "pk" for name, _ in fields):
+        fields.append(("pk", fields[-1][1] if fields else False))
+    return fields
+
+
+def _field(model, name):
+    return model._meta.pk if name == "pk" else model._meta.get_field(name)
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, model, fields: list[tuple[str, bool]]) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursor(str(e)) from e
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidCursor("cursor does not match the ordering")
+    try:
+        return [
+            None if value is None else _field(model, name).to_python(value)
+            for (name, _), value in zip(fields, values)
+        ]
+    except ValidationError as e:
+        raise InvalidCursor(str(e)) from e
+
+
+def _after(model, fields: list[tuple[str, bool]], values: list) -> Q:
+    """Rows sorting after `values`: a > x OR (a = x AND (b > y OR (b = y AND ...)))."""
+    (name, descending), value = fields[0], values[0]
+    if value is None:
+        equal = Q(**{f"{name}__isnull": True})
+        # NULLs come first when descending, so every non-NULL value follows
+        beyond = Q(**{f"{name}__isnull": False}) if descending else None
+    else:
+        equal = Q(**{name: value})
+        beyond = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+        if not descending and _field(model, name).null:
+            beyond |= Q(**{f"{name}__isnull": True})
+    if len(fields) == 1:
+        return beyond if beyond is not None else Q(pk__in=[])
+    rest = equal & _after(model, fields[1:], values[1:])
+    return rest if beyond is None else beyond | rest
+
+
+def _leading_bound(model, field: tuple[str, bool], value) -> Q | None:
+    """Range on the leading ordering column implied by _after(), usable as an index condition."""
+    name, descending = field
+    if value is None:
+        # NULLs come first when descending, so anything may follow; ascending, only NULLs do
+        return None if descending else Q(**{f"{name}__isnull": True})
+    bound = Q(**{f"{name}__{'lte' if descending else 'gte'}": value})
+    if not descending and _field(model, name).null:
+        bound |= Q(**{f"{name}__isnull": True})
+    return bound
+
+
+def paginate(queryset, cursor: str = "", per_page: int | None = None) -> KeysetPage:
+    """Return the page of `queryset` following `cursor` (the first page when empty)."""
+    per_page = per_page or settings.LIST_PAGE_SIZE
+    model = queryset.model
+    fields = _ordering(queryset)
+    queryset = queryset.order_by(*[
+        F(name).desc(nulls_first=True) if descending else F(name).asc(nulls_last=True)
+        for name, descending in fields
+    ])
+    after = decode_cursor(cursor, model, fields) if cursor else None
+    if after:
+        queryset = queryset.filter(_after(model, fields, after))
+        bound = _leading_bound(model, fields[0], after[0])
+        if bound is not None:
+            queryset = queryset.filter(bound)
+
+    # One extra row tells whether another page exists
+    items = list(queryset[:per_page + 1])
+    if len(items) <= per_page:
+        return KeysetPage(items, after=after)
+    items = items[:per_page]
+    values = []
+    for name, _ in fields:
+        field = _field(model, name)
+        values.append(None if field.value_from_object(items[-1]) is None else field.value_to_string(items[-1]))
+    return KeysetPage(items, encode_cursor(values), after)
+
+
+def paginate_request(request, queryset, per_page: int | None = None) -> KeysetPage:
+    """paginate() with the cursor from ?cursor=; an invalid cursor starts from the first page."""
+    try:
+        return paginate(queryset, request.GET.get("cursor", ""), per_page)
+    except InvalidCursor:
+        return paginate(queryset, "", per_page)
+
+
+def next_page_url(request, page: KeysetPage) -> str:
+    """Current URL with the next page's cursor, keeping other query parameters (filters)."""
+    if not page.has_next:
+        return ""
+    params = {k: v for k, v in request.GET.items() if k != "cursor"}
+    params["cursor"] = page.next_cursor
+    return f"{request.path}?{urlencode(params)}"
+
+
+def is_partial(request) -> bool:
+    """Infinite-scroll requests want only the next rows, not the whole page."""
+    return request.headers.get("X-Requested-With") == "XMLHttpRequest"
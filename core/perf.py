@@ -0,0 +1,114 @@
+"""
+Per-request performance counters.
+
+PerformanceMiddleware activates a RequestMetrics for sampled requests; the
+DB execute wrapper, LLMProvider and the instrumented cache backend add to it
+through the record_* helpers, which do nothing outside a sampled request.
+"""
+
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from django.core.cache.backends.redis import RedisCache
+
+
+@dataclass
+class RequestMetrics:
+    """Counters collected while serving one request."""
+
+    db_queries: int = 0
+    db_ms: float = 0.0
+    llm_calls: int = 0
+    llm_errors: int = 0
+    llm_tokens: int = 0
+    llm_ms: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    cache_ms: float = 0.0
+    sql_counts: Counter = field(default_factory=Counter, repr=False)
+
+    @property
+    def duplicate_queries(self) -> int:
+        """Queries whose SQL (parameters excluded) already ran in this request: the N+1 signature."""
+        return self.db_queries - len(self.sql_counts)
+
+    def top_repeated_sql(self, limit: int = 3) -> list[dict]:
+        return [
+            {"sql": sql[:200], "count": count}
+            for sql, count in self.sql_counts.most_common(limit)
+            if count > 1
+        ]
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def activate(metrics: RequestMetrics):
+    """Start collecting into `metrics`; returns a token for deactivate()."""
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper hook counting and timing queries."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_ms += (time.perf_counter() - started) * 1000
+        metrics.db_queries += 1
+        metrics.sql_counts[sql] += 1
+
+
+def record_llm_call(duration: float, tokens: int = 0, error: bool = False):
+    """Record one LLM API call; `duration` is in seconds."""
+    metrics = _current.get()
+    if metrics is None:
+        return
+    metrics.llm_calls += 1
+    metrics.llm_errors += int(error)
+    metrics.llm_tokens += tokens
+    metrics.llm_ms += duration * 1000
+
+
+def record_cache(hits: int, misses: int, duration: float):
+    metrics = _current.get()
+    if metrics is None:
+        return
+    metrics.cache_hits += hits
+    metrics.cache_misses += misses
+    metrics.cache_ms += duration * 1000
+
+
+_MISSING = object()
+
+
+class InstrumentedRedisCache(RedisCache):
+    """RedisCache that reports hits, misses and time to the current request's metrics."""
+
+    def get(self, key, default=None, version=None):
+        started = time.perf_counter()
+        value = super().get(key, _MISSING, version)
+        hit = value is not _MISSING
+        record_cache(int(hit), int(not hit), time.perf_counter() - started)
+        return value if hit else default
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        started = time.perf_counter()
+        found = super().get_many(keys, version)
+        record_cache(len(found), len(keys) - len(found), time.perf_counter() - started)
+        return found
@@ -0,0 +1,96 @@
+"""
+Tag facet counts for notes and tasks.
+
+TagCount rows are kept current by the Note/Task signals: post_init records
+the tags an instance was loaded with, and post_save/post_delete apply only
+the difference, so a tag cloud is one indexed read instead of unnesting
+every row's JSON tags. Writes that bypass signals (bulk_create, update())
+must call rebuild_tag_counts() afterwards.
+"""
+
+from django.db import connection, transaction
+from django.db.models import F
+
+from core.models import TagCount
+
+# content_type -> table holding a "tags" JSON array per row
+TAGGED_TABLES = {
+    "note": "notes_note",
+    "task": "tasks_task",
+}
+
+
+def _tag_set(tags) -> set[str]:
+    return {str(tag) for tag in (tags or []) if str(tag)}
+
+
+def remember_tags(instance):
+    """post_init hook: remember loaded tags (None if the field was deferred, i.e. unknown)."""
+    if "tags" in instance.get_deferred_fields():
+        instance._loaded_tags = None
+    else:
+        instance._loaded_tags = _tag_set(instance.tags)
+
+
+def tags_saved(content_type: str, instance, created: bool):
+    """post_save hook: apply the change in the instance's tags to the counts."""
+    old = set() if created else getattr(instance, "_loaded_tags", None)
+    if old is None:
+        rebuild_tag_counts(content_type, user_id=instance.user_id)
+    else:
+        new = _tag_set(instance.tags)
+        _adjust(instance.user_id, content_type, new - old, 1)
+        _adjust(instance.user_id, content_type, old - new, -1)
+    instance._loaded_tags = _tag_set(instance.tags)
+
+
+def tags_deleted(content_type: str, instance):
+    """post_delete hook."""
+    _adjust(instance.user_id, content_type, _tag_set(instance.tags), -1)
+
+
+def _adjust(user_id: int, content_type: str, tags: set[str], delta: int):
+    if not tags:
+        return
+    if delta > 0:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {TagCount._meta.db_table} (user_id, content_type, tag, count) "
+                "SELECT %s, %s, tag, %s FROM unnest(%s::text[]) AS tag "
+                "ON CONFLICT (user_id, content_type, tag) "
+                f"DO UPDATE SET count = {TagCount._meta.db_table}.count + EXCLUDED.count",
+                [user_id, content_type, delta, sorted(tags)],
+            )
+        return
+    rows = TagCount.objects.filter(user_id=user_id, content_type=content_type, tag__in=tags)
+    # Drop tags that reach zero first; the rest are decremented in place
+    rows.filter(count__lte=-delta).delete()
+    rows.update(count=F("count") + delta)
+
+
+def rebuild_tag_counts(content_type: str | None = None, user_id: int | None = None):
+    """Recount tags from the source tables (all types and users unless narrowed)."""
+    for kind, table in TAGGED_TABLES.items():
+        if content_type and kind != content_type:
+            continue
+        scope = TagCount.objects.filter(content_type=kind)
+        user_filter, params = "", [kind]
+        if user_id is not None:
+            scope = scope.filter(user_id=user_id)
+            user_filter, params = "AND t.user_id = %s", [kind, user_id]
+        with transaction.atomic(), connection.cursor() as cursor:
+            scope.delete()
+            cursor.execute(
+                f"INSERT INTO {TagCount._meta.db_table} (user_id, content_type, tag, count) "
+                f"SELECT t.user_id, %s, tag, count(DISTINCT t.id) "
+                f"FROM {table} t, jsonb_array_elements_text("
+                f"CASE WHEN jsonb_typeof(t.tags) = 'array' THEN t.tags ELSE '[]'::jsonb END) AS tag "
+                f"WHERE tag <> '' {user_filter} GROUP BY t.user_id, tag",
+                params,
+            )
+
+
+def get_tag_counts(user, content_type: str, limit: int | None = None) -> list[dict]:
+    """The user's tags for a content type, most used first."""
+    rows = TagCount.objects.filter(user=user, content_type=content_type).values("tag", "count")
+    return list(rows[:limit] if limit else rows)
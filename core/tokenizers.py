@@ -0,0 +1,166 @@
+"""
+Tokenizers for keyword extraction and other LLM-free text features.
+
+The default BigramTokenizer is pure Python and understands Japanese script
+boundaries; FugashiTokenizer uses MeCab (via the optional ``fugashi``
+package) for dictionary-based segmentation when it is installed.
+"""
+
+import abc
+import logging
+import re
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Runs of a single script of two or more characters: katakana, kanji, or other
+# word characters (Latin letters, digits). Hiragana never matches, so it acts
+# as a separator. Text is NFKC-normalized first, so full-width alphanumerics
+# and half-width katakana are folded into these ranges.
+#
+# The pattern starts with a plain character class (a superset of the run
+# starts, without hiragana, ASCII punctuation and CJK punctuation) so the
+# regex engine skips those in its C search loop; the lookbehind then picks
+# the branch for the script of that first character. Runs are possessive
+# and never backtrack.
+_KATAKANA = r"[\u30A0-\u30FF]"
+_KANJI = r"[\u4E00-\u9FFF\u3005]"
+_OTHER = r"[^\W\u3040-\u30FF\u4E00-\u9FFF\u3005]"
+_RUN_RE = re.compile(
+    r"[0-9a-z_\u00AA-\u2FFF\u3005\u30A0-\U0010FFFF](?:"
+    rf"(?<=[a-z0-9_])[a-z0-9_]++(?!{_OTHER})"
+    rf"|(?<={_KATAKANA}){_KATAKANA}++"
+    rf"|(?<={_KANJI}){_KANJI}++"
+    rf"|(?<={_OTHER}){_OTHER}++"
+    r")"
+)
+
+
+class BaseTokenizer(abc.ABC):
+    """Tokenizer interface: text in, list of normalized tokens out."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def tokenize(self, text: str) -> list[str]:
+        """Split ``text`` into normalized tokens."""
+
+    def count(self, text: str) -> Counter:
+        """Token frequencies of ``text``."""
+        return Counter(self.tokenize(text))
+
+
+class BigramTokenizer(BaseTokenizer):
+    """
+    Dictionary-free tokenizer for mixed Japanese/English text.
+
+    Splits text where the script changes. Hiragana is treated as particles
+    and okurigana and dropped, katakana runs are kept whole (mostly
+    loanwords), and kanji compounds longer than ``max_kanji_word`` are split
+    into overlapping character bigrams. Other words are lowercased.
+    """
+
+    name = "bigram"
+
+    def __init__(self, max_kanji_word: int = 4):
+        self.max_kanji_word = max_kanji_word
+
+    def tokenize(self, text: str) -> list[str]:
+        runs = self._runs(text)
+        long_kanji = self._long_kanji(set(runs))
+        if not long_kanji:
+            return runs
+        tokens = []
+        for run in runs:
+            if run in long_kanji:
+                tokens.extend(_bigrams(run))
+            else:
+                tokens.append(run)
+        return tokens
+
+    def count(self, text: str) -> Counter:
+        # Count whole runs in C first; only the distinct long compounds are split
+        counts = Counter(self._runs(text))
+        for run in self._long_kanji(counts):
+            n = counts.pop(run)
+            for bigram in _bigrams(run):
+                counts[bigram] += n
+        return counts
+
+    def _runs(self, text: str) -> list[str]:
+        if not text:
+            return []
+        if not text.isascii():
+            text = unicodedata.normalize("NFKC", text)
+        return _RUN_RE.findall(text.lower())
+
+    def _long_kanji(self, runs) -> set[str]:
+        """Runs that are kanji compounds longer than ``max_kanji_word``, from distinct ``runs``."""
+        limit = self.max_kanji_word
+        # Runs are single-script, so the first character tells a kanji compound apart
+        return {run for run in runs if len(run) > limit and "\u4e00" <= run[0] <= "\u9fff"}
+
+
+def _bigrams(run: str) -> list[str]:
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+class FugashiTokenizer(BaseTokenizer):
+    """Dictionary segmentation with MeCab; keeps nouns and foreign words."""
+
+    name = "fugashi"
+
+    CONTENT_POS = ("名詞", "固有名詞", "外国語")
+
+    def __init__(self):
+        import fugashi
+
+        self._tagger = fugashi.Tagger()
+
+    def tokenize(self, text: str) -> list[str]:
+        if not text:
+            return []
+
+        tokens = []
+        for word in self._tagger(unicodedata.normalize("NFKC", text)):
+            surface = word.surface.lower()
+            if len(surface) < 2:
+                continue
+            pos = word.pos.split(",")[0]
+            if pos in self.CONTENT_POS or surface.isascii():
+                tokens.append(surface)
+        return tokens
+
+
+TOKENIZERS = {
+    BigramTokenizer.name: BigramTokenizer,
+    FugashiTokenizer.name: FugashiTokenizer,
+}
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(name: str = "") -> BaseTokenizer:
+    """
+    Return a shared tokenizer instance.
+
+    ``name`` defaults to settings.KEYWORD_TOKENIZER. "auto" prefers the
+    compiled fugashi backend and falls back to the pure-Python tokenizer.
+    """
+    name = name or settings.KEYWORD_TOKENIZER
+    if name == "auto":
+        try:
+            return FugashiTokenizer()
+        except Exception:
+            return BigramTokenizer()
+
+    try:
+        return TOKENIZERS[name]()
+    except KeyError:
+        logger.warning(f"Unknown tokenizer '{name}', using bigram")
+    except Exception as e:
+        logger.warning(f"Failed to initialize tokenizer '{name}': {e}")
+    return BigramTokenizer()
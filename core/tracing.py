@@ -0,0 +1,325 @@
+"""
+Lightweight tracing across web requests, Celery tasks and LLM calls.
+
+Spans nest through a context variable. Trace context crosses process
+boundaries as a W3C ``traceparent`` value: read from incoming HTTP headers by
+TracingMiddleware and carried in Celery message headers, so a document upload,
+its pipeline tasks and every chunk embedding share one trace id.
+
+Finished spans go to the exporter chosen by TRACING_EXPORTER: "file" appends
+JSON lines to TRACING_FILE, "otlp" posts batches to an OpenTelemetry
+collector's OTLP/HTTP JSON endpoint. Tracing is off when it is empty.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+
+from celery import signals
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str = ""
+    sampled: bool = True
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: dict = field(default_factory=dict)
+    error: str = ""
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException):
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+            "service": _service_name(),
+        }
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+
+
+def _settings():
+    from django.conf import settings
+    return settings
+
+
+def enabled() -> bool:
+    return bool(_settings().TRACING_EXPORTER)
+
+
+def _service_name() -> str:
+    return os.environ.get("TRACING_SERVICE_NAME") or _settings().TRACING_SERVICE_NAME
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def parse_traceparent(value: str) -> Optional[tuple[str, str, bool]]:
+    """Return (trace_id, parent span id, sampled) from a traceparent header, or None if malformed."""
+    parts = (value or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16), int(parts[3], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(int(parts[3], 16) & 1)
+
+
+def start_span(name: str, traceparent: str = "", **attributes) -> tuple[Optional[Span], object]:
+    """
+    Start a span as a child of the current span (or of `traceparent` if given).
+
+    Returns (span, token) for end_span(); span is None when tracing is off.
+    Prefer the span() context manager where the code shape allows it.
+    """
+    if not enabled():
+        return None, None
+
+    parent = _current.get()
+    remote = parse_traceparent(traceparent) if traceparent else None
+    if remote:
+        trace_id, parent_id, sampled = remote
+    elif parent:
+        trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+    else:
+        trace_id, parent_id = os.urandom(16).hex(), ""
+        sampled = random.random() < _settings().TRACING_SAMPLE_RATE
+
+    span = Span(name, trace_id, os.urandom(8).hex(), parent_id, sampled, attributes=dict(attributes))
+    return span, _current.set(span)
+
+
+def end_span(span: Optional[Span], token):
+    if span is None:
+        return
+    span.end_ns = time.time_ns()
+    _current.reset(token)
+    if span.sampled:
+        get_exporter().export(span)
+
+
+class _NullSpan:
+    """Stand-in yielded by span() when tracing is off."""
+
+    def set_attribute(self, key, value):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Trace the enclosed block as a child of the current span."""
+    new_span, token = start_span(name, **attributes)
+    if new_span is None:
+        yield _NullSpan()
+        return
+    try:
+        yield new_span
+    except BaseException as e:
+        new_span.record_exception(e)
+        raise
+    finally:
+        end_span(new_span, token)
+
+
+def record_exception(exc: BaseException):
+    """Mark the current span as failed (for errors that are handled rather than raised)."""
+    current = _current.get()
+    if current is not None:
+        current.record_exception(exc)
+
+
+def propagate(func):
+    """Wrap `func` to run in a copy of the caller's context, e.g. for thread pool workers."""
+    parent = contextvars.copy_context()
+    return lambda *args, **kwargs: parent.copy().run(func, *args, **kwargs)
+
+
+class FileExporter:
+    """Append finished spans to a JSON lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.as_dict(), ensure_ascii=False, default=str)
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+class OTLPExporter:
+    """Post spans in batches to an OTLP/HTTP JSON endpoint from a background thread."""
+
+    def __init__(self, endpoint: str, batch_size: int = 256, interval: float = 2.0):
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue = queue.Queue(maxsize=10000)
+        self.thread = None
+        self.lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def export(self, span: Span):
+        try:
+            self.queue.put_nowait(span)
+        except queue.Full:
+            return  # Drop spans rather than block the traced code
+        if self.thread is None or not self.thread.is_alive():
+            with self.lock:
+                # Also restarts the thread in forked worker processes
+                if self.thread is None or not self.thread.is_alive():
+                    self.thread = threading.Thread(target=self._run, daemon=True)
+                    self.thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        while not self.queue.empty():
+            batch = []
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            self._post(batch)
+
+    def _post(self, spans: list[Span]):
+        def attribute(key, value):
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        body = {"resourceSpans": [{
+            "resource": {"attributes": [attribute("service.name", _service_name())]},
+            "scopeSpans": [{
+                "scope": {"name": "memoscribe"},
+                "spans": [
+                    {
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        "parentSpanId": s.parent_id,
+                        "name": s.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns),
+                        "attributes": [attribute(k, v) for k, v in s.attributes.items()],
+                        "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+                    }
+                    for s in spans
+                ],
+            }],
+        }]}
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(body, default=str).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except Exception as e:
+            logger.warning(f"Span export failed: {e}")
+
+
+class _NullExporter:
+    def export(self, span: Span):
+        pass
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                settings = _settings()
+                if settings.TRACING_EXPORTER == "file":
+                    _exporter = FileExporter(settings.TRACING_FILE)
+                elif settings.TRACING_EXPORTER == "otlp":
+                    _exporter = OTLPExporter(settings.TRACING_OTLP_ENDPOINT)
+                else:
+                    _exporter = _NullExporter()
+    return _exporter
+
+
+# Celery propagation: the publishing span's context rides in the message
+# headers and the worker starts the task span as its child.
+
+@signals.before_task_publish.connect
+def _inject_trace_context(headers=None, **kwargs):
+    current = _current.get()
+    if current is not None and headers is not None:
+        headers["traceparent"] = current.traceparent
+
+
+_task_spans = {}
+
+
+@signals.task_prerun.connect
+def _start_task_span(task_id=None, task=None, **kwargs):
+    new_span, token = start_span(
+        f"celery.task {task.name}",
+        traceparent=getattr(task.request, "traceparent", "") or "",
+        task_id=task_id,
+        retries=task.request.retries or 0,
+    )
+    if new_span is not None:
+        _task_spans[task_id] = (new_span, token)
+
+
+@signals.task_failure.connect
+def _task_span_failed(task_id=None, exception=None, **kwargs):
+    entry = _task_spans.get(task_id)
+    if entry and exception is not None:
+        entry[0].record_exception(exception)
+
+
+@signals.task_postrun.connect
+def _end_task_span(task_id=None, state=None, **kwargs):
+    entry = _task_spans.pop(task_id, None)
+    if entry:
+        entry[0].set_attribute("state", state or "")
+        end_span(*entry)
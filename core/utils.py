@@ -6,35 +6,82 @@ import re
 from typing import Optional
 
 
+# Bump when the masking rules change so stored masked snippets get regenerated
+# (manage.py refresh_snippets).
+PII_MASKING_VERSION = 3
+
+# Characters of content passed to the LLM per retrieved item
+SNIPPET_LENGTH = 500
+
+# All PII patterns combined into one scanner. At each position the alternatives
+# are tried in priority order: email, international phone, credit card, phone,
+# postal code, ID number, My Number. A full international number is masked
+# before the domestic pattern can match inside it, and a 16-digit card number
+# starting with 0 is masked as a card, not as a phone number plus its last
+# digits. The digit-led patterns share one branch that starts with \d so the
+# regex engine can skip non-digit text quickly; "\d(?<!\w\d)" is "\b\d".
+_PII_RE = re.compile(
+    r"""
+    (?P<EMAIL>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b)
+    # International phone format; the last group takes every remaining digit
+    | (?P<PHONE_INTL>\+\d{1,3}[-\s]?\d{1,4}[-\s]?\d{1,4}[-\s]?\d{3,})
+    | \d(?<!\w\d)(?:
+        # Credit card numbers (16 digits with optional separators)
+        (?P<CREDIT_CARD>\d{3}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b)
+        # Japanese phone numbers (various formats)
+        | (?P<PHONE>(?<=0)\d{1,4}[-\s]?\d{1,4}[-\s]?\d{3,4}\b)
+        # Japanese postal codes
+        | (?P<POSTAL>\d{2}-?\d{4}\b)
+        # ID-like numbers (8+ consecutive digits)
+        | (?P<ID_NUMBER>\d{7,}\b)
+        # My Number (Japanese social security - 12 digits)
+        | (?P<MY_NUMBER>\d{3}[-\s]?\d{4}[-\s]?\d{4}\b)
+    )
+    """,
+    re.VERBOSE,
+)
+_PII_REPLACEMENTS = {
+    "EMAIL": "[EMAIL]",
+    "PHONE_INTL": "[PHONE]",
+    "CREDIT_CARD": "[CREDIT_CARD]",
+    "PHONE": "[PHONE]",
+    "POSTAL": "[POSTAL]",
+    "ID_NUMBER": "[ID_NUMBER]",
+    "MY_NUMBER": "[MY_NUMBER]",
+}
+# Every pattern needs a digit or "@", so text without either can be skipped
+_PII_HINT_RE = re.compile(r"[\d@]")
+
+
+def _pii_replacement(match: re.Match) -> str:
+    return _PII_REPLACEMENTS[match.lastgroup]
+
+
 def mask_pii(text: str) -> str:
     """
     Mask personally identifiable information in text.
-    Replaces emails, phone numbers, addresses, credit cards, and ID-like numbers.
+    Replaces emails, phone numbers, addresses, credit cards, and ID-like numbers
+    in a single scan with one precompiled alternation.
     """
-    if not text:
+    if not text or not _PII_HINT_RE.search(text):
         return text
 
-    # Email addresses
-    text = re.sub(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b", "[EMAIL]", text)
+    return _PII_RE.sub(_pii_replacement, text)
 
-    # Japanese phone numbers (various formats)
-    text = re.sub(r"\b0\d{1,4}[-\s]?\d{1,4}[-\s]?\d{3,4}\b", "[PHONE]", text)
-    # International format
-    text = re.sub(r"\+\d{1,3}[-\s]?\d{1,4}[-\s]?\d{1,4}[-\s]?\d{3,4}", "[PHONE]", text)
 
-    # Credit card numbers (16 digits with optional separators)
-    text = re.sub(r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b", "[CREDIT_CARD]", text)
+def mask_pii_batch(texts: list[str]) -> list[str]:
+    """Mask PII in a list of texts."""
+    return [mask_pii(text) for text in texts]
 
-    # Japanese postal codes
-    text = re.sub(r"\b\d{3}[-]?\d{4}\b", "[POSTAL]", text)
 
-    # ID-like numbers (8+ consecutive digits)
-    text = re.sub(r"\b\d{8,}\b", "[ID_NUMBER]", text)
-
-    # My Number (Japanese social security - 12 digits)
-    text = re.sub(r"\b\d{4}[-\s]?\d{4}[-\s]?\d{4}\b", "[MY_NUMBER]", text)
-
-    return text
+def build_snippets(text: str, max_length: int = SNIPPET_LENGTH) -> tuple[str, str]:
+    """
+    Build the raw and PII-masked context snippets stored with an embedding.
+    Masking runs on the full text before truncation so a match is never cut in half.
+    """
+    if not text:
+        return "", ""
+    return text[:max_length], mask_pii(text)[:max_length]
 
 
 def truncate_text(text: str, max_length: int = 300) -> str:
@@ -44,38 +91,42 @@ def truncate_text(text: str, max_length: int = 300) -> str:
     return text[:max_length].rsplit(" ", 1)[0] + "..."
 
 
-def extract_keywords(text: str, max_keywords: int = 5) -> list[str]:
+# Common Japanese particles and English stopwords excluded from keywords
+STOPWORDS = frozenset({
+    "の", "は", "が", "を", "に", "で", "と", "も", "や", "へ", "から", "まで",
+    "より", "など", "か", "て", "た", "だ", "です", "ます", "する", "ある", "いる",
+    "これ", "それ", "あれ", "この", "その", "あの", "こと", "もの", "ため",
+    "the", "a", "an", "is", "are", "was", "were", "be", "been", "being",
+    "have", "has", "had", "do", "does", "did", "will", "would", "could", "should",
+    "may", "might", "can", "of", "in", "to", "for", "with", "on", "at", "by",
+    "from", "as", "into", "through", "during", "before", "after", "above", "below",
+    "and", "or", "but", "if", "then", "else", "when", "up", "down", "out", "off",
+})
+
+
+def extract_keywords(text: str, max_keywords: int = 5, tokenizer=None) -> list[str]:
     """
-    Simple keyword extraction based on word frequency.
+    Simple keyword extraction based on token frequency.
     Used when LLM is disabled.
+
+    Tokens come from the configured tokenizer (see core.tokenizers), which
+    segments Japanese text instead of treating a whole sentence as one word.
     """
     if not text:
         return []
 
-    # Remove common Japanese particles and stopwords
-    stopwords = {
-        "の", "は", "が", "を", "に", "で", "と", "も", "や", "へ", "から", "まで",
-        "より", "など", "か", "て", "た", "だ", "です", "ます", "する", "ある", "いる",
-        "これ", "それ", "あれ", "この", "その", "あの", "こと", "もの", "ため",
-        "the", "a", "an", "is", "are", "was", "were", "be", "been", "being",
-        "have", "has", "had", "do", "does", "did", "will", "would", "could", "should",
-        "may", "might", "can", "of", "in", "to", "for", "with", "on", "at", "by",
-        "from", "as", "into", "through", "during", "before", "after", "above", "below",
-        "and", "or", "but", "if", "then", "else", "when", "up", "down", "out", "off",
-    }
-
-    # Tokenize (simple split for now)
-    words = re.findall(r"\b\w{2,}\b", text.lower())
-
-    # Count frequency excluding stopwords
-    word_counts: dict[str, int] = {}
-    for word in words:
-        if word not in stopwords and not word.isdigit():
-            word_counts[word] = word_counts.get(word, 0) + 1
-
-    # Sort by frequency and return top keywords
-    sorted_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
-    return [word for word, _ in sorted_words[:max_keywords]]
+    if tokenizer is None:
+        from core.tokenizers import get_tokenizer
+        tokenizer = get_tokenizer()
+
+    # Filter distinct tokens in frequency order instead of every occurrence
+    keywords = []
+    for word, _ in tokenizer.count(text).most_common():
+        if word not in STOPWORDS and not word.isdigit():
+            keywords.append(word)
+            if len(keywords) == max_keywords:
+                break
+    return keywords
 
 
 def simple_summary(text: str, max_sentences: int = 3) -> str:
@@ -3,6 +3,8 @@ Core views for MemoScribe.
 Dashboard, settings, and search.
 """
 
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
@@ -10,14 +12,17 @@ from django.contrib.auth.forms import UserCreationForm
 from django.contrib import messages
 from django.utils import timezone
 from django.db.models import Q
+from django.utils.crypto import constant_time_compare
 
 from notes.models import Note
-from logs.models import DailyLog, DailyDigest
+from logs.models import DailyDigest
 from documents.models import Document
 from tasks.models import Task
 from preferences.models import Preference, UserSettings
-from audits.models import AuditLog
+from preferences.snapshot import SETTINGS_FIELDS, get_snapshot
+from core.dashboard import get_fragments
 from core.llm import llm_provider
+from core.metrics import render_metrics
 
 
 def home(request):
@@ -50,63 +55,38 @@ def dashboard(request):
     """Main dashboard view."""
     today = timezone.now().date()
 
-    # Get upcoming and today's tasks
-    upcoming_tasks = Task.objects.filter(
-        user=request.user,
-        status__in=["todo", "doing"],
-    ).filter(
-        Q(due_at__date__lte=today) | Q(due_at__date__lte=today + timezone.timedelta(days=3))
-    ).order_by("due_at", "-priority")[:5]
+    # Panels come from the per-user fragment cache (core.dashboard)
+    fragments = get_fragments(request.user)
+    upcoming_tasks = fragments["tasks"]
+    llm_calls_today, total_tokens_today = fragments["usage"]
 
-    # Recent notes
-    recent_notes = Note.objects.filter(user=request.user).order_by("-created_at")[:5]
-
-    # Recent logs
-    recent_logs = DailyLog.objects.filter(user=request.user).order_by("-date")[:5]
-
-    has_note = Note.objects.filter(user=request.user).exists()
-    has_log = DailyLog.objects.filter(user=request.user).exists()
-    has_document = Document.objects.filter(user=request.user).exists()
+    has_note = fragments["onboarding"]["has_note"]
+    has_log = fragments["onboarding"]["has_log"]
+    has_document = fragments["onboarding"]["has_document"]
     onboarding_done = sum([has_log, has_note, has_document])
     onboarding_total = 3
     onboarding_percent = int(onboarding_done / onboarding_total * 100)
 
-    # LLM usage stats
-    llm_calls_today = AuditLog.objects.filter(
-        user=request.user,
-        event_type="llm_call",
-        created_at__date=today,
-    ).count()
-
-    total_tokens_today = sum(
-        log.payload.get("tokens", 0)
-        for log in AuditLog.objects.filter(
-            user=request.user,
-            event_type="llm_call",
-            created_at__date=today,
-        )
-    )
-
     # Generate daily suggestion if LLM is enabled
     daily_suggestion = None
     if llm_provider.is_available():
         # Simple suggestion based on tasks and recent activity
-        if upcoming_tasks.exists():
+        if upcoming_tasks:
             task_names = [t.title for t in upcoming_tasks[:3]]
             daily_suggestion = f"今日は以下のタスクに取り組みましょう: {', '.join(task_names)}"
         else:
             daily_suggestion = "今日のタスクはありません。新しいタスクを追加するか、メモを整理してみましょう。"
     else:
-        if upcoming_tasks.exists():
-            daily_suggestion = f"期限が近いタスクが{upcoming_tasks.count()}件あります。"
+        if upcoming_tasks:
+            daily_suggestion = f"期限が近いタスクが{len(upcoming_tasks)}件あります。"
         else:
             daily_suggestion = "今日の予定を記録しましょう。"
 
     context = {
         "today": today,
         "upcoming_tasks": upcoming_tasks,
-        "recent_notes": recent_notes,
-        "recent_logs": recent_logs,
+        "recent_notes": fragments["notes"],
+        "recent_logs": fragments["logs"],
         "daily_suggestion": daily_suggestion,
         "llm_calls_today": llm_calls_today,
         "total_tokens_today": total_tokens_today,
@@ -125,23 +105,19 @@ def dashboard(request):
 @login_required
 def settings_view(request):
     """User settings view."""
-    user_settings, _ = UserSettings.objects.get_or_create(user=request.user)
-
     if request.method == "POST":
-        # Update settings
-        user_settings.send_notes = request.POST.get("send_notes") == "on"
-        user_settings.send_digests = request.POST.get("send_digests") == "on"
-        user_settings.send_docs = request.POST.get("send_docs") == "on"
-        user_settings.send_raw_logs = request.POST.get("send_raw_logs") == "on"
-        user_settings.pii_masking = request.POST.get("pii_masking") == "on"
-        user_settings.llm_enabled = request.POST.get("llm_enabled") == "on"
-        user_settings.save()
+        # Update settings (the row is only created on the first save)
+        UserSettings.objects.update_or_create(
+            user=request.user,
+            defaults={field: request.POST.get(field) == "on" for field in SETTINGS_FIELDS},
+        )
 
         messages.success(request, "設定を保存しました。")
         return redirect("settings")
 
     context = {
-        "settings": user_settings,
+        # The settings retrieval uses: saved ones, or the environment defaults
+        "settings": get_snapshot(request.user.pk)["settings"],
         "llm_configured": bool(llm_provider.api_key),
     }
     return render(request, "settings.html", context)
@@ -203,3 +179,16 @@ def search_view(request):
         "total_results": total_results,
     }
     return render(request, "search.html", context)
+
+
+def metrics_view(request):
+    """Prometheus exposition for the web processes; needs METRICS_AUTH_TOKEN outside DEBUG."""
+    token = settings.METRICS_AUTH_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponse(status=403)
+    elif not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponse(status=401)
+
+    output, content_type = render_metrics()
+    return HttpResponse(output, content_type=content_type)
@@ -1,13 +1,13 @@
 from django.contrib import admin
-from documents.models import Document, DocumentChunk
+from documents.models import Document, DocumentChunk, UploadSession
 
 
 @admin.register(Document)
 class DocumentAdmin(admin.ModelAdmin):
-    list_display = ["title", "user", "file_type", "status", "created_at"]
-    list_filter = ["status", "file_type", "created_at"]
+    list_display = ["title", "user", "file_type", "status", "processing_stage", "created_at"]
+    list_filter = ["status", "processing_stage", "file_type", "created_at"]
     search_fields = ["title", "extracted_text"]
-    readonly_fields = ["created_at", "updated_at"]
+    readonly_fields = ["stage_timings", "created_at", "updated_at"]
 
 
 @admin.register(DocumentChunk)
@@ -15,3 +15,10 @@ class DocumentChunkAdmin(admin.ModelAdmin):
     list_display = ["document", "chunk_index", "created_at"]
     list_filter = ["created_at"]
     search_fields = ["content"]
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ["filename", "user", "status", "received_bytes", "total_size", "expires_at", "created_at"]
+    list_filter = ["status", "created_at"]
+    readonly_fields = ["created_at", "updated_at"]
@@ -0,0 +1,19 @@
+"""
+Delete expired chunked upload sessions and their partial files.
+"""
+
+from django.core.management.base import BaseCommand
+
+from documents.uploads import expire_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete upload sessions idle for DOCUMENT_UPLOAD_EXPIRY seconds and their partial files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted")
+
+    def handle(self, *args, **options):
+        sessions, files = expire_uploads(dry_run=options["dry_run"])
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {sessions} expired upload sessions and {files} part files"))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="processing_stage",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("", "未処理"),
+                    ("extracted", "テキスト抽出済み"),
+                    ("summarized", "要約済み"),
+                    ("chunked", "チャンク分割済み"),
+                    ("embedded", "埋め込み登録済み"),
+                ],
+                default="",
+                max_length=20,
+                verbose_name="処理段階",
+            ),
+        ),
+        migrations.AddField(
+            model_name="document",
+            name="stage_timings",
+            field=models.JSONField(blank=True, default=dict, verbose_name="段階別処理時間"),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:35
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build indexes without locking writes on large tables
+    atomic = False
+
+    dependencies = [
+        ("documents", "0004_document_list_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="document",
+            index=models.Index(
+                condition=models.Q(("status__in", ["pending", "processing"])),
+                fields=["status"],
+                name="documents_pipeline_idx",
+            ),
+        ),
+    ]
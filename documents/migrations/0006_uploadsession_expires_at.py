@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:55
+
+import documents.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0005_document_pipeline_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="uploadsession",
+            name="expires_at",
+            field=models.DateTimeField(db_index=True, default=documents.models.upload_expiry, verbose_name="有効期限"),
+        ),
+    ]
@@ -2,7 +2,13 @@
 Documents models for MemoScribe.
 """
 
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
+from django.db.models import Q
 from django.contrib.auth.models import User
 from django.urls import reverse
 
@@ -17,6 +23,15 @@ class Document(models.Model):
         ("failed", "失敗"),
     ]
 
+    # Pipeline stages in execution order; processing_stage holds the last completed one.
+    STAGE_CHOICES = [
+        ("", "未処理"),
+        ("extracted", "テキスト抽出済み"),
+        ("summarized", "要約済み"),
+        ("chunked", "チャンク分割済み"),
+        ("embedded", "埋め込み登録済み"),
+    ]
+
     FILE_TYPE_CHOICES = [
         ("pdf", "PDF"),
         ("txt", "テキスト"),
@@ -31,6 +46,8 @@ class Document(models.Model):
     summary = models.TextField("要約", blank=True)
     status = models.CharField("状態", max_length=20, choices=STATUS_CHOICES, default="pending")
     error_message = models.TextField("エラーメッセージ", blank=True)
+    processing_stage = models.CharField("処理段階", max_length=20, choices=STAGE_CHOICES, default="", blank=True)
+    stage_timings = models.JSONField("段階別処理時間", default=dict, blank=True)
     created_at = models.DateTimeField("作成日時", auto_now_add=True)
     updated_at = models.DateTimeField("更新日時", auto_now=True)
 
@@ -38,6 +55,16 @@ class Document(models.Model):
         verbose_name = "文書"
         verbose_name_plural = "文書"
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination of the document list (core.pagination)
+            models.Index(fields=["user", "-created_at", "-id"]),
+            # Pipeline backlog counts (core.metrics); only unfinished documents are indexed
+            models.Index(
+                fields=["status"],
+                condition=Q(status__in=["pending", "processing"]),
+                name="documents_pipeline_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -63,3 +90,46 @@ class DocumentChunk(models.Model):
 
     def __str__(self):
         return f"{self.document.title} - Chunk {self.chunk_index}"
+
+
+def upload_expiry():
+    """Expiry of an upload session touched now."""
+    return timezone.now() + timedelta(seconds=settings.DOCUMENT_UPLOAD_EXPIRY)
+
+
+class UploadSession(models.Model):
+    """Resumable chunked upload; parts are appended to a partial file in media storage."""
+
+    STATUS_CHOICES = [
+        ("uploading", "アップロード中"),
+        ("completed", "完了"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="upload_sessions")
+    title = models.CharField("タイトル", max_length=255)
+    filename = models.CharField("ファイル名", max_length=255)
+    total_size = models.BigIntegerField("合計サイズ")
+    received_bytes = models.BigIntegerField("受信済みサイズ", default=0)
+    checksum = models.CharField("SHA-256", max_length=64, blank=True)
+    status = models.CharField("状態", max_length=20, choices=STATUS_CHOICES, default="uploading")
+    document = models.ForeignKey(
+        Document, on_delete=models.SET_NULL, null=True, blank=True, related_name="upload_sessions"
+    )
+    # Pushed back by every part; expired sessions and their partial files are removed by expire_uploads
+    expires_at = models.DateTimeField("有効期限", default=upload_expiry, db_index=True)
+    created_at = models.DateTimeField("作成日時", auto_now_add=True)
+    updated_at = models.DateTimeField("更新日時", auto_now=True)
+
+    class Meta:
+        verbose_name = "アップロードセッション"
+        verbose_name_plural = "アップロードセッション"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.filename} ({self.received_bytes}/{self.total_size})"
+
+    @property
+    def part_path(self) -> str:
+        """Media-relative path of the partial file being assembled."""
+        return f"documents/uploads/{self.pk}.part"
@@ -2,7 +2,8 @@
 Documents signals for processing.
 """
 
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 from documents.models import Document
@@ -12,5 +13,19 @@ from documents.models import Document
 def document_saved(sender, instance, created, **kwargs):
     """Trigger document processing when uploaded."""
     if created:
+        from core import dashboard
+        from documents.status import publish_document_status
         from documents.tasks import process_document
-        process_document.delay(instance.pk)
+        publish_document_status(instance)
+        dashboard.invalidate(instance.user_id, dashboard.DOCUMENT_FRAGMENTS)
+        # Wait for the surrounding transaction so the worker can see the row
+        transaction.on_commit(lambda: process_document.delay(instance.pk))
+
+
+@receiver(post_delete, sender=Document)
+def document_deleted(sender, instance, **kwargs):
+    """Drop the cached processing status."""
+    from core import dashboard
+    from documents.status import forget_document_status
+    forget_document_status(instance.pk)
+    dashboard.invalidate(instance.user_id, dashboard.DOCUMENT_FRAGMENTS)
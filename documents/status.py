@@ -0,0 +1,117 @@
+"""
+Document processing status cache and push channel.
+
+The processing pipeline publishes every status/stage transition here. The
+latest status of each document is kept in the Django cache (so status
+requests never hit the database) and broadcast on a per-user Redis pub/sub
+channel consumed by the server-sent events endpoint.
+"""
+
+import json
+import logging
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+_redis_client = None
+
+
+def get_redis():
+    """Lazy load a Redis client for pub/sub."""
+    global _redis_client
+    if _redis_client is None:
+        import redis
+
+        _redis_client = redis.Redis.from_url(settings.REDIS_URL)
+    return _redis_client
+
+
+def status_cache_key(document_id: int) -> str:
+    return f"documents:status:{document_id}"
+
+
+def status_channel(user_id: int) -> str:
+    return f"documents:status:user:{user_id}"
+
+
+def document_progress(doc) -> int:
+    """Progress percentage derived from the last completed pipeline stage."""
+    from documents.tasks import PIPELINE_STAGES
+
+    if doc.status == "completed":
+        return 100
+    if not doc.processing_stage:
+        return 0
+    return int((PIPELINE_STAGES.index(doc.processing_stage) + 1) / len(PIPELINE_STAGES) * 100)
+
+
+def status_payload(doc) -> dict:
+    """Serializable status snapshot for a document."""
+    return {
+        "id": doc.pk,
+        "user_id": doc.user_id,
+        "status": doc.status,
+        "stage": doc.processing_stage,
+        "progress": document_progress(doc),
+    }
+
+
+def publish_document_status(doc):
+    """
+    Cache and broadcast a document's current status.
+
+    Status push is best-effort: a Redis outage must never fail processing,
+    so errors are only logged.
+    """
+    payload = status_payload(doc)
+    try:
+        cache.set(status_cache_key(doc.pk), payload, settings.DOCUMENT_STATUS_CACHE_TTL)
+        get_redis().publish(status_channel(doc.user_id), json.dumps(payload))
+    except Exception as e:
+        logger.warning(f"Failed to publish status for document {doc.pk}: {e}")
+
+
+def forget_document_status(document_id: int):
+    """Drop the cached status of a deleted document."""
+    try:
+        cache.delete(status_cache_key(document_id))
+    except Exception as e:
+        logger.warning(f"Failed to clear status for document {document_id}: {e}")
+
+
+def get_document_statuses(user, ids: Optional[list[int]] = None) -> list[dict]:
+    """
+    Return status snapshots for a user's documents, served from the cache.
+
+    Only documents missing from the cache (e.g. after eviction) are read from
+    the database, and they are cached again on the way out.
+    """
+    from documents.models import Document
+
+    if ids is None:
+        ids = list(Document.objects.filter(user=user).values_list("id", flat=True))
+
+    cached = cache.get_many([status_cache_key(i) for i in ids])
+    statuses = {}
+    missing = []
+    for doc_id in ids:
+        payload = cached.get(status_cache_key(doc_id))
+        if payload is None:
+            missing.append(doc_id)
+        elif payload["user_id"] == user.pk:
+            statuses[doc_id] = payload
+
+    if missing:
+        for doc in Document.objects.filter(user=user, id__in=missing).only("id", "user_id", "status", "processing_stage"):
+            payload = status_payload(doc)
+            statuses[doc.pk] = payload
+            cache.set(status_cache_key(doc.pk), payload, settings.DOCUMENT_STATUS_CACHE_TTL)
+
+    return [
+        {k: v for k, v in statuses[doc_id].items() if k != "user_id"}
+        for doc_id in ids
+        if doc_id in statuses
+    ]
@@ -4,13 +4,22 @@ Celery tasks for document processing.
 
 import io
 import logging
-from celery import shared_task
+import time
+
+from celery import chain, shared_task
+from django.db import transaction
+
+from core import tracing
+from documents.status import publish_document_status
 
 logger = logging.getLogger(__name__)
 
 CHUNK_SIZE = 1000  # Characters per chunk
 CHUNK_OVERLAP = 100  # Overlap between chunks
 
+# Pipeline stages in execution order (see Document.STAGE_CHOICES)
+PIPELINE_STAGES = ["extracted", "summarized", "chunked", "embedded"]
+
 
 def extract_text_from_pdf(file_path: str) -> str:
     """Extract text from PDF file using pdfminer."""
@@ -59,72 +68,185 @@ def split_into_chunks(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CH
     return [c for c in chunks if c]
 
 
-@shared_task(bind=True, max_retries=3)
-def process_document(self, document_id: int):
-    """Process an uploaded document: extract text, chunk, summarize, and embed."""
-    from documents.models import Document, DocumentChunk
-    from core.llm import llm_provider
-    from retrieval.tasks import update_chunk_embedding
-    from audits.models import AuditLog
-    from core.utils import calculate_token_estimate
+def _get_document(document_id: int):
+    """Load a document, or None if it was deleted mid-pipeline."""
+    from documents.models import Document
 
     try:
-        doc = Document.objects.get(pk=document_id)
+        return Document.objects.get(pk=document_id)
     except Document.DoesNotExist:
         logger.warning(f"Document {document_id} not found")
+        return None
+
+
+def _stage_done(doc, stage: str) -> bool:
+    """Check whether a pipeline stage has already completed for a document."""
+    if not doc.processing_stage:
+        return False
+    return PIPELINE_STAGES.index(doc.processing_stage) >= PIPELINE_STAGES.index(stage)
+
+
+def _complete_stage(doc, stage: str, started: float, fields: list[str]):
+    """Persist a stage's output together with its completion marker and duration."""
+    elapsed = round(time.monotonic() - started, 3)
+    doc.processing_stage = stage
+    doc.stage_timings = {**doc.stage_timings, stage: elapsed}
+    with tracing.span("db.complete_stage", stage=stage):
+        doc.save(update_fields=fields + ["processing_stage", "stage_timings", "updated_at"])
+    publish_document_status(doc)
+    logger.info(f"Document {doc.pk}: stage '{stage}' completed in {elapsed}s")
+
+
+def _mark_failed(task, doc, stage: str, error: Exception):
+    """
+    Record a stage failure before the stage task retries itself.
+
+    The document stays "processing" while retries remain and is only marked
+    failed once the last one has failed.
+    """
+    logger.error(f"Failed to process document {doc.pk} at stage '{stage}': {error}")
+    doc.status = "failed" if task.request.retries >= task.max_retries else "processing"
+    doc.error_message = str(error)
+    doc.save(update_fields=["status", "error_message", "updated_at"])
+    publish_document_status(doc)
+
+
+@shared_task(bind=True, max_retries=3)
+def extract_document_text(self, document_id: int):
+    """Pipeline stage 1: extract text from the uploaded file."""
+    doc = _get_document(document_id)
+    if doc is None or _stage_done(doc, "extracted"):
         return
 
+    started = time.monotonic()
     try:
-        doc.status = "processing"
-        doc.save()
+        with tracing.span("document.extract", file_type=doc.file_type) as span:
+            doc.extracted_text = extract_text_from_file(doc.file.path, doc.file_type)
+            span.set_attribute("chars", len(doc.extracted_text))
+        _complete_stage(doc, "extracted", started, ["extracted_text"])
+    except Exception as e:
+        _mark_failed(self, doc, "extracted", e)
+        raise self.retry(exc=e, countdown=60)
 
-        # Extract text
-        file_path = doc.file.path
-        extracted_text = extract_text_from_file(file_path, doc.file_type)
-        doc.extracted_text = extracted_text
 
-        # Generate summary
+@shared_task(bind=True, max_retries=3)
+def summarize_document(self, document_id: int):
+    """Pipeline stage 2: summarize the extracted text."""
+    from core.llm import llm_provider
+    from audits.writer import log_event
+    from core.utils import simple_summary
+
+    doc = _get_document(document_id)
+    if doc is None or _stage_done(doc, "summarized"):
+        return
+
+    started = time.monotonic()
+    try:
+        extracted_text = doc.extracted_text
         if llm_provider.is_available() and extracted_text:
-            digest = llm_provider.generate_digest(extracted_text[:4000])
-            doc.summary = digest.get("summary", "")
+            # Map-reduce over the whole text; unchanged sections come from cache
+            with tracing.span("document.summarize", chars=len(extracted_text)) as span:
+                result = llm_provider.summarize_long_text(extracted_text)
+                span.set_attribute("llm_calls", result["llm_calls"])
+            doc.summary = result["summary"]
 
             # Log LLM call
-            AuditLog.objects.create(
-                user=doc.user,
-                event_type="llm_call",
-                payload={
+            if result["llm_calls"]:
+                log_event(doc.user, "llm_call", {
                     "action": "document_summary",
                     "document_id": document_id,
-                    "tokens": calculate_token_estimate(extracted_text[:4000]),
-                },
-            )
+                    "tokens": result["tokens"],
+                    "llm_calls": result["llm_calls"],
+                })
         else:
             # Simple summary
-            from core.utils import simple_summary
             doc.summary = simple_summary(extracted_text)
 
-        doc.status = "completed"
-        doc.save()
-
-        # Create chunks
-        DocumentChunk.objects.filter(document=doc).delete()
-        chunks = split_into_chunks(extracted_text)
-
-        for i, chunk_text in enumerate(chunks):
-            chunk = DocumentChunk.objects.create(
-                document=doc,
-                chunk_index=i,
-                content=chunk_text,
-                metadata={"position": i, "total_chunks": len(chunks)},
+        _complete_stage(doc, "summarized", started, ["summary"])
+    except Exception as e:
+        _mark_failed(self, doc, "summarized", e)
+        raise self.retry(exc=e, countdown=60)
+
+
+@shared_task(bind=True, max_retries=3)
+def chunk_document(self, document_id: int):
+    """Pipeline stage 3: split the extracted text into chunks (replacing any previous ones)."""
+    from documents.models import DocumentChunk
+
+    doc = _get_document(document_id)
+    if doc is None or _stage_done(doc, "chunked"):
+        return
+
+    started = time.monotonic()
+    try:
+        with tracing.span("document.split"):
+            chunks = split_into_chunks(doc.extracted_text)
+        with tracing.span("db.save_chunks", chunks=len(chunks)), transaction.atomic():
+            DocumentChunk.objects.filter(document=doc).delete()
+            DocumentChunk.objects.bulk_create(
+                [
+                    DocumentChunk(
+                        document=doc,
+                        chunk_index=i,
+                        content=chunk_text,
+                        metadata={"position": i, "total_chunks": len(chunks)},
+                    )
+                    for i, chunk_text in enumerate(chunks)
+                ]
             )
-            # Trigger embedding generation
-            update_chunk_embedding.delay(chunk.pk)
+            _complete_stage(doc, "chunked", started, [])
+    except Exception as e:
+        _mark_failed(self, doc, "chunked", e)
+        raise self.retry(exc=e, countdown=60)
+
+
+@shared_task(bind=True, max_retries=3)
+def embed_document_chunks(self, document_id: int):
+    """Pipeline stage 4: dispatch embedding generation for every chunk and finish."""
+    from retrieval.tasks import update_chunk_embedding
+
+    doc = _get_document(document_id)
+    if doc is None:
+        return
 
-        logger.info(f"Processed document {document_id}: {len(chunks)} chunks")
+    started = time.monotonic()
+    try:
+        if not _stage_done(doc, "embedded"):
+            chunk_ids = list(doc.chunks.values_list("pk", flat=True))
+            for chunk_id in chunk_ids:
+                update_chunk_embedding.delay(chunk_id)
+            logger.info(f"Processed document {document_id}: {len(chunk_ids)} chunks")
 
+        doc.status = "completed"
+        doc.error_message = ""
+        _complete_stage(doc, "embedded", started, ["status", "error_message"])
     except Exception as e:
-        logger.error(f"Failed to process document {document_id}: {e}")
-        doc.status = "failed"
-        doc.error_message = str(e)
-        doc.save()
+        _mark_failed(self, doc, "embedded", e)
         raise self.retry(exc=e, countdown=60)
+
+
+PIPELINE_TASKS = [extract_document_text, summarize_document, chunk_document, embed_document_chunks]
+
+
+@shared_task
+def process_document(document_id: int, restart: bool = False):
+    """
+    Process an uploaded document: extract text, summarize, chunk, and embed.
+
+    Each stage is a separate idempotent task chained together. Stage output is
+    persisted on the document, so a failed stage retries on its own and re-running
+    the pipeline skips stages that already completed unless ``restart`` is set.
+    """
+    doc = _get_document(document_id)
+    if doc is None:
+        return
+
+    if restart:
+        doc.processing_stage = ""
+        doc.stage_timings = {}
+    doc.status = "processing"
+    doc.error_message = ""
+    doc.save(update_fields=["status", "error_message", "processing_stage", "stage_timings", "updated_at"])
+    publish_document_status(doc)
+
+    chain(*(stage.si(document_id) for stage in PIPELINE_TASKS)).apply_async()
@@ -0,0 +1,61 @@
+"""
+Cleanup of abandoned chunked uploads.
+
+An upload session expires DOCUMENT_UPLOAD_EXPIRY seconds after its last
+part. Expired sessions are no longer served, and expire_uploads() deletes
+them together with their partial files. Partial files without a session
+(e.g. left by a crash between the two) are removed once they are as old as
+an expired session.
+"""
+
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from documents.models import UploadSession
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = "documents/uploads"
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def expire_uploads(dry_run: bool = False) -> tuple[int, int]:
+    """Delete expired upload sessions and stale partial files; returns (sessions, files)."""
+    expired = UploadSession.objects.filter(expires_at__lte=timezone.now())
+    sessions = files = 0
+    for session in expired.iterator():
+        sessions += 1
+        path = default_storage.path(session.part_path)
+        if dry_run:
+            files += os.path.exists(path)
+            continue
+        # Delete the row first so a concurrent request cannot write to a removed file
+        session.delete()
+        files += _remove(path)
+
+    directory = default_storage.path(UPLOAD_DIR)
+    if not os.path.isdir(directory):
+        return sessions, files
+    live = {f"{pk}.part" for pk in UploadSession.objects.values_list("pk", flat=True)}
+    cutoff = time.time() - settings.DOCUMENT_UPLOAD_EXPIRY
+    for entry in os.scandir(directory):
+        if entry.name in live or not entry.is_file() or entry.stat().st_mtime > cutoff:
+            continue
+        if dry_run:
+            files += 1
+        elif _remove(entry.path):
+            files += 1
+            logger.info(f"Removed orphaned upload part {entry.name}")
+    return sessions, files
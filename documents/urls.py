@@ -10,7 +10,12 @@ app_name = "documents"
 urlpatterns = [
     path("", views.document_list, name="list"),
     path("status/", views.document_status, name="status"),
+    path("status/stream/", views.document_status_stream, name="status_stream"),
     path("new/", views.document_create, name="create"),
+    path("uploads/", views.upload_create, name="upload_create"),
+    path("uploads/<uuid:upload_id>/", views.upload_status, name="upload_status"),
+    path("uploads/<uuid:upload_id>/chunk/", views.upload_chunk, name="upload_chunk"),
+    path("uploads/<uuid:upload_id>/complete/", views.upload_complete, name="upload_complete"),
     path("<int:pk>/", views.document_detail, name="detail"),
     path("<int:pk>/delete/", views.document_delete, name="delete"),
 ]
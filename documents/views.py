@@ -2,22 +2,51 @@
 Documents views for MemoScribe.
 """
 
+import hashlib
 import os
+import re
+import shutil
+import tempfile
+import time
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import require_GET, require_POST
 
-from documents.models import Document
+from documents.models import Document, UploadSession, upload_expiry
 from documents.forms import DocumentForm
+from documents.status import get_document_statuses, get_redis, status_channel
+from core.pagination import is_partial, next_page_url, paginate_request
+
+
+UPLOAD_READ_SIZE = 64 * 1024  # Bytes read from the request stream at a time
+ALLOWED_EXTENSIONS = (".pdf", ".txt", ".md")
+
+
+def detect_file_type(file_name: str) -> str:
+    """Determine the document file type from its extension."""
+    file_name = file_name.lower()
+    if file_name.endswith(".pdf"):
+        return "pdf"
+    elif file_name.endswith(".md"):
+        return "md"
+    return "txt"
 
 
 @login_required
 def document_list(request):
     """List all documents for the current user."""
     documents = Document.objects.filter(user=request.user)
-    context = {"documents": documents}
-    return render(request, "documents/list.html", context)
+    page = paginate_request(request, documents)
+    context = {"documents": page, "next_page_url": next_page_url(request, page)}
+    template = "documents/_items.html" if is_partial(request) else "documents/list.html"
+    return render(request, template, context)
 
 
 @login_required
@@ -40,13 +69,7 @@ def document_create(request):
             document.user = request.user
 
             # Determine file type from extension
-            file_name = document.file.name.lower()
-            if file_name.endswith(".pdf"):
-                document.file_type = "pdf"
-            elif file_name.endswith(".md"):
-                document.file_type = "md"
-            else:
-                document.file_type = "txt"
+            document.file_type = detect_file_type(document.file.name)
 
             document.save()
             messages.success(request, "文書をアップロードしました。処理中...")
@@ -54,7 +77,7 @@ def document_create(request):
     else:
         form = DocumentForm()
 
-    context = {"form": form}
+    context = {"form": form, "upload_chunk_size": settings.DOCUMENT_UPLOAD_CHUNK_SIZE}
     return render(request, "documents/form.html", context)
 
 
@@ -80,13 +103,243 @@ def document_delete(request, pk):
 
 @login_required
 def document_status(request):
-    """Return document processing status for polling."""
-    documents = Document.objects.filter(user=request.user)
+    """Return document processing status, served from the status cache."""
+    ids = None
     ids_param = request.GET.get("ids", "").strip()
     if ids_param:
-        ids = [int(item) for item in ids_param.split(",") if item.isdigit()]
-        if ids:
-            documents = documents.filter(id__in=ids)
+        ids = [int(item) for item in ids_param.split(",") if item.isdigit()] or None
+
+    return JsonResponse({"documents": get_document_statuses(request.user, ids)})
+
+
+@login_required
+def document_status_stream(request):
+    """
+    Push document status transitions as server-sent events.
+
+    Subscribes to the user's Redis channel for a bounded time; the browser's
+    EventSource reconnects automatically afterwards. Each open stream holds
+    a gunicorn thread (see config/gunicorn.py).
+    """
+    channel = status_channel(request.user.pk)
+
+    def event_stream():
+        # Hand the database connection back (to the pool) instead of holding
+        # it until the stream ends; the stream itself only reads Redis
+        connection.close()
+        pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(channel)
+        try:
+            yield "retry: 3000\n\n"
+            deadline = time.monotonic() + settings.DOCUMENT_STATUS_STREAM_SECONDS
+            while time.monotonic() < deadline:
+                message = pubsub.get_message(timeout=15)
+                if message is None:
+                    yield ": keepalive\n\n"
+                    continue
+                data = message["data"]
+                if isinstance(data, bytes):
+                    data = data.decode("utf-8")
+                yield f"event: status\ndata: {data}\n\n"
+        finally:
+            pubsub.close()
+
+    response = StreamingHttpResponse(event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _upload_state(session: UploadSession) -> dict:
+    """JSON representation of an upload session for the client."""
+    state = {
+        "upload_id": str(session.pk),
+        "status": session.status,
+        "offset": session.received_bytes,
+        "total_size": session.total_size,
+        "chunk_size": settings.DOCUMENT_UPLOAD_CHUNK_SIZE,
+    }
+    if session.document_id:
+        state["document_url"] = reverse("documents:detail", kwargs={"pk": session.document_id})
+    return state
+
+
+def _live_uploads(request):
+    """The user's upload sessions that have not expired."""
+    return UploadSession.objects.filter(user=request.user, expires_at__gt=timezone.now())
+
+
+def _upload_error(session: UploadSession, message: str, status: int) -> JsonResponse:
+    return JsonResponse({**_upload_state(session), "error": message}, status=status)
+
+
+@login_required
+@require_POST
+def upload_create(request):
+    """Start a resumable chunked upload."""
+    title = request.POST.get("title", "").strip()
+    filename = os.path.basename(request.POST.get("filename", "").strip())
+    size = request.POST.get("size", "")
+    checksum = request.POST.get("checksum", "").strip().lower()
+
+    if not title or not filename.lower().endswith(ALLOWED_EXTENSIONS):
+        return JsonResponse({"error": "タイトルと対応形式（PDF, TXT, MD）のファイルを指定してください。"}, status=400)
+    if not size.isdigit() or not 0 < int(size) <= settings.DOCUMENT_UPLOAD_MAX_SIZE:
+        return JsonResponse({"error": "ファイルサイズが不正です。"}, status=400)
+    if checksum and not re.fullmatch(r"[0-9a-f]{64}", checksum):
+        return JsonResponse({"error": "チェックサムが不正です。"}, status=400)
+
+    session = UploadSession.objects.create(
+        user=request.user,
+        title=title[:255],
+        filename=filename[:255],
+        total_size=int(size),
+        checksum=checksum,
+    )
+    part_path = default_storage.path(session.part_path)
+    os.makedirs(os.path.dirname(part_path), exist_ok=True)
+    open(part_path, "wb").close()
+
+    return JsonResponse(_upload_state(session), status=201)
+
+
+@login_required
+@require_GET
+def upload_status(request, upload_id):
+    """Return the current offset of an upload so the client can resume."""
+    session = get_object_or_404(_live_uploads(request), pk=upload_id)
+    return JsonResponse(_upload_state(session))
+
+
+@login_required
+@require_POST
+def upload_chunk(request, upload_id):
+    """
+    Append one part to an upload.
+
+    The raw request body is streamed to a temporary file next to the partial
+    file, and is kept only if its offset (Upload-Offset header) still equals
+    the bytes received so far and it matches the SHA-256 in the
+    Upload-Checksum header. The network transfer runs without a transaction
+    or a database connection; the session row is locked only to append the
+    received part and advance the offset.
+    """
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        return JsonResponse({"error": "Upload-Offset ヘッダーが必要です。"}, status=400)
+    checksum = request.headers.get("Upload-Checksum", "").strip().lower()
+    if not re.fullmatch(r"[0-9a-f]{64}", checksum):
+        return JsonResponse({"error": "Upload-Checksum ヘッダー（SHA-256）が必要です。"}, status=400)
+
+    session = get_object_or_404(_live_uploads(request), pk=upload_id)
+    if session.status != "uploading":
+        return _upload_error(session, "このアップロードは既に完了しています。", 409)
+    if offset != session.received_bytes:
+        return _upload_error(session, "オフセットが一致しません。", 409)
+    # Hand the pooled connection back while the client sends the part (not
+    # possible inside an outer transaction, e.g. ATOMIC_REQUESTS or tests)
+    if not connection.in_atomic_block:
+        connection.close()
+
+    limit = min(settings.DOCUMENT_UPLOAD_CHUNK_SIZE, session.total_size - offset)
+    written = 0
+    digest = hashlib.sha256()
+    part_path = default_storage.path(session.part_path)
+    incoming = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(part_path), prefix=f"{session.pk}.", suffix=".incoming", delete=False
+    )
+    try:
+        with incoming:
+            while True:
+                data = request.read(UPLOAD_READ_SIZE)
+                if not data:
+                    break
+                written += len(data)
+                if written > limit:
+                    return _upload_error(session, "パートのサイズが大きすぎます。", 413)
+                digest.update(data)
+                incoming.write(data)
+        if digest.hexdigest() != checksum:
+            # Corrupted in transit: drop the part so the client resends it
+            return _upload_error(session, "パートのチェックサムが一致しません。", 422)
+
+        with transaction.atomic():
+            session = get_object_or_404(_live_uploads(request).select_for_update(), pk=upload_id)
+            if session.status != "uploading" or offset != session.received_bytes:
+                # Another request appended this part meanwhile
+                return _upload_error(session, "オフセットが一致しません。", 409)
+            with open(part_path, "r+b") as f, open(incoming.name, "rb") as part:
+                # Drop any bytes left behind by an interrupted append
+                f.seek(offset)
+                f.truncate()
+                shutil.copyfileobj(part, f, UPLOAD_READ_SIZE)
+            session.received_bytes = offset + written
+            session.expires_at = upload_expiry()
+            session.save(update_fields=["received_bytes", "expires_at", "updated_at"])
+    finally:
+        os.remove(incoming.name)
+
+    return JsonResponse(_upload_state(session))
+
+
+@login_required
+@require_POST
+def upload_complete(request, upload_id):
+    """
+    Verify an assembled upload and create the document, which starts processing.
+
+    Repeating the call (e.g. after a lost response) returns the same document.
+    """
+    moved = None
+    try:
+        with transaction.atomic():
+            session = get_object_or_404(_live_uploads(request).select_for_update(), pk=upload_id)
+            if session.status == "completed":
+                return JsonResponse(_upload_state(session))
+
+            part_path = default_storage.path(session.part_path)
+            if session.received_bytes != session.total_size or os.path.getsize(part_path) != session.total_size:
+                return _upload_error(session, "アップロードが完了していません。", 409)
+
+            file_type = detect_file_type(session.filename)
+            digest = hashlib.sha256()
+            with open(part_path, "rb") as f:
+                head = f.read(5)
+                digest.update(head)
+                for block in iter(lambda: f.read(UPLOAD_READ_SIZE), b""):
+                    digest.update(block)
+
+            if (session.checksum and digest.hexdigest() != session.checksum) or (file_type == "pdf" and head != b"%PDF-"):
+                # Corrupt upload: start over from the beginning
+                session.received_bytes = 0
+                session.save(update_fields=["received_bytes", "updated_at"])
+                open(part_path, "wb").close()
+                return _upload_error(session, "ファイルの検証に失敗しました。再度アップロードしてください。", 422)
+
+            # The name is shortened to fit Document.file (filenames may be longer)
+            final_name = default_storage.get_available_name(
+                f"documents/files/{session.filename}", max_length=Document._meta.get_field("file").max_length
+            )
+            document = Document(user=request.user, title=session.title, file_type=file_type)
+            document.file.name = final_name
+            document.save()
+
+            session.status = "completed"
+            session.document = document
+            session.expires_at = upload_expiry()
+            session.save(update_fields=["status", "document", "expires_at", "updated_at"])
+
+            # Move the assembled file into place without reading it into memory,
+            # last, so a failed save above leaves the partial file where it was
+            final_path = default_storage.path(final_name)
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(part_path, final_path)
+            moved = (final_path, part_path)
+    except Exception:
+        if moved:
+            # The transaction did not commit: put the file back for a retry
+            os.replace(*moved)
+        raise
 
-    data = list(documents.values("id", "status"))
-    return JsonResponse({"documents": data})
+    return JsonResponse(_upload_state(session), status=201)
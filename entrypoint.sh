@@ -16,9 +16,25 @@ python manage.py enable_pgvector || true
 echo "Running migrations..."
 python manage.py migrate --noinput
 
+# Make sure upcoming audit log partitions exist (the beat service keeps them
+# up to date; a failure here must not keep the app from starting)
+echo "Creating audit log partitions..."
+python manage.py manage_audit_partitions --create-only || echo "Audit log partitions not updated; see above"
+
+# Regenerate context snippets if the PII masking rules changed, in the
+# background on the ingest worker (retrieval masks outdated rows meanwhile)
+echo "Queueing embedding snippet refresh..."
+python manage.py refresh_snippets --background || echo "Snippet refresh not queued; see above"
+
 # Collect static files
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
+# Start each container with empty multiprocess metrics files
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+    mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 # Execute command
 exec "$@"
@@ -54,6 +54,10 @@ class DailyDigest(models.Model):
         verbose_name = "日常ダイジェスト"
         verbose_name_plural = "日常ダイジェスト"
         ordering = ["-created_at"]
+        indexes = [
+            # Per-user digest search, newest first
+            models.Index(fields=["user", "-created_at"]),
+        ]
 
     def __str__(self):
         return f"Digest: {self.log.date}"
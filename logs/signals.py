@@ -2,7 +2,7 @@
 Logs signals for digest generation.
 """
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
 from logs.models import DailyLog
@@ -11,5 +11,14 @@ from logs.models import DailyLog
 @receiver(post_save, sender=DailyLog)
 def log_saved(sender, instance, created, **kwargs):
     """Trigger digest generation when log is saved."""
+    from core import dashboard
     from logs.tasks import generate_digest
     generate_digest.delay(instance.pk)
+    dashboard.invalidate(instance.user_id, dashboard.LOG_FRAGMENTS)
+
+
+@receiver(post_delete, sender=DailyLog)
+def log_deleted(sender, instance, **kwargs):
+    """Drop the log from the cached dashboard."""
+    from core import dashboard
+    dashboard.invalidate(instance.user_id, dashboard.LOG_FRAGMENTS)
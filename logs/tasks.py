@@ -14,7 +14,7 @@ def generate_digest(self, log_id: int):
     from logs.models import DailyLog, DailyDigest
     from core.llm import llm_provider
     from retrieval.tasks import update_digest_embedding
-    from audits.models import AuditLog
+    from audits.writer import log_event
     from core.utils import calculate_token_estimate
 
     try:
@@ -41,15 +41,11 @@ def generate_digest(self, log_id: int):
 
         # Log LLM call if LLM was used
         if llm_provider.is_available():
-            AuditLog.objects.create(
-                user=log.user,
-                event_type="llm_call",
-                payload={
-                    "action": "generate_digest",
-                    "log_id": log_id,
-                    "tokens": calculate_token_estimate(log.raw_text),
-                },
-            )
+            log_event(log.user, "llm_call", {
+                "action": "generate_digest",
+                "log_id": log_id,
+                "tokens": calculate_token_estimate(log.raw_text),
+            })
 
         # Update embedding for the digest
         update_digest_embedding.delay(digest.pk)
@@ -7,6 +7,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
 
+from core.pagination import is_partial, next_page_url, paginate_request
 from logs.models import DailyLog, DailyDigest
 from logs.forms import DailyLogForm
 
@@ -15,8 +16,10 @@ from logs.forms import DailyLogForm
 def log_list(request):
     """List all daily logs for the current user."""
     logs = DailyLog.objects.filter(user=request.user).select_related("digest")
-    context = {"logs": logs}
-    return render(request, "logs/list.html", context)
+    page = paginate_request(request, logs)
+    context = {"logs": page, "next_page_url": next_page_url(request, page)}
+    template = "logs/_items.html" if is_partial(request) else "logs/list.html"
+    return render(request, template, context)
 
 
 @login_required
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:30
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build indexes without locking writes on large tables
+    atomic = False
+
+    dependencies = [
+        ("notes", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="note",
+            index=models.Index(fields=["user", "-updated_at", "-id"], name="notes_note_user_id_acdd95_idx"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:32
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Build indexes without locking writes on large tables
+    atomic = False
+
+    dependencies = [
+        ("notes", "0002_note_list_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="note",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["tags"], name="notes_note_tags_gin", opclasses=["jsonb_path_ops"]
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:35
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build indexes without locking writes on large tables
+    atomic = False
+
+    dependencies = [
+        ("notes", "0003_note_tags_gin"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="note",
+            index=models.Index(fields=["user", "-created_at"], name="notes_note_user_id_65a850_idx"),
+        ),
+    ]
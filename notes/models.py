@@ -4,6 +4,7 @@ Notes models for MemoScribe.
 
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
 from django.urls import reverse
 
 
@@ -38,6 +39,14 @@ class Note(models.Model):
         verbose_name = "メモ"
         verbose_name_plural = "メモ"
         ordering = ["-updated_at"]
+        indexes = [
+            # Keyset pagination of the note list (core.pagination)
+            models.Index(fields=["user", "-updated_at", "-id"]),
+            # Recent notes on the dashboard
+            models.Index(fields=["user", "-created_at"]),
+            # tags__contains ("@>") lookups for tag filtering
+            GinIndex(fields=["tags"], opclasses=["jsonb_path_ops"], name="notes_note_tags_gin"),
+        ]
 
     def __str__(self):
         return self.title
@@ -0,0 +1,64 @@
+"""
+Markdown rendering of note bodies, cached per note version.
+
+Rendered HTML is cached under the note id and updated_at, so an edit moves
+the note to a new key and needs no invalidation; the old entry expires after
+NOTE_HTML_CACHE_TTL. Bump RENDER_VERSION when the markdown extensions or the
+sanitizer rules change. Cache errors fall back to rendering.
+"""
+
+import logging
+import threading
+
+import bleach
+import markdown
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+RENDER_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables"]
+
+ALLOWED_TAGS = frozenset([
+    "p", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "a", "code", "pre", "em", "strong",
+    "table", "thead", "tbody", "tr", "th", "td", "br", "blockquote",
+])
+ALLOWED_ATTRIBUTES = {"a": ["href", "title"]}
+
+# Markdown and Cleaner instances are costly to build but keep parser state, so
+# each thread builds its own once and reuses it
+_local = threading.local()
+
+
+def render_markdown(text: str) -> str:
+    """Render markdown to sanitized HTML."""
+    if not hasattr(_local, "cleaner"):
+        _local.markdown = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+        _local.cleaner = bleach.Cleaner(tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES)
+    html = _local.markdown.reset().convert(text)
+    return _local.cleaner.clean(html)
+
+
+def html_cache_key(note) -> str:
+    return f"note_html:v{RENDER_VERSION}:{note.pk}:{note.updated_at.timestamp()}"
+
+
+def render_note(note) -> str:
+    """Sanitized HTML of a note's body, from the cache when this version was rendered before."""
+    key = html_cache_key(note)
+    try:
+        html = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Note HTML cache unavailable: {e}")
+        return render_markdown(note.body)
+    if html is not None:
+        return html
+
+    html = render_markdown(note.body)
+    try:
+        cache.set(key, html, settings.NOTE_HTML_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Failed to cache note HTML: {e}")
+    return html
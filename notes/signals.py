@@ -2,21 +2,36 @@
 Notes signals for embedding updates.
 """
 
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
 
 from notes.models import Note
 
 
+@receiver(post_init, sender=Note)
+def note_loaded(sender, instance, **kwargs):
+    """Remember the loaded tags so a save only adjusts the changed tag counts."""
+    from core.tags import remember_tags
+    remember_tags(instance)
+
+
 @receiver(post_save, sender=Note)
 def note_saved(sender, instance, created, **kwargs):
     """Trigger embedding update when note is saved."""
+    from core import dashboard
+    from core.tags import tags_saved
     from retrieval.tasks import update_note_embedding
     update_note_embedding.delay(instance.pk)
+    tags_saved("note", instance, created)
+    dashboard.invalidate(instance.user_id, dashboard.NOTE_FRAGMENTS)
 
 
 @receiver(post_delete, sender=Note)
 def note_deleted(sender, instance, **kwargs):
     """Clean up embeddings when note is deleted."""
+    from core import dashboard
+    from core.tags import tags_deleted
     from retrieval.tasks import delete_note_embedding
     delete_note_embedding.delay(instance.pk)
+    tags_deleted("note", instance)
+    dashboard.invalidate(instance.user_id, dashboard.NOTE_FRAGMENTS)
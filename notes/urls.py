@@ -10,6 +10,7 @@ app_name = "notes"
 urlpatterns = [
     path("", views.note_list, name="list"),
     path("new/", views.note_create, name="create"),
+    path("tags/", views.note_tags, name="tags"),
     path("<int:pk>/", views.note_detail, name="detail"),
     path("<int:pk>/edit/", views.note_edit, name="edit"),
     path("<int:pk>/delete/", views.note_delete, name="delete"),
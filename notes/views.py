@@ -2,13 +2,16 @@
 Notes views for MemoScribe.
 """
 
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-import markdown
-import bleach
+from django.http import JsonResponse
 
+from core.pagination import is_partial, next_page_url, paginate_request
+from core.tags import get_tag_counts
 from notes.models import Note
+from notes.rendering import render_note
 from notes.forms import NoteForm
 
 
@@ -22,24 +25,28 @@ def note_list(request):
     if tag:
         notes = notes.filter(tags__contains=[tag])
 
-    context = {"notes": notes, "selected_tag": tag}
+    page = paginate_request(request, notes)
+    context = {"notes": page, "selected_tag": tag, "next_page_url": next_page_url(request, page)}
+    if is_partial(request):
+        return render(request, "notes/_items.html", context)
+    context["tag_facets"] = get_tag_counts(request.user, "note", settings.TAG_FACET_LIMIT)
     return render(request, "notes/list.html", context)
 
 
+@login_required
+def note_tags(request):
+    """Return the user's note tags with counts, most used first."""
+    limit = request.GET.get("limit", "")
+    tags = get_tag_counts(request.user, "note", int(limit) if limit.isdigit() else None)
+    return JsonResponse({"tags": tags})
+
+
 @login_required
 def note_detail(request, pk):
     """Display a single note."""
     note = get_object_or_404(Note, pk=pk, user=request.user)
 
-    # Render markdown safely
-    html_body = markdown.markdown(note.body, extensions=["fenced_code", "tables"])
-    html_body = bleach.clean(
-        html_body,
-        tags=["p", "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "a", "code", "pre", "em", "strong", "table", "thead", "tbody", "tr", "th", "td", "br", "blockquote"],
-        attributes={"a": ["href", "title"]},
-    )
-
-    context = {"note": note, "html_body": html_body}
+    context = {"note": note, "html_body": render_note(note)}
     return render(request, "notes/detail.html", context)
 
 
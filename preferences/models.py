@@ -30,6 +30,10 @@ class Preference(models.Model):
         verbose_name = "好み・ルール"
         verbose_name_plural = "好み・ルール"
         ordering = ["category", "key"]
+        indexes = [
+            # Keyset pagination of the preference list (core.pagination)
+            models.Index(fields=["user", "category", "key", "id"]),
+        ]
         unique_together = [["user", "key"]]
 
     def __str__(self):
@@ -1,22 +1,34 @@
 """
-Preferences signals for embedding updates.
+Preferences signals for embedding updates and the cached user snapshot.
 """
 
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
-from preferences.models import Preference
+from preferences.models import Preference, UserSettings
 
 
 @receiver(post_save, sender=Preference)
 def preference_saved(sender, instance, created, **kwargs):
     """Trigger embedding update when preference is saved."""
+    from preferences import snapshot
     from retrieval.tasks import update_preference_embedding
     update_preference_embedding.delay(instance.pk)
+    snapshot.invalidate(instance.user_id)
 
 
 @receiver(post_delete, sender=Preference)
 def preference_deleted(sender, instance, **kwargs):
     """Clean up embeddings when preference is deleted."""
+    from preferences import snapshot
     from retrieval.tasks import delete_preference_embedding
     delete_preference_embedding.delay(instance.pk)
+    snapshot.invalidate(instance.user_id)
+
+
+@receiver(post_save, sender=UserSettings)
+@receiver(post_delete, sender=UserSettings)
+def user_settings_changed(sender, instance, **kwargs):
+    """Drop the cached snapshot when privacy settings change."""
+    from preferences import snapshot
+    snapshot.invalidate(instance.user_id)
@@ -0,0 +1,70 @@
+"""
+Per-user snapshot of privacy settings and preferences, cached in Django's cache.
+
+RetrievalService reads both on every chat turn; the snapshot makes that one
+cache get and no queries. It is dropped by the UserSettings and Preference
+post_save/post_delete signals (see invalidate()) and expires after
+USER_SNAPSHOT_CACHE_TTL for writes that bypass signals. Cache errors fall
+back to the database.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_FIELDS = ("send_notes", "send_digests", "send_docs", "send_raw_logs", "pii_masking", "llm_enabled")
+
+
+def snapshot_key(user_id: int) -> str:
+    return f"user_snapshot:{user_id}"
+
+
+def default_settings() -> dict:
+    """Settings of a user who never saved any: the environment defaults."""
+    return {field: getattr(settings, field.upper()) for field in SETTINGS_FIELDS}
+
+
+def _build(user_id: int) -> dict:
+    from preferences.models import Preference, UserSettings
+
+    row = UserSettings.objects.filter(user_id=user_id).values(*SETTINGS_FIELDS).first()
+    preferences = Preference.objects.filter(user_id=user_id).values("key", "value")
+    return {
+        "settings": row or default_settings(),
+        "preferences": list(preferences),
+    }
+
+
+def get_snapshot(user_id: int) -> dict:
+    """Return {"settings": {...}, "preferences": [{"key", "value"}, ...]} for a user."""
+    key = snapshot_key(user_id)
+    try:
+        snapshot = cache.get(key)
+    except Exception as e:
+        logger.warning(f"User snapshot cache unavailable: {e}")
+        return _build(user_id)
+    if snapshot is not None:
+        return snapshot
+
+    snapshot = _build(user_id)
+    try:
+        cache.set(key, snapshot, settings.USER_SNAPSHOT_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Failed to cache user snapshot: {e}")
+    return snapshot
+
+
+def invalidate(user_id: int):
+    """Drop a user's snapshot once the current transaction commits."""
+
+    def delete():
+        try:
+            cache.delete(snapshot_key(user_id))
+        except Exception as e:
+            logger.warning(f"Failed to invalidate user snapshot for user {user_id}: {e}")
+
+    transaction.on_commit(delete)
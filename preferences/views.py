@@ -6,6 +6,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 
+from core.pagination import is_partial, next_page_url, paginate_request
 from preferences.models import Preference
 from preferences.forms import PreferenceForm
 
@@ -14,17 +15,17 @@ from preferences.forms import PreferenceForm
 def preference_list(request):
     """List all preferences for the current user."""
     preferences = Preference.objects.filter(user=request.user)
+    page = paginate_request(request, preferences)
 
-    # Group by category
-    grouped = {}
-    for pref in preferences:
-        cat = pref.get_category_display()
-        if cat not in grouped:
-            grouped[cat] = []
-        grouped[cat].append(pref)
+    # Group by category (the ordering's first field); a page continuing a category adds no header
+    previous = page.after[0] if page.after else None
+    for pref in page:
+        pref.starts_group = pref.category != previous
+        previous = pref.category
 
-    context = {"preferences": preferences, "grouped": grouped}
-    return render(request, "preferences/list.html", context)
+    context = {"preferences": page, "next_page_url": next_page_url(request, page)}
+    template = "preferences/_items.html" if is_partial(request) else "preferences/list.html"
+    return render(request, template, context)
 
 
 @login_required
@@ -0,0 +1,44 @@
+"""
+Re-embed content whose vectors came from a different embedding backend.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.llm import llm_provider
+from retrieval.models import Embedding
+from retrieval import tasks
+
+UPDATE_TASKS = {
+    "note": tasks.update_note_embedding,
+    "digest": tasks.update_digest_embedding,
+    "chunk": tasks.update_chunk_embedding,
+    "task": tasks.update_task_embedding,
+    "preference": tasks.update_preference_embedding,
+}
+
+
+class Command(BaseCommand):
+    help = "Queue embedding updates for rows not embedded with the current backend (e.g. after switching EMBEDDING_BACKEND)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sync", action="store_true", help="Run updates in this process instead of queueing them")
+
+    def handle(self, *args, **options):
+        backend = llm_provider.embedding_backend
+        rows = (
+            Embedding.objects.exclude(vector_backend=backend)
+            .order_by("pk")
+            .values_list("content_type", "content_id")
+        )
+
+        count = 0
+        for content_type, content_id in rows.iterator():
+            task = UPDATE_TASKS[content_type]
+            if options["sync"]:
+                task.apply(args=(content_id,))
+            else:
+                task.delay(content_id)
+            count += 1
+
+        verb = "Re-embedded" if options["sync"] else "Queued"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {count} embeddings for backend {backend}"))
@@ -0,0 +1,39 @@
+"""
+Regenerate stored context snippets after the PII masking rules change.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.utils import PII_MASKING_VERSION
+from retrieval.tasks import refresh_snippet_batch, start_snippet_refresh
+
+
+class Command(BaseCommand):
+    help = "Regenerate raw and PII-masked snippets for embeddings built with older masking rules"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows updated per query")
+        parser.add_argument("--all", action="store_true", help="Regenerate every snippet, not only outdated ones")
+        parser.add_argument(
+            "--background", action="store_true",
+            help="Queue the backfill as Celery tasks (ingest queue) instead of running it here",
+        )
+
+    def handle(self, *args, **options):
+        if options["background"]:
+            if start_snippet_refresh():
+                self.stdout.write(self.style.SUCCESS("Queued the snippet backfill"))
+            else:
+                self.stdout.write("A snippet backfill is already queued")
+            return
+
+        total = 0
+        last_pk = 0
+        while True:
+            count, last_pk = refresh_snippet_batch(last_pk, options["batch_size"], options["all"])
+            if not count:
+                break
+            total += count
+            self.stdout.write(f"Updated {total} snippets...")
+
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {total} snippets (masking rules v{PII_MASKING_VERSION})"))
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("retrieval", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="embedding",
+            name="masked_snippet",
+            field=models.TextField(blank=True, verbose_name="マスク済みスニペット"),
+        ),
+        migrations.AddField(
+            model_name="embedding",
+            name="masking_version",
+            field=models.PositiveSmallIntegerField(default=0, verbose_name="マスキングルール版"),
+        ),
+        migrations.AddField(
+            model_name="embedding",
+            name="snippet",
+            field=models.TextField(blank=True, verbose_name="スニペット"),
+        ),
+        migrations.AddIndex(
+            model_name="embedding",
+            index=models.Index(fields=["masking_version"], name="retrieval_e_masking_cb4f9a_idx"),
+        ),
+    ]
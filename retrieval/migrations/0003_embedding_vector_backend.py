@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def label_existing_vectors(apps, schema_editor):
+    """Vectors stored before this migration all came from the API embedding model."""
+    Embedding = apps.get_model("retrieval", "Embedding")
+    Embedding.objects.filter(vector__isnull=False).update(vector_backend=f"openai:{settings.EMBEDDING_MODEL}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("retrieval", "0002_embedding_snippets"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="embedding",
+            name="vector_backend",
+            field=models.CharField(blank=True, max_length=100, verbose_name="埋め込みバックエンド"),
+        ),
+        migrations.AddIndex(
+            model_name="embedding",
+            index=models.Index(fields=["user", "vector_backend"], name="retrieval_e_user_id_256224_idx"),
+        ),
+        migrations.RunPython(label_existing_vectors, migrations.RunPython.noop),
+    ]
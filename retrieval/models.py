@@ -25,6 +25,11 @@ class Embedding(models.Model):
     content_text = models.TextField("コンテンツテキスト")
     content_title = models.CharField("タイトル", max_length=255, blank=True)
     vector = VectorField(dimensions=1536, null=True, blank=True)  # text-embedding-3-small
+    vector_backend = models.CharField("埋め込みバックエンド", max_length=100, blank=True)
+    # Precomputed at write time so retrieval does no masking work per query
+    snippet = models.TextField("スニペット", blank=True)
+    masked_snippet = models.TextField("マスク済みスニペット", blank=True)
+    masking_version = models.PositiveSmallIntegerField("マスキングルール版", default=0)
     created_at = models.DateTimeField("作成日時", auto_now_add=True)
     updated_at = models.DateTimeField("更新日時", auto_now=True)
 
@@ -34,6 +39,8 @@ class Embedding(models.Model):
         unique_together = [["content_type", "content_id"]]
         indexes = [
             models.Index(fields=["user", "content_type"]),
+            models.Index(fields=["user", "vector_backend"]),
+            models.Index(fields=["masking_version"]),
         ]
 
     def __str__(self):
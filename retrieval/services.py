@@ -6,14 +6,13 @@ Handles RAG (Retrieval Augmented Generation) operations.
 import logging
 from typing import Optional
 
-from django.conf import settings
 from django.contrib.auth.models import User
 from pgvector.django import L2Distance
 
 from retrieval.models import Embedding
-from preferences.models import Preference, UserSettings
+from preferences.snapshot import get_snapshot
 from core.llm import llm_provider
-from core.utils import mask_pii
+from core.utils import PII_MASKING_VERSION, SNIPPET_LENGTH, build_snippets, mask_pii
 
 logger = logging.getLogger(__name__)
 
@@ -23,29 +22,9 @@ class RetrievalService:
 
     def __init__(self, user: User):
         self.user = user
-        self.settings = self._get_user_settings()
-
-    def _get_user_settings(self) -> dict:
-        """Get user settings with fallback to environment variables."""
-        try:
-            user_settings = UserSettings.objects.get(user=self.user)
-            return {
-                "send_notes": user_settings.send_notes,
-                "send_digests": user_settings.send_digests,
-                "send_docs": user_settings.send_docs,
-                "send_raw_logs": user_settings.send_raw_logs,
-                "pii_masking": user_settings.pii_masking,
-                "llm_enabled": user_settings.llm_enabled,
-            }
-        except UserSettings.DoesNotExist:
-            return {
-                "send_notes": settings.SEND_NOTES,
-                "send_digests": settings.SEND_DIGESTS,
-                "send_docs": settings.SEND_DOCS,
-                "send_raw_logs": settings.SEND_RAW_LOGS,
-                "pii_masking": settings.PII_MASKING,
-                "llm_enabled": settings.LLM_ENABLED,
-            }
+        # Settings (with fallback to environment variables) and preferences, cached per user
+        self._snapshot = get_snapshot(user.pk)
+        self.settings = dict(self._snapshot["settings"])
 
     def _get_allowed_content_types(self) -> list[str]:
         """Get list of content types allowed to be sent to LLM."""
@@ -71,7 +50,7 @@ class RetrievalService:
         Returns:
             List of context items with id, type, title, content
         """
-        if not llm_provider.is_available():
+        if not llm_provider.embeddings_available():
             # Fall back to keyword search
             return self._keyword_search(query, top_k)
 
@@ -88,23 +67,32 @@ class RetrievalService:
             Embedding.objects.filter(
                 user=self.user,
                 content_type__in=allowed_types,
+                vector_backend=llm_provider.embedding_backend,
                 vector__isnull=False,
             )
+            .only("content_id", "content_type", "content_title", "snippet", "masked_snippet", "masking_version")
             .annotate(distance=L2Distance("vector", query_vector))
             .order_by("distance")[:top_k]
         )
 
+        results = list(results)
+        # Rows not yet backfilled by refresh_snippets need their full text, fetched in one query
+        stale = [r.pk for r in results if r.masking_version != PII_MASKING_VERSION]
+        stale_texts = dict(Embedding.objects.filter(pk__in=stale).values_list("pk", "content_text")) if stale else {}
+
         context_items = []
         for r in results:
-            content = r.content_text
-            if self.settings["pii_masking"]:
-                content = mask_pii(content)
+            if r.masking_version == PII_MASKING_VERSION:
+                snippet, masked_snippet = r.snippet, r.masked_snippet
+            else:
+                snippet, masked_snippet = build_snippets(stale_texts[r.pk])
+            content = masked_snippet if self.settings["pii_masking"] else snippet
 
             context_items.append({
                 "id": r.content_id,
                 "type": r.content_type,
                 "title": r.content_title,
-                "content": content[:500],  # Limit content length
+                "content": content,
             })
 
         return context_items
@@ -134,7 +122,7 @@ class RetrievalService:
                     "id": note.pk,
                     "type": "note",
                     "title": note.title,
-                    "content": content[:500],
+                    "content": content[:SNIPPET_LENGTH],
                 })
 
         # Search digests
@@ -151,7 +139,7 @@ class RetrievalService:
                     "id": digest.pk,
                     "type": "digest",
                     "title": f"ダイジェスト: {digest.log.date}",
-                    "content": content[:500],
+                    "content": content[:SNIPPET_LENGTH],
                 })
 
         # Search document chunks
@@ -168,7 +156,7 @@ class RetrievalService:
                     "id": chunk.pk,
                     "type": "chunk",
                     "title": f"{chunk.document.title} - Chunk {chunk.chunk_index}",
-                    "content": content[:500],
+                    "content": content[:SNIPPET_LENGTH],
                 })
 
         # Search tasks
@@ -185,12 +173,11 @@ class RetrievalService:
                 "id": task.pk,
                 "type": "task",
                 "title": task.title,
-                "content": content[:500],
+                "content": content[:SNIPPET_LENGTH],
             })
 
         return results[:limit]
 
     def get_user_preferences(self) -> list[dict]:
         """Get user preferences for LLM context."""
-        prefs = Preference.objects.filter(user=self.user)
-        return [{"key": p.key, "value": p.value} for p in prefs]
+        return [dict(p) for p in self._snapshot["preferences"]]
@@ -5,6 +5,8 @@ Celery tasks for embedding generation.
 import logging
 from celery import shared_task
 
+from core import tracing
+
 logger = logging.getLogger(__name__)
 
 
@@ -12,6 +14,7 @@ def generate_and_store_embedding(content_type: str, content_id: int, user_id: in
     """Generate embedding and store in database."""
     from retrieval.models import Embedding
     from core.llm import llm_provider
+    from core.utils import PII_MASKING_VERSION, build_snippets
     from django.contrib.auth.models import User
 
     if not text:
@@ -28,20 +31,76 @@ def generate_and_store_embedding(content_type: str, content_id: int, user_id: in
     vector = llm_provider.generate_embedding(text[:8000])
 
     # Create or update embedding record
-    Embedding.objects.update_or_create(
-        content_type=content_type,
-        content_id=content_id,
-        defaults={
-            "user": user,
-            "content_text": text[:10000],  # Store truncated text
-            "content_title": title[:255],
-            "vector": vector,
-        },
-    )
+    content_text = text[:10000]  # Store truncated text
+    snippet, masked_snippet = build_snippets(content_text)
+    with tracing.span("db.store_embedding", content_type=content_type):
+        Embedding.objects.update_or_create(
+            content_type=content_type,
+            content_id=content_id,
+            defaults={
+                "user": user,
+                "content_text": content_text,
+                "content_title": title[:255],
+                "vector": vector,
+                "vector_backend": llm_provider.embedding_backend if vector else "",
+                "snippet": snippet,
+                "masked_snippet": masked_snippet,
+                "masking_version": PII_MASKING_VERSION,
+            },
+        )
 
     logger.info(f"Updated embedding for {content_type}:{content_id}")
 
 
+REFRESH_SNIPPETS_KEY = "retrieval:refresh_snippets"
+
+
+def refresh_snippet_batch(last_pk: int = 0, batch_size: int = 1000, everything: bool = False) -> tuple[int, int]:
+    """
+    Regenerate the snippets of up to `batch_size` embeddings after `last_pk`
+    built with older masking rules (every embedding with `everything`).
+    Returns (rows updated, last pk); (0, last_pk) when none are left.
+    """
+    from core.utils import PII_MASKING_VERSION, build_snippets
+    from retrieval.models import Embedding
+
+    queryset = Embedding.objects.all()
+    if not everything:
+        queryset = queryset.exclude(masking_version=PII_MASKING_VERSION)
+    batch = list(queryset.filter(pk__gt=last_pk).order_by("pk").only("pk", "content_text")[:batch_size])
+    if not batch:
+        return 0, last_pk
+    for embedding in batch:
+        embedding.snippet, embedding.masked_snippet = build_snippets(embedding.content_text)
+        embedding.masking_version = PII_MASKING_VERSION
+    Embedding.objects.bulk_update(batch, ["snippet", "masked_snippet", "masking_version"])
+    return len(batch), batch[-1].pk
+
+
+def start_snippet_refresh() -> bool:
+    """Queue the background snippet backfill unless one is already queued or running."""
+    from django.core.cache import cache
+
+    if not cache.add(REFRESH_SNIPPETS_KEY, 1, 3600):
+        return False
+    refresh_snippets.delay()
+    return True
+
+
+@shared_task(ignore_result=True)
+def refresh_snippets(last_pk: int = 0, batch_size: int = 1000):
+    """Backfill snippets one batch per task, so other ingest work runs in between."""
+    from django.core.cache import cache
+
+    count, last_pk = refresh_snippet_batch(last_pk, batch_size)
+    if not count:
+        cache.delete(REFRESH_SNIPPETS_KEY)
+        return
+    logger.info(f"Refreshed snippets up to embedding {last_pk}")
+    cache.touch(REFRESH_SNIPPETS_KEY, 3600)
+    refresh_snippets.delay(last_pk, batch_size)
+
+
 @shared_task(bind=True, max_retries=3)
 def update_note_embedding(self, note_id: int):
     """Update embedding for a note."""
@@ -194,6 +194,7 @@ document.addEventListener('DOMContentLoaded', function() {
         if (!table) return;
         const statusUrl = table.getAttribute('data-status-url');
         if (!statusUrl) return;
+        const streamUrl = table.getAttribute('data-stream-url');
 
         const statusMap = {
             pending: { label: '待機中', className: 'bg-secondary' },
@@ -202,33 +203,41 @@ document.addEventListener('DOMContentLoaded', function() {
             failed: { label: '失敗', className: 'bg-danger' },
         };
 
+        function currentRows() {
+            return Array.from(table.querySelectorAll('[data-doc-id]'));
+        }
+
         function hasPending(rows) {
             return rows.some(row => ['pending', 'processing'].includes(row.dataset.status));
         }
 
-        function updateBadge(badge, status) {
+        function updateBadge(badge, status, progress) {
             const map = statusMap[status] || statusMap.pending;
             badge.className = `badge ${map.className}`;
-            badge.textContent = map.label;
+            badge.textContent = status === 'processing' && progress ? `${map.label} ${progress}%` : map.label;
         }
 
-        function poll() {
-            const rows = Array.from(table.querySelectorAll('[data-doc-id]'));
-            if (!rows.length) return;
+        function applyStatus(doc) {
+            const row = table.querySelector(`[data-doc-id="${doc.id}"]`);
+            if (!row) return;
+            row.dataset.status = doc.status;
+            const badge = row.querySelector('[data-doc-status]');
+            if (badge) updateBadge(badge, doc.status, doc.progress);
+        }
+
+        function fetchStatuses() {
+            const rows = currentRows();
+            if (!rows.length) return Promise.resolve();
             const ids = rows.map(row => row.dataset.docId).join(',');
-            fetch(`${statusUrl}?ids=${encodeURIComponent(ids)}`, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+            return fetch(`${statusUrl}?ids=${encodeURIComponent(ids)}`, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
                 .then(response => response.json())
-                .then(data => {
-                    const docs = data.documents || [];
-                    docs.forEach(doc => {
-                        const row = table.querySelector(`[data-doc-id="${doc.id}"]`);
-                        if (!row) return;
-                        row.dataset.status = doc.status;
-                        const badge = row.querySelector('[data-doc-status]');
-                        if (badge) updateBadge(badge, doc.status);
-                    });
+                .then(data => (data.documents || []).forEach(applyStatus));
+        }
 
-                    if (hasPending(rows)) {
+        function poll() {
+            fetchStatuses()
+                .then(function() {
+                    if (hasPending(currentRows())) {
                         setTimeout(poll, 5000);
                     }
                 })
@@ -237,14 +246,198 @@ document.addEventListener('DOMContentLoaded', function() {
                 });
         }
 
-        const rows = Array.from(table.querySelectorAll('[data-doc-id]'));
-        if (hasPending(rows)) {
+        function listen() {
+            const source = new EventSource(streamUrl);
+            // Catch up on transitions published before the stream connected
+            source.addEventListener('open', function() {
+                fetchStatuses().catch(function() {});
+            });
+            source.addEventListener('status', function(e) {
+                try {
+                    applyStatus(JSON.parse(e.data));
+                } catch (err) {
+                    // Ignore malformed events
+                }
+                if (!hasPending(currentRows())) {
+                    source.close();
+                }
+            });
+        }
+
+        if (!hasPending(currentRows())) return;
+        if (streamUrl && window.EventSource) {
+            listen();
+        } else {
             poll();
         }
     }
 
+    function setupChunkedUpload() {
+        const form = document.querySelector('form[data-chunked-upload]');
+        // Parts are sent with their SHA-256; without Web Crypto (e.g. plain HTTP) the form uploads normally
+        if (!form || !window.fetch || !(window.crypto && window.crypto.subtle)) return;
+        const uploadUrl = form.getAttribute('data-upload-url');
+        const chunkSize = parseInt(form.getAttribute('data-chunk-size'), 10) || 5 * 1024 * 1024;
+        const fileInput = form.querySelector('input[type="file"]');
+        const titleInput = form.querySelector('[name="title"]');
+        const progress = form.querySelector('[data-upload-progress]');
+        const progressBar = progress ? progress.querySelector('.progress-bar') : null;
+        const progressMessage = progress ? progress.querySelector('[data-upload-message]') : null;
+        const csrfInput = form.querySelector('[name="csrfmiddlewaretoken"]');
+        const csrfToken = csrfInput ? csrfInput.value : '';
+
+        function showProgress(offset, total, message) {
+            if (!progress) return;
+            progress.classList.remove('d-none');
+            const percent = total ? Math.floor(offset / total * 100) : 0;
+            progressBar.style.width = `${percent}%`;
+            progressBar.setAttribute('aria-valuenow', percent);
+            progressMessage.textContent = message || `${percent}%`;
+        }
+
+        function request(url, options) {
+            const headers = Object.assign({ 'X-CSRFToken': csrfToken }, options.headers || {});
+            return fetch(url, Object.assign({}, options, { headers: headers, credentials: 'same-origin' }))
+                .then(response => response.json().then(data => ({ ok: response.ok, status: response.status, data: data })));
+        }
+
+        function sha256Hex(blob) {
+            return blob.arrayBuffer()
+                .then(buffer => window.crypto.subtle.digest('SHA-256', buffer))
+                .then(hash => Array.from(new Uint8Array(hash), b => b.toString(16).padStart(2, '0')).join(''));
+        }
+
+        function startOrResume(file, storageKey) {
+            let savedId = null;
+            try {
+                savedId = localStorage.getItem(storageKey);
+            } catch (err) {
+                // Ignore localStorage errors
+            }
+            if (savedId) {
+                return request(`${uploadUrl}${savedId}/`, { method: 'GET' }).then(result => {
+                    if (result.ok && result.data.status === 'uploading') return result.data;
+                    return startOrResume(file, null);
+                });
+            }
+            const body = new FormData();
+            body.append('title', titleInput ? titleInput.value : file.name);
+            body.append('filename', file.name);
+            body.append('size', file.size);
+            return request(uploadUrl, { method: 'POST', body: body }).then(result => {
+                if (!result.ok) throw new Error(result.data.error || 'アップロードを開始できませんでした。');
+                try {
+                    if (storageKey) localStorage.setItem(storageKey, result.data.upload_id);
+                } catch (err) {
+                    // Ignore localStorage errors
+                }
+                return result.data;
+            });
+        }
+
+        function sendChunks(file, state, attempt) {
+            if (state.offset >= file.size) return Promise.resolve(state);
+            const base = `${uploadUrl}${state.upload_id}/`;
+            const end = Math.min(state.offset + chunkSize, file.size);
+            const part = file.slice(state.offset, end);
+            showProgress(state.offset, file.size);
+            return sha256Hex(part).then(checksum => request(`${base}chunk/`, {
+                method: 'POST',
+                headers: {
+                    'Upload-Offset': String(state.offset),
+                    'Upload-Checksum': checksum,
+                    'Content-Type': 'application/octet-stream',
+                },
+                body: part,
+            })).then(result => {
+                // 409 carries the server offset, so resuming is the same as continuing
+                if (result.ok || result.status === 409) return { state: result.data, attempt: 0 };
+                throw new Error(result.data.error || 'アップロードに失敗しました。');
+            }).catch(err => {
+                if (attempt >= 5) throw err;
+                const delay = 1000 * Math.pow(2, attempt);
+                showProgress(state.offset, file.size, '接続が切れました。再開しています...');
+                return new Promise(resolve => setTimeout(resolve, delay))
+                    .then(() => request(base, { method: 'GET' }))
+                    .then(
+                        result => ({ state: result.ok ? result.data : state, attempt: attempt + 1 }),
+                        () => ({ state: state, attempt: attempt + 1 })
+                    );
+            }).then(next => sendChunks(file, next.state, next.attempt));
+        }
+
+        form.addEventListener('submit', function(e) {
+            const file = fileInput && fileInput.files[0];
+            if (!file || file.size <= chunkSize) return;
+            e.preventDefault();
+            const storageKey = `memoscribe:upload:${file.name}:${file.size}:${file.lastModified}`;
+            const submitButton = form.querySelector('[type="submit"]');
+            if (submitButton) submitButton.disabled = true;
+
+            startOrResume(file, storageKey)
+                .then(state => sendChunks(file, state, 0))
+                .then(state => request(`${uploadUrl}${state.upload_id}/complete/`, { method: 'POST' }))
+                .then(result => {
+                    if (!result.ok) throw new Error(result.data.error || 'ファイルの検証に失敗しました。');
+                    try {
+                        localStorage.removeItem(storageKey);
+                    } catch (err) {
+                        // Ignore localStorage errors
+                    }
+                    showProgress(file.size, file.size, '完了しました。処理を開始します...');
+                    window.location.href = result.data.document_url;
+                })
+                .catch(err => {
+                    showProgress(0, file.size, err.message);
+                    if (submitButton) submitButton.disabled = false;
+                });
+        });
+    }
+
+    function setupInfiniteScroll() {
+        if (!window.IntersectionObserver || !window.fetch) return;
+        let loading = false;
+
+        function loadNext(sentinel, observer) {
+            if (loading) return;
+            loading = true;
+            observer.unobserve(sentinel);
+            fetch(sentinel.getAttribute('data-next-page'), {
+                headers: { 'X-Requested-With': 'XMLHttpRequest' },
+                credentials: 'same-origin',
+            })
+                .then(response => {
+                    if (!response.ok) throw new Error(response.statusText);
+                    return response.text();
+                })
+                .then(html => {
+                    // The partial holds the next rows and, if more remain, a new sentinel
+                    const template = document.createElement('template');
+                    template.innerHTML = html.trim();
+                    const next = template.content.querySelector('[data-next-page]');
+                    sentinel.replaceWith(template.content);
+                    if (next) observer.observe(next);
+                })
+                .catch(function() {
+                    // Leave the "さらに表示" link for a manual retry
+                })
+                .finally(function() {
+                    loading = false;
+                });
+        }
+
+        const observer = new IntersectionObserver(function(entries) {
+            entries.forEach(entry => {
+                if (entry.isIntersecting) loadNext(entry.target, observer);
+            });
+        }, { rootMargin: '400px 0px' });
+        document.querySelectorAll('[data-next-page]').forEach(sentinel => observer.observe(sentinel));
+    }
+
     setupDraftForms();
     setupSuggestionChips();
+    setupInfiniteScroll();
     setupDocumentStatusPolling();
+    setupChunkedUpload();
     updateAria();
 });
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:32
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Build indexes without locking writes on large tables
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0002_task_list_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="task",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["tags"], name="tasks_task_tags_gin", opclasses=["jsonb_path_ops"]
+            ),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:35
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build indexes without locking writes on large tables
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0003_task_tags_gin"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                fields=["user", "status", "-priority", "due_at", "-created_at", "-id"],
+                name="tasks_task_user_id_92206b_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("status__in", ["todo", "doing"])),
+                fields=["user", "due_at", "-priority"],
+                name="tasks_task_open_due_idx",
+            ),
+        ),
+    ]
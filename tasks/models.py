@@ -3,7 +3,9 @@ Tasks models for MemoScribe.
 """
 
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
 from django.urls import reverse
 
 
@@ -37,6 +39,20 @@ class Task(models.Model):
         verbose_name = "タスク"
         verbose_name_plural = "タスク"
         ordering = ["-priority", "due_at", "-created_at"]
+        indexes = [
+            # Keyset pagination of the task list (core.pagination)
+            models.Index(fields=["user", "-priority", "due_at", "-created_at", "-id"]),
+            # The same for the list filtered by ?status=
+            models.Index(fields=["user", "status", "-priority", "due_at", "-created_at", "-id"]),
+            # Upcoming open tasks on the dashboard; done tasks are most rows and never read here
+            models.Index(
+                fields=["user", "due_at", "-priority"],
+                condition=Q(status__in=["todo", "doing"]),
+                name="tasks_task_open_due_idx",
+            ),
+            # tags__contains ("@>") lookups for tag filtering
+            GinIndex(fields=["tags"], opclasses=["jsonb_path_ops"], name="tasks_task_tags_gin"),
+        ]
 
     def __str__(self):
         return self.title
@@ -2,21 +2,36 @@
 Tasks signals for embedding updates.
 """
 
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_init, post_save, post_delete
 from django.dispatch import receiver
 
 from tasks.models import Task
 
 
+@receiver(post_init, sender=Task)
+def task_loaded(sender, instance, **kwargs):
+    """Remember the loaded tags so a save only adjusts the changed tag counts."""
+    from core.tags import remember_tags
+    remember_tags(instance)
+
+
 @receiver(post_save, sender=Task)
 def task_saved(sender, instance, created, **kwargs):
     """Trigger embedding update when task is saved."""
+    from core import dashboard
+    from core.tags import tags_saved
     from retrieval.tasks import update_task_embedding
     update_task_embedding.delay(instance.pk)
+    tags_saved("task", instance, created)
+    dashboard.invalidate(instance.user_id, dashboard.TASK_FRAGMENTS)
 
 
 @receiver(post_delete, sender=Task)
 def task_deleted(sender, instance, **kwargs):
     """Clean up embeddings when task is deleted."""
+    from core import dashboard
+    from core.tags import tags_deleted
     from retrieval.tasks import delete_task_embedding
     delete_task_embedding.delay(instance.pk)
+    tags_deleted("task", instance)
+    dashboard.invalidate(instance.user_id, dashboard.TASK_FRAGMENTS)
@@ -10,6 +10,7 @@ app_name = "tasks"
 urlpatterns = [
     path("", views.task_list, name="list"),
     path("new/", views.task_create, name="create"),
+    path("tags/", views.task_tags, name="tags"),
     path("<int:pk>/", views.task_detail, name="detail"),
     path("<int:pk>/edit/", views.task_edit, name="edit"),
     path("<int:pk>/delete/", views.task_delete, name="delete"),
@@ -2,10 +2,14 @@
 Tasks views for MemoScribe.
 """
 
+from django.conf import settings
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.http import JsonResponse
 
+from core.pagination import is_partial, next_page_url, paginate_request
+from core.tags import get_tag_counts
 from tasks.models import Task
 from tasks.forms import TaskForm
 
@@ -25,14 +29,27 @@ def task_list(request):
     if tag:
         tasks = tasks.filter(tags__contains=[tag])
 
+    page = paginate_request(request, tasks)
     context = {
-        "tasks": tasks,
+        "tasks": page,
         "selected_status": status,
         "selected_tag": tag,
+        "next_page_url": next_page_url(request, page),
     }
+    if is_partial(request):
+        return render(request, "tasks/_items.html", context)
+    context["tag_facets"] = get_tag_counts(request.user, "task", settings.TAG_FACET_LIMIT)
     return render(request, "tasks/list.html", context)
 
 
+@login_required
+def task_tags(request):
+    """Return the user's task tags with counts, most used first."""
+    limit = request.GET.get("limit", "")
+    tags = get_tag_counts(request.user, "task", int(limit) if limit.isdigit() else None)
+    return JsonResponse({"tags": tags})
+
+
 @login_required
 def task_detail(request, pk):
     """Display a single task."""
@@ -2,9 +2,15 @@
 
 import os
 import django
-from django.conf import settings
+import pytest
 
 
 def pytest_configure():
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
     django.setup()
+
+
+@pytest.fixture(autouse=True)
+def sync_audit_sink(settings):
+    """Write audit events immediately instead of buffering them in Redis."""
+    settings.AUDIT_SINK = "sync"
@@ -0,0 +1,334 @@
+"""Tests for document processing and upload."""
+
+import pytest
+from django.contrib.auth.models import User
+
+
+@pytest.fixture
+def user(db):
+    """Create a test user."""
+    return User.objects.create_user(username="testuser", password="testpass123")
+
+
+@pytest.fixture
+def document(user, settings, tmp_path):
+    """A text document waiting in the pipeline."""
+    from django.core.files.base import ContentFile
+    from documents.models import Document
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    settings.MEDIA_ROOT = str(tmp_path)
+    doc = Document(user=user, title="議事録", file_type="txt", status="processing")
+    doc.file.save("minutes.txt", ContentFile("本日の議題。".encode("utf-8")), save=False)
+    doc.save()
+    return doc
+
+
+@pytest.mark.django_db
+class TestDocumentPipeline:
+    """Tests for the staged document processing tasks."""
+
+    def test_completed_stages_are_skipped(self, document, monkeypatch):
+        from documents import tasks
+
+        def unexpected(*args):
+            raise AssertionError("completed stage ran again")
+
+        document.extracted_text = "抽出済みの本文"
+        document.summary = "要約"
+        document.processing_stage = "summarized"
+        document.save()
+        monkeypatch.setattr(tasks, "extract_text_from_file", unexpected)
+
+        tasks.extract_document_text.apply(args=[document.pk], throw=True)
+        tasks.summarize_document.apply(args=[document.pk], throw=True)
+        tasks.chunk_document.apply(args=[document.pk], throw=True)
+
+        document.refresh_from_db()
+        assert document.processing_stage == "chunked"
+        assert document.summary == "要約"
+        assert list(document.chunks.values_list("content", flat=True)) == ["抽出済みの本文"]
+
+    def test_retry_resumes_failed_stage(self, document, monkeypatch):
+        from documents import tasks
+        from documents.models import Document
+
+        statuses = []
+
+        def flaky(path, file_type):
+            statuses.append(Document.objects.get(pk=document.pk).status)
+            if len(statuses) == 1:
+                raise OSError("file busy")
+            return "本日の議題。"
+
+        monkeypatch.setattr(tasks, "extract_text_from_file", flaky)
+        assert tasks.extract_document_text.apply(args=[document.pk]).successful()
+
+        document.refresh_from_db()
+        # Still processing while the retry was pending, not failed
+        assert statuses == ["processing", "processing"]
+        assert document.status == "processing"
+        assert document.processing_stage == "extracted"
+        assert document.extracted_text == "本日の議題。"
+
+    def test_failed_only_after_retries_exhausted(self, document, monkeypatch):
+        from documents import tasks
+        from documents.models import Document
+
+        statuses = []
+
+        def broken(path, file_type):
+            statuses.append(Document.objects.get(pk=document.pk).status)
+            raise OSError("unreadable")
+
+        monkeypatch.setattr(tasks, "extract_text_from_file", broken)
+        result = tasks.extract_document_text.apply(args=[document.pk])
+
+        assert result.failed()
+        assert statuses == ["processing"] * (tasks.extract_document_text.max_retries + 1)
+        document.refresh_from_db()
+        assert document.status == "failed"
+        assert document.error_message == "unreadable"
+        assert document.processing_stage == ""
+
+
+@pytest.mark.django_db
+class TestDocumentStatus:
+    """Tests for the cache-served document status endpoint."""
+
+    def test_served_from_cache(self, client, user, document, django_assert_max_num_queries):
+        from django.urls import reverse
+        from documents.status import publish_document_status
+
+        # The cache is ahead of the row: the response must come from the cache
+        document.processing_stage = "summarized"
+        publish_document_status(document)
+        client.force_login(user)
+        with django_assert_max_num_queries(2):  # Session and user only
+            response = client.get(reverse("documents:status"), {"ids": str(document.pk)})
+        assert response.json() == {
+            "documents": [{"id": document.pk, "status": "processing", "stage": "summarized", "progress": 50}]
+        }
+
+    def test_eviction_falls_back_to_database_for_own_documents(self, client, user, document):
+        from django.core.cache import cache
+        from django.urls import reverse
+        from documents.models import Document
+        from documents.status import status_cache_key
+
+        other = User.objects.create_user(username="other", password="testpass123")
+        foreign = Document.objects.create(user=other, title="他人の文書", file_type="txt", status="completed")
+        cache.clear()
+        client.force_login(user)
+
+        response = client.get(reverse("documents:status"), {"ids": f"{document.pk},{foreign.pk}"})
+        assert [d["id"] for d in response.json()["documents"]] == [document.pk]
+        assert cache.get(status_cache_key(document.pk))["status"] == "processing"
+
+        # Without ids every document of the user is listed
+        response = client.get(reverse("documents:status"))
+        assert [d["id"] for d in response.json()["documents"]] == [document.pk]
+
+
+def _sha256(data: bytes) -> str:
+    import hashlib
+
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def uploads(client, user, settings, tmp_path):
+    """A logged-in client with small upload parts and media in a temporary directory."""
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.DOCUMENT_UPLOAD_CHUNK_SIZE = 4
+    client.force_login(user)
+    return client
+
+
+def _create(client, content: bytes, filename="notes.txt", **extra):
+    from django.urls import reverse
+
+    data = {"title": "分割アップロード", "filename": filename, "size": len(content), **extra}
+    return client.post(reverse("documents:upload_create"), data)
+
+
+def _send(client, upload_id, offset: int, part: bytes, checksum=None):
+    from django.urls import reverse
+
+    return client.post(
+        reverse("documents:upload_chunk", kwargs={"upload_id": upload_id}),
+        data=part,
+        content_type="application/octet-stream",
+        headers={"Upload-Offset": str(offset), "Upload-Checksum": _sha256(part) if checksum is None else checksum},
+    )
+
+
+def _complete(client, upload_id):
+    from django.urls import reverse
+
+    return client.post(reverse("documents:upload_complete", kwargs={"upload_id": upload_id}))
+
+
+@pytest.mark.django_db
+class TestChunkedUpload:
+    """Tests for the resumable chunked upload API."""
+
+    def test_offset_mismatch_is_rejected(self, uploads):
+        upload_id = _create(uploads, b"abcdefgh").json()["upload_id"]
+        assert _send(uploads, upload_id, 0, b"abcd").status_code == 200
+
+        # A part the server already has (e.g. resent after a lost response)
+        response = _send(uploads, upload_id, 0, b"abcd")
+        assert response.status_code == 409
+        assert response.json()["offset"] == 4
+
+    def test_oversize_part_is_rejected(self, uploads):
+        from django.core.files.storage import default_storage
+        from documents.models import UploadSession
+
+        upload_id = _create(uploads, b"abcdefgh").json()["upload_id"]
+        response = _send(uploads, upload_id, 0, b"abcdef")
+
+        assert response.status_code == 413
+        session = UploadSession.objects.get(pk=upload_id)
+        assert session.received_bytes == 0
+        with default_storage.open(session.part_path) as f:
+            assert f.read() == b""
+
+    def test_checksum_mismatch_drops_part(self, uploads):
+        from django.core.files.storage import default_storage
+        from documents.models import UploadSession
+
+        upload_id = _create(uploads, b"abcdefgh").json()["upload_id"]
+        response = _send(uploads, upload_id, 0, b"abcd", checksum=_sha256(b"abcx"))
+        assert response.status_code == 422
+        assert response.json()["offset"] == 0
+        session = UploadSession.objects.get(pk=upload_id)
+        with default_storage.open(session.part_path) as f:
+            assert f.read() == b""
+
+        assert _send(uploads, upload_id, 0, b"abcd", checksum="").status_code == 400
+
+    def test_resume_after_interruption(self, uploads):
+        from django.urls import reverse
+
+        content = b"0123456789"
+        upload_id = _create(uploads, content, checksum=_sha256(content)).json()["upload_id"]
+        assert _send(uploads, upload_id, 0, content[:4]).status_code == 200
+        # The connection dropped mid-part: a truncated second part never arrives intact
+        assert _send(uploads, upload_id, 4, content[4:6], checksum=_sha256(content[4:8])).status_code == 422
+
+        state = uploads.get(reverse("documents:upload_status", kwargs={"upload_id": upload_id})).json()
+        assert state["offset"] == 4
+        offset = state["offset"]
+        while offset < len(content):
+            response = _send(uploads, upload_id, offset, content[offset:offset + 4])
+            assert response.status_code == 200
+            offset = response.json()["offset"]
+
+        assert _complete(uploads, upload_id).status_code == 201
+
+    def test_complete_creates_document_once(self, uploads, user):
+        import os
+        from django.core.files.storage import default_storage
+        from documents.models import Document, UploadSession
+
+        content = "分割された本文".encode("utf-8")
+        upload_id = _create(uploads, content, checksum=_sha256(content)).json()["upload_id"]
+        part_path = UploadSession.objects.get(pk=upload_id).part_path
+        for offset in range(0, len(content), 4):
+            assert _send(uploads, upload_id, offset, content[offset:offset + 4]).status_code == 200
+        # Parts are staged in temporary files that do not outlive the request
+        assert os.listdir(default_storage.path("documents/uploads")) == [os.path.basename(part_path)]
+
+        response = _complete(uploads, upload_id)
+
+        assert response.status_code == 201
+        document = Document.objects.get(user=user)
+        assert response.json()["document_url"] == document.get_absolute_url()
+        assert document.title == "分割アップロード"
+        assert document.file_type == "txt"
+        with document.file.open("rb") as f:
+            assert f.read() == content
+        session = UploadSession.objects.get(pk=upload_id)
+        assert (session.status, session.document_id) == ("completed", document.pk)
+        assert not default_storage.exists(part_path)
+
+        # A retry after a lost response gets the same document
+        response = _complete(uploads, upload_id)
+        assert response.status_code == 200
+        assert response.json()["document_url"] == document.get_absolute_url()
+        assert Document.objects.count() == 1
+        assert _send(uploads, upload_id, len(content), b"x").status_code == 409
+
+    def test_failed_complete_keeps_partial_file(self, uploads, monkeypatch):
+        import os
+        from django.core.files.storage import default_storage
+        from documents.models import Document, UploadSession
+
+        upload_id = _create(uploads, b"abcd").json()["upload_id"]
+        assert _send(uploads, upload_id, 0, b"abcd").status_code == 200
+
+        def broken_save(self, *args, **kwargs):
+            raise RuntimeError("database went away")
+
+        monkeypatch.setattr(UploadSession, "save", broken_save)
+        uploads.raise_request_exception = False
+        assert _complete(uploads, upload_id).status_code == 500
+
+        assert not Document.objects.exists()
+        with default_storage.open(UploadSession.objects.get(pk=upload_id).part_path) as f:
+            assert f.read() == b"abcd"
+        files = default_storage.path("documents/files")
+        assert not os.path.isdir(files) or not os.listdir(files)
+
+    def test_complete_rejects_whole_file_checksum_mismatch(self, uploads):
+        from documents.models import Document
+
+        upload_id = _create(uploads, b"abcd", checksum=_sha256(b"abcx")).json()["upload_id"]
+        assert _send(uploads, upload_id, 0, b"abcd").status_code == 200
+
+        response = _complete(uploads, upload_id)
+        assert response.status_code == 422
+        assert response.json()["offset"] == 0
+        assert not Document.objects.exists()
+
+    def test_long_filename_fits_file_field(self, uploads):
+        from documents.models import Document
+
+        filename = "あ" * 200 + ".txt"
+        upload_id = _create(uploads, b"abcd", filename=filename).json()["upload_id"]
+        assert _send(uploads, upload_id, 0, b"abcd").status_code == 200
+
+        assert _complete(uploads, upload_id).status_code == 201
+        document = Document.objects.get()
+        assert len(document.file.name) <= Document._meta.get_field("file").max_length
+        assert document.file.name.endswith(".txt")
+
+    def test_expired_sessions_are_removed(self, uploads):
+        import os
+        import uuid
+        from django.core.files.storage import default_storage
+        from django.core.management import call_command
+        from django.urls import reverse
+        from django.utils import timezone
+        from documents.models import UploadSession
+
+        stale_id = _create(uploads, b"abcd").json()["upload_id"]
+        live_id = _create(uploads, b"abcd").json()["upload_id"]
+        UploadSession.objects.filter(pk=stale_id).update(expires_at=timezone.now())
+        stale = UploadSession.objects.get(pk=stale_id)
+        orphan = default_storage.path(f"documents/uploads/{uuid.uuid4()}.part")
+        open(orphan, "wb").close()
+        os.utime(orphan, (0, 0))
+
+        assert uploads.get(reverse("documents:upload_status", kwargs={"upload_id": stale_id})).status_code == 404
+        assert _send(uploads, stale_id, 0, b"abcd").status_code == 404
+
+        call_command("expire_uploads", stdout=open(os.devnull, "w"))
+
+        assert list(UploadSession.objects.values_list("pk", flat=True)) == [uuid.UUID(live_id)]
+        assert not default_storage.exists(stale.part_path)
+        assert not os.path.exists(orphan)
+        assert default_storage.exists(UploadSession.objects.get().part_path)
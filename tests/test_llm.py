@@ -56,3 +56,186 @@ class TestLLMProvider:
 
             assert "answer" in result
             assert "LLMが有効化されていない" in result["answer"]
+
+
+class TestMapReduceSummary:
+    """Tests for long document summarization."""
+
+    def _provider(self):
+        from core.llm import LLMProvider
+
+        provider = LLMProvider()
+        provider.is_available = MagicMock(return_value=True)
+        provider.chat_completion = MagicMock(side_effect=lambda messages, **kwargs: f"要約({len(messages[1]['content'])})")
+        return provider
+
+    def _long_text(self, paragraphs=40):
+        return "\n\n".join(f"段落{i}の内容です。" + "テキスト" * 100 for i in range(paragraphs))
+
+    def test_split_for_summary_respects_size(self):
+        from core.llm import split_for_summary
+
+        sections = split_for_summary(self._long_text(), 2000)
+        assert len(sections) > 1
+        assert all(len(s) <= 2000 + 10 for s in sections)
+
+    def test_split_for_summary_edit_is_local(self):
+        from core.llm import split_for_summary
+
+        text = self._long_text()
+        edited = text.replace("段落20の内容です。", "段落20の内容を編集しました。")
+        before = split_for_summary(text, 2000)
+        after = split_for_summary(edited, 2000)
+        assert len(before) == len(after)
+        assert sum(a != b for a, b in zip(before, after)) == 1
+
+    def test_short_text_single_call(self):
+        from django.core.cache.backends.locmem import LocMemCache
+
+        provider = self._provider()
+        with patch("core.llm.cache", LocMemCache("test-short", {})):
+            result = provider.summarize_long_text("短い文書です。")
+
+        assert result["llm_calls"] == 1
+        assert provider.chat_completion.call_count == 1
+
+    def test_long_text_map_reduce_and_cache(self):
+        from django.core.cache.backends.locmem import LocMemCache
+
+        provider = self._provider()
+        text = self._long_text()
+        with patch("core.llm.cache", LocMemCache("test-long", {})):
+            first = provider.summarize_long_text(text)
+            assert first["llm_calls"] > 2
+            assert first["summary"].startswith("要約")
+
+            # Unchanged text is served entirely from cache
+            assert provider.summarize_long_text(text)["llm_calls"] == 0
+
+            # A small edit only redoes its section and the reduce path above it
+            edited = text.replace("段落20の内容です。", "段落20の内容を編集しました。")
+            assert provider.summarize_long_text(edited)["llm_calls"] < first["llm_calls"]
+
+    def test_unavailable_falls_back(self):
+        from core.llm import LLMProvider
+
+        provider = LLMProvider()
+        provider.is_available = MagicMock(return_value=False)
+        result = provider.summarize_long_text("これは文書です。二文目です。")
+        assert result["llm_calls"] == 0
+        assert "これは文書です" in result["summary"]
+
+
+class TestLocalEmbeddings:
+    """Tests for the offline embedding backend."""
+
+    def test_deterministic_and_normalized(self):
+        import numpy as np
+        from core.embeddings import LocalEmbedder
+
+        embedder = LocalEmbedder(1536)
+        first = embedder.embed("来週のスケジュールを調整する")
+        second = embedder.embed("来週のスケジュールを調整する")
+        assert len(first) == 1536
+        assert first == second
+        assert abs(np.linalg.norm(first) - 1.0) < 1e-9
+
+    def test_similar_texts_are_closer(self):
+        import numpy as np
+        from core.embeddings import LocalEmbedder
+
+        embedder = LocalEmbedder(1536)
+        query = np.array(embedder.embed("スケジュール調整"))
+        related = np.array(embedder.embed("来週のスケジュールを調整する"))
+        unrelated = np.array(embedder.embed("健康のために30分散歩した"))
+        assert np.linalg.norm(query - related) < np.linalg.norm(query - unrelated)
+
+    def test_empty_text(self):
+        from core.embeddings import LocalEmbedder
+
+        assert LocalEmbedder(8).embed("   ") is None
+
+    def test_provider_uses_local_backend_when_llm_disabled(self):
+        from core.llm import LLMProvider
+
+        with patch("core.llm.settings") as mock_settings:
+            mock_settings.LLM_ENABLED = False
+            mock_settings.LLM_API_KEY = ""
+            mock_settings.LLM_BASE_URL = ""
+            mock_settings.LLM_MODEL = ""
+            mock_settings.EMBEDDING_MODEL = ""
+            mock_settings.EMBEDDING_BACKEND = "auto"
+            mock_settings.EMBEDDING_DIMENSIONS = 1536
+
+            provider = LLMProvider()
+            assert provider.embedding_backend == "local:v1"
+            assert provider.embeddings_available() is True
+            assert len(provider.generate_embedding("オフラインでも検索できる")) == 1536
+
+
+class TestFakeLLMServer:
+    """Tests for the local fake OpenAI-compatible server."""
+
+    @pytest.fixture
+    def server(self):
+        from core.fake_llm import FakeLLMConfig, start_fake_llm_server
+
+        server = start_fake_llm_server(config=FakeLLMConfig(
+            chat_latency_ms=0, embedding_latency_ms=0, token_latency_ms=0, embedding_dimensions=64,
+        ))
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    def _client(self, server):
+        from openai import OpenAI
+
+        return OpenAI(api_key="fake", base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", max_retries=0)
+
+    def test_chat_completion_is_deterministic_json(self, server):
+        import json
+
+        client = self._client(server)
+        messages = [{"role": "system", "content": "JSON形式で出力"}, {"role": "user", "content": "今日のログ"}]
+        first = client.chat.completions.create(model="m", messages=messages)
+        second = client.chat.completions.create(model="m", messages=messages)
+        assert first.choices[0].message.content == second.choices[0].message.content
+        assert "summary" in json.loads(first.choices[0].message.content)
+        assert first.usage.total_tokens > 0
+
+    def test_streaming_matches_non_streaming(self, server):
+        client = self._client(server)
+        messages = [{"role": "user", "content": "こんにちは"}]
+        full = client.chat.completions.create(model="m", messages=messages).choices[0].message.content
+        stream = client.chat.completions.create(model="m", messages=messages, stream=True)
+        assert "".join(chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices) == full
+
+    def test_embeddings(self, server):
+        response = self._client(server).embeddings.create(model="e", input=["a", "b"])
+        assert [len(item.embedding) for item in response.data] == [64, 64]
+
+    def test_rate_limit(self, server):
+        import openai
+
+        server.config.rate_limit_rate = 1.0
+        with pytest.raises(openai.RateLimitError):
+            self._client(server).embeddings.create(model="e", input="a")
+        assert server.stats.as_dict()["rate_limited"] == 1
+
+    def test_provider_reports_metrics_by_operation(self, server):
+        from prometheus_client import REGISTRY
+        from core.llm import LLMProvider
+
+        provider = LLMProvider()
+        provider.enabled = True
+        provider.api_key = "fake"
+        provider.base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+        def sample(name):
+            return REGISTRY.get_sample_value(name, {"operation": "generate_digest"}) or 0
+
+        calls, tokens = sample("memoscribe_llm_request_duration_seconds_count"), sample("memoscribe_llm_tokens_total")
+        digest = provider.generate_digest("今日は会議があった。")
+        assert digest["summary"]
+        assert sample("memoscribe_llm_request_duration_seconds_count") == calls + 1
+        assert sample("memoscribe_llm_tokens_total") > tokens
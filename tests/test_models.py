@@ -101,3 +101,326 @@ class TestPreferenceModel:
         )
         assert pref.pk is not None
         assert "文章スタイル" in str(pref)
+
+
+@pytest.mark.django_db
+class TestLLMUsageRollup:
+    """Tests for the daily LLM usage rollup."""
+
+    def test_rollup_follows_audit_events(self, user):
+        from django.utils import timezone
+        from audits.models import AuditLog
+        from audits.usage import aggregate_llm_usage, get_llm_usage
+
+        AuditLog.objects.create(user=user, event_type="llm_call", payload={"tokens": 100})
+        AuditLog.objects.create(user=user, event_type="llm_call", payload={"tokens": 50, "llm_calls": 3})
+        AuditLog.objects.create(user=user, event_type="login", payload={})
+
+        today = timezone.localdate()
+        assert get_llm_usage(user, today) == (4, 150)
+        totals = aggregate_llm_usage(AuditLog.objects.filter(user=user, created_at__date=today))
+        assert (totals["calls"], totals["tokens"]) == (4, 150)
+
+    def test_batched_audit_write_updates_rollup(self, user):
+        import json
+        from django.utils import timezone
+        from audits.models import AuditLog
+        from audits.usage import get_llm_usage
+        from audits.writer import _write_batch
+
+        created_at = timezone.now() - timezone.timedelta(minutes=5)
+        events = [
+            json.dumps({
+                "user_id": user.pk,
+                "event_type": "llm_call",
+                "payload": {"tokens": 10},
+                "created_at": created_at.isoformat(),
+            })
+            for _ in range(3)
+        ]
+        assert _write_batch(events) == (3, [])
+        assert AuditLog.objects.filter(user=user, created_at=created_at).count() == 3
+        assert get_llm_usage(user, timezone.localdate(created_at)) == (3, 30)
+
+    def test_replayed_batch_is_not_written_twice(self, user):
+        import json
+        import uuid
+        from django.utils import timezone
+        from audits.models import AuditLog
+        from audits.usage import get_llm_usage
+        from audits.writer import _write_batch
+
+        created_at = timezone.now() - timezone.timedelta(minutes=5)
+        events = [
+            json.dumps({
+                "event_id": str(uuid.uuid4()),
+                "user_id": user.pk,
+                "event_type": "llm_call",
+                "payload": {"tokens": 10},
+                "created_at": created_at.isoformat(),
+            })
+            for _ in range(2)
+        ]
+        assert _write_batch(events) == (2, [])
+        # A flush crashed after commit: the whole batch is replayed
+        assert _write_batch(events) == (0, [])
+        assert AuditLog.objects.filter(user=user).count() == 2
+        assert get_llm_usage(user, timezone.localdate(created_at)) == (2, 20)
+
+    def test_days_without_rollup_rows(self, user, settings, django_assert_num_queries):
+        import datetime
+        from django.core.cache import cache
+        from django.utils import timezone
+        from audits.models import AuditLog, LLMUsageDaily
+        from audits.usage import get_llm_usage, rollup_start_date
+
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        cache.clear()
+        started = rollup_start_date()
+        before = started - datetime.timedelta(days=1)
+        AuditLog.objects.create(
+            user=user,
+            event_type="llm_call",
+            payload={"tokens": 40},
+            created_at=timezone.make_aware(datetime.datetime.combine(before, datetime.time(23, 30))),
+        )
+        # An event from before the rollup existed, never rolled up
+        LLMUsageDaily.objects.filter(user=user).delete()
+
+        assert get_llm_usage(user, before) == (1, 40)
+        with django_assert_num_queries(1):
+            assert get_llm_usage(user, before) == (1, 40)
+        # Since the rollup exists, a missing row means no calls: one lookup, no audit log scan
+        with django_assert_num_queries(1):
+            assert get_llm_usage(user, started) == (0, 0)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_unwritable_audit_events_are_dead_lettered(user):
+    import json
+    import uuid
+    from django.contrib.auth.models import User
+    from django.utils import timezone
+    from audits.models import AuditLog
+    from audits.writer import _write_batch
+
+    gone = User.objects.create_user(username="gone", password="testpass123")
+
+    def event(user_id):
+        return json.dumps({
+            "event_id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "event_type": "login",
+            "payload": {},
+            "created_at": timezone.now().isoformat(),
+        })
+
+    deleted_user = event(gone.pk)
+    gone.delete()
+    missing_user = json.dumps({"event_type": "login", "payload": {}, "created_at": timezone.now().isoformat()})
+    events = [event(user.pk), deleted_user, missing_user, "not json"]
+
+    written, dead = _write_batch(events)
+    assert written == 1
+    assert sorted(dead) == sorted([deleted_user, missing_user, "not json"])
+    assert AuditLog.objects.filter(user=user).count() == 1
+
+
+@pytest.mark.django_db
+class TestDashboardCache:
+    """Tests for the cached dashboard fragments."""
+
+    def test_warm_load_skips_database_until_invalidated(
+        self, user, settings, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        from core.dashboard import get_fragments
+        from notes.models import Note
+
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        assert get_fragments(user)["notes"] == []
+        with django_assert_num_queries(0):
+            get_fragments(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            note = Note.objects.create(user=user, title="新しいメモ", body="")
+        fragments = get_fragments(user)
+        assert fragments["notes"] == [note]
+        assert fragments["onboarding"]["has_note"] is True
+
+
+@pytest.mark.django_db
+class TestUserSnapshot:
+    """Tests for the cached settings and preferences behind retrieval."""
+
+    def test_warm_retrieval_setup_skips_database(
+        self, user, settings, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        from preferences.models import Preference, UserSettings
+        from retrieval.services import RetrievalService
+
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        settings.SEND_DOCS = False
+        assert RetrievalService(user).settings["send_docs"] is False
+        with django_assert_num_queries(0):
+            service = RetrievalService(user)
+            assert service.get_user_preferences() == []
+
+        with django_capture_on_commit_callbacks(execute=True):
+            UserSettings.objects.create(user=user, send_docs=True)
+            Preference.objects.create(user=user, key="口調", value="丁寧に")
+        service = RetrievalService(user)
+        assert service.settings["send_docs"] is True
+        assert service.get_user_preferences() == [{"key": "口調", "value": "丁寧に"}]
+
+
+@pytest.mark.django_db
+class TestSnippetBackfill:
+    """Tests for embeddings whose stored snippets predate the current masking rules."""
+
+    def _embeddings(self, user, monkeypatch, count=4):
+        from core.llm import llm_provider
+        from retrieval.models import Embedding
+
+        monkeypatch.setattr(llm_provider, "embedding_backend_setting", "local")
+        for i in range(count):
+            text = f"メモ{i} 連絡先 user{i}@example.com"
+            Embedding.objects.create(
+                user=user, content_type="note", content_id=i, content_text=text, content_title=f"メモ{i}",
+                vector=llm_provider.generate_embedding(text), vector_backend=llm_provider.embedding_backend,
+                snippet="古い", masked_snippet="古い", masking_version=0,
+            )
+
+    def test_stale_rows_fetch_text_in_one_query(self, user, settings, monkeypatch, django_assert_num_queries):
+        from retrieval.services import RetrievalService
+
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        self._embeddings(user, monkeypatch)
+        service = RetrievalService(user)
+
+        with django_assert_num_queries(2):  # The vector search and the stale rows' text
+            items = service.retrieve("連絡先", top_k=4)
+        assert len(items) == 4
+        assert all(item["content"].endswith("連絡先 [EMAIL]") for item in items)
+
+    def test_background_refresh(self, user, settings, monkeypatch):
+        from core.utils import PII_MASKING_VERSION
+        from retrieval import tasks
+        from retrieval.models import Embedding
+
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        self._embeddings(user, monkeypatch, count=3)
+        queued = []
+        monkeypatch.setattr(tasks.refresh_snippets, "delay", lambda *args: queued.append(args))
+
+        assert tasks.start_snippet_refresh() is True
+        assert tasks.start_snippet_refresh() is False  # Already queued
+        assert queued.pop() == ()
+        tasks.refresh_snippets(0, 2)
+        while queued:  # Each batch queues the next one
+            tasks.refresh_snippets(*queued.pop())
+
+        assert set(Embedding.objects.values_list("masking_version", flat=True)) == {PII_MASKING_VERSION}
+        assert Embedding.objects.get(content_id=0).masked_snippet == "メモ0 連絡先 [EMAIL]"
+        assert tasks.start_snippet_refresh() is True  # Finished, so a new backfill may start
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Tests for cursor pagination of list views."""
+
+    def test_pages_follow_ordering_with_nulls(self, user):
+        from django.utils import timezone
+        from core.pagination import paginate
+        from tasks.models import Task
+
+        now = timezone.now()
+        for i in range(7):
+            Task.objects.create(
+                user=user,
+                title=f"Task {i}",
+                priority=i % 2 + 1,
+                due_at=None if i % 3 == 0 else now + timezone.timedelta(days=i),
+            )
+
+        tasks = Task.objects.filter(user=user)
+        seen, cursor = [], ""
+        while True:
+            page = paginate(tasks, cursor, per_page=3)
+            seen.extend(task.pk for task in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        expected = sorted(
+            tasks,
+            key=lambda t: (-t.priority, t.due_at is None, t.due_at or now, -t.created_at.timestamp(), -t.pk),
+        )
+        assert seen == [task.pk for task in expected]
+
+    def test_leading_column_bounds_the_scan(self, user):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from core.pagination import paginate
+        from notes.models import Note
+
+        for i in range(3):
+            Note.objects.create(user=user, title=f"Note {i}", body="")
+        notes = Note.objects.filter(user=user)
+        cursor = paginate(notes, per_page=1).next_cursor
+
+        with CaptureQueriesContext(connection) as queries:
+            page = paginate(notes, cursor, per_page=1)
+        assert len(page) == 1
+        # A range on updated_at, not only the OR tree, so the index scan starts at the cursor
+        assert '"notes_note"."updated_at" <=' in queries[0]["sql"]
+
+    @pytest.mark.parametrize("ordering", ["due_at", "-due_at"])
+    def test_nullable_leading_column(self, user, ordering):
+        from django.utils import timezone
+        from core.pagination import paginate
+        from tasks.models import Task
+
+        now = timezone.now()
+        for i in range(8):
+            Task.objects.create(user=user, title=f"Task {i}", due_at=None if i % 3 == 0 else now + timezone.timedelta(days=i % 4))
+
+        tasks = Task.objects.filter(user=user).order_by(ordering)
+        seen, cursor = [], ""
+        while True:
+            page = paginate(tasks, cursor, per_page=2)
+            seen.extend(task.pk for task in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        # NULLs sort last ascending and first descending
+        if ordering.startswith("-"):
+            key = lambda t: (t.due_at is not None, -(t.due_at or now).timestamp(), -t.pk)  # noqa: E731
+        else:
+            key = lambda t: (t.due_at is None, (t.due_at or now).timestamp(), t.pk)  # noqa: E731
+        expected = sorted(Task.objects.filter(user=user), key=key)
+        assert seen == [task.pk for task in expected]
+
+
+@pytest.mark.django_db
+class TestTagCounts:
+    """Tests for the maintained tag facet counts."""
+
+    def test_counts_follow_saves_and_deletes(self, user):
+        from core.tags import get_tag_counts, rebuild_tag_counts
+        from notes.models import Note
+
+        first = Note.objects.create(user=user, title="A", body="", tags=["仕事", "計画"])
+        Note.objects.create(user=user, title="B", body="", tags=["仕事"])
+        assert get_tag_counts(user, "note") == [{"tag": "仕事", "count": 2}, {"tag": "計画", "count": 1}]
+
+        first = Note.objects.get(pk=first.pk)
+        first.tags = ["読書"]
+        first.save()
+        assert get_tag_counts(user, "note") == [{"tag": "仕事", "count": 1}, {"tag": "読書", "count": 1}]
+
+        first.delete()
+        expected = [{"tag": "仕事", "count": 1}]
+        assert get_tag_counts(user, "note") == expected
+        rebuild_tag_counts("note", user_id=user.pk)
+        assert get_tag_counts(user, "note") == expected
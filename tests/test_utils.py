@@ -1,7 +1,7 @@
 """Tests for core utilities."""
 
 import pytest
-from core.utils import mask_pii, truncate_text, extract_keywords, simple_summary, calculate_token_estimate
+from core.utils import build_snippets, mask_pii, mask_pii_batch, truncate_text, extract_keywords, simple_summary, calculate_token_estimate
 
 
 class TestMaskPII:
@@ -36,11 +36,69 @@ class TestMaskPII:
         result = mask_pii(text)
         assert "[ID_NUMBER]" in result
 
+    def test_mask_phone_international(self):
+        result = mask_pii("Call +81-90-1234-5678 tomorrow")
+        assert result == "Call [PHONE] tomorrow"
+
+    def test_mask_my_number(self):
+        result = mask_pii("マイナンバー 1234-5678-9012")
+        assert "[MY_NUMBER]" in result
+
+    @pytest.mark.parametrize("text, expected", [
+        # A card number starting with 0 is a card, not a phone number plus digits
+        ("カード 0123-4567-8901-2345", "カード [CREDIT_CARD]"),
+        ("カード 0123456789012345", "カード [CREDIT_CARD]"),
+        # A full international number wins over the domestic pattern inside it
+        ("+0312345678", "[PHONE]"),
+        ("+81 3 1234 56789", "[PHONE]"),
+        ("電話+81-3-1234-5678です", "電話[PHONE]です"),
+        ("1234-5678-9012", "[MY_NUMBER]"),
+        ("123-45678", "123-45678"),
+        ("a0@b.com 0312345678", "[EMAIL] [PHONE]"),
+    ])
+    def test_overlapping_patterns(self, text, expected):
+        assert mask_pii(text) == expected
+
+    def test_no_digits_left_next_to_masks(self):
+        text = "カード 0123-4567-8901-2345、電話 +81 3 1234 56789、〒 123-4567"
+        masked = mask_pii(text)
+        assert masked == "カード [CREDIT_CARD]、電話 [PHONE]、〒 [POSTAL]"
+        assert not any(c.isdigit() for c in masked)
+
+    def test_multiple_kinds_in_one_text(self):
+        text = "mail: a.b@example.co.jp tel: 03-1234-5678 〒 123-4567"
+        assert mask_pii(text) == "mail: [EMAIL] tel: [PHONE] 〒 [POSTAL]"
+
+    def test_text_without_pii_unchanged(self):
+        text = "今日は良い天気でした。"
+        assert mask_pii(text) == text
+
+    def test_batch(self):
+        texts = ["test@example.com", "", "普通の文章", "090-1234-5678"]
+        assert mask_pii_batch(texts) == ["[EMAIL]", "", "普通の文章", "[PHONE]"]
+
     def test_empty_text(self):
         assert mask_pii("") == ""
         assert mask_pii(None) is None
 
 
+class TestBuildSnippets:
+    """Tests for stored context snippets."""
+
+    def test_masked_and_raw(self):
+        snippet, masked = build_snippets("連絡先は test@example.com です")
+        assert "test@example.com" in snippet
+        assert masked == "連絡先は [EMAIL] です"
+
+    def test_truncated(self):
+        snippet, masked = build_snippets("あ" * 1000, max_length=500)
+        assert len(snippet) == 500
+        assert len(masked) == 500
+
+    def test_empty_text(self):
+        assert build_snippets("") == ("", "")
+
+
 class TestTruncateText:
     """Tests for text truncation."""
 
@@ -75,6 +133,48 @@ class TestExtractKeywords:
         keywords = extract_keywords(text, max_keywords=3)
         assert len(keywords) <= 3
 
+    def test_japanese_extraction(self):
+        from core.tokenizers import BigramTokenizer
+
+        text = "今日は会議があった。会議の資料をプロジェクトの共有フォルダに置いた。プロジェクトは順調。"
+        keywords = extract_keywords(text, max_keywords=2, tokenizer=BigramTokenizer())
+        assert keywords == ["会議", "プロジェクト"]
+
+
+class TestBigramTokenizer:
+    """Tests for the pure-Python tokenizer."""
+
+    def test_script_boundaries(self):
+        from core.tokenizers import BigramTokenizer
+
+        tokens = BigramTokenizer().tokenize("明日はスケジュールを確認する")
+        assert tokens == ["明日", "スケジュール", "確認"]
+
+    def test_long_kanji_compound_bigrams(self):
+        from core.tokenizers import BigramTokenizer
+
+        tokens = BigramTokenizer(max_kanji_word=4).tokenize("東京都庁舎")
+        assert tokens == ["東京", "京都", "都庁", "庁舎"]
+
+    def test_full_width_normalized(self):
+        from core.tokenizers import BigramTokenizer
+
+        assert BigramTokenizer().tokenize("ＰｙｔｈｏｎとDjango") == ["python", "django"]
+
+    def test_count_matches_tokens(self):
+        from collections import Counter
+        from core.tokenizers import BigramTokenizer
+
+        tokenizer = BigramTokenizer(max_kanji_word=4)
+        text = "東京都庁舎の会議。東京都庁舎でAPI連携のレビュー、東京で会議。"
+        assert tokenizer.count(text) == Counter(tokenizer.tokenize(text))
+
+    def test_base_tokenizer_is_abstract(self):
+        from core.tokenizers import BaseTokenizer
+
+        with pytest.raises(TypeError):
+            BaseTokenizer()
+
 
 class TestSimpleSummary:
     """Tests for simple summary."""
@@ -99,3 +199,270 @@ class TestTokenEstimate:
 
     def test_empty_text(self):
         assert calculate_token_estimate("") == 0
+
+
+class TestPerformanceMiddleware:
+    """Tests for per-request performance instrumentation."""
+
+    def _middleware(self, settings, view):
+        from core.middleware import PerformanceMiddleware
+
+        settings.PERF_SAMPLE_RATE = 1.0
+        settings.PERF_SERVER_TIMING = True
+        return PerformanceMiddleware(view)
+
+    def test_server_timing_includes_llm_and_cache(self, settings, rf):
+        from django.http import HttpResponse
+        from core import perf
+
+        def view(request):
+            perf.record_llm_call(0.25, tokens=120)
+            perf.record_cache(hits=2, misses=1, duration=0.001)
+            return HttpResponse("ok")
+
+        response = self._middleware(settings, view)(rf.get("/"))
+        header = response["Server-Timing"]
+        assert 'llm;dur=250.0;desc="1 calls"' in header
+        assert "2 hits, 1 misses" in header
+        assert "total;dur=" in header
+
+    def test_not_sampled(self, settings, rf):
+        from django.http import HttpResponse
+
+        middleware = self._middleware(settings, lambda request: HttpResponse("ok"))
+        middleware.sample_rate = 0
+        assert "Server-Timing" not in middleware(rf.get("/"))
+
+    def test_record_outside_request_is_noop(self):
+        from core import perf
+
+        assert perf.current_metrics() is None
+        perf.record_llm_call(1.0, tokens=10)
+
+    def test_duplicate_queries(self):
+        from core.perf import RequestMetrics
+
+        metrics = RequestMetrics(db_queries=4)
+        metrics.sql_counts.update(["SELECT a WHERE id = %s"] * 3 + ["SELECT b"])
+        assert metrics.duplicate_queries == 2
+        assert metrics.top_repeated_sql() == [{"sql": "SELECT a WHERE id = %s", "count": 3}]
+
+
+class TestMetricsView:
+    """Tests for access to the Prometheus endpoint."""
+
+    def test_denied_without_token(self, settings, rf):
+        from core.views import metrics_view
+
+        settings.DEBUG = False
+        settings.METRICS_AUTH_TOKEN = ""
+        assert metrics_view(rf.get("/metrics")).status_code == 403
+
+    def test_wrong_token(self, settings, rf):
+        from core.views import metrics_view
+
+        settings.METRICS_AUTH_TOKEN = "secret"
+        assert metrics_view(rf.get("/metrics", headers={"Authorization": "Bearer other"})).status_code == 401
+
+    @pytest.mark.django_db
+    def test_served_with_token(self, settings, rf):
+        from core.views import metrics_view
+
+        settings.METRICS_AUTH_TOKEN = "secret"
+        response = metrics_view(rf.get("/metrics", headers={"Authorization": "Bearer secret"}))
+        assert response.status_code == 200
+
+    @pytest.mark.django_db
+    def test_backlog_counted_once_per_ttl(self, settings, django_assert_num_queries):
+        from django.contrib.auth.models import User
+        from django.core.cache import cache
+        from core.metrics import BacklogCollector
+        from retrieval.models import Embedding
+
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        cache.clear()
+        user = User.objects.create_user(username="metrics", password="x")
+        Embedding.objects.create(user=user, content_type="note", content_id=1, content_text="メモ")
+
+        def gauges():
+            return {m.name: m.samples for m in BacklogCollector().collect() if "queue" not in m.name}
+
+        with django_assert_num_queries(2):
+            first = gauges()
+        with django_assert_num_queries(0):
+            assert gauges() == first
+        assert [s.value for s in first["memoscribe_embedding_backlog"]] == [1]
+
+
+class TestTracing:
+    """Tests for span nesting, propagation and export."""
+
+    @pytest.fixture
+    def spans(self, settings, tmp_path):
+        import json
+        from core import tracing
+
+        settings.TRACING_EXPORTER = "file"
+        settings.TRACING_FILE = str(tmp_path / "traces.jsonl")
+        settings.TRACING_SAMPLE_RATE = 1.0
+        tracing._exporter = None
+
+        def read():
+            with open(settings.TRACING_FILE, encoding="utf-8") as f:
+                return [json.loads(line) for line in f]
+
+        yield read
+        tracing._exporter = None
+
+    def test_nested_spans_share_trace(self, spans):
+        from core import tracing
+
+        with tracing.span("parent"):
+            with tracing.span("child", stage="extracted"):
+                pass
+        child, parent = spans()
+        assert child["trace_id"] == parent["trace_id"]
+        assert child["parent_id"] == parent["span_id"]
+        assert child["attributes"] == {"stage": "extracted"}
+
+    def test_error_recorded(self, spans):
+        from core import tracing
+
+        with pytest.raises(ValueError):
+            with tracing.span("failing"):
+                raise ValueError("boom")
+        assert spans()[0]["error"] == "ValueError: boom"
+
+    def test_propagate_to_thread(self, spans):
+        from concurrent.futures import ThreadPoolExecutor
+        from core import tracing
+
+        def work():
+            with tracing.span("in_thread"):
+                pass
+
+        with tracing.span("parent"):
+            with ThreadPoolExecutor(1) as pool:
+                pool.submit(tracing.propagate(work)).result()
+        in_thread, parent = spans()
+        assert in_thread["parent_id"] == parent["span_id"]
+
+    def test_middleware_continues_incoming_trace(self, spans, rf):
+        from django.http import HttpResponse
+        from core.middleware import TracingMiddleware
+
+        traceparent = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+        response = TracingMiddleware(lambda request: HttpResponse("ok"))(rf.get("/", HTTP_TRACEPARENT=traceparent))
+        span = spans()[0]
+        assert span["trace_id"] == "a" * 32
+        assert span["parent_id"] == "b" * 16
+        assert span["attributes"]["http.status_code"] == 200
+        assert response["traceresponse"].startswith("00-" + "a" * 32)
+
+    def test_disabled_is_noop(self, settings):
+        from core import tracing
+
+        settings.TRACING_EXPORTER = ""
+        with tracing.span("ignored") as span:
+            span.set_attribute("key", "value")
+        assert tracing.current_span() is None
+
+    def test_parse_traceparent(self):
+        from core.tracing import parse_traceparent
+
+        assert parse_traceparent("00-" + "1" * 32 + "-" + "2" * 16 + "-00") == ("1" * 32, "2" * 16, False)
+        assert parse_traceparent("garbage") is None
+
+
+class TestAuditPartitions:
+    """Tests for audit log partition naming and month arithmetic."""
+
+    def test_months_and_names(self):
+        import datetime
+        from audits.partitions import add_months, partition_month, partition_name
+
+        assert add_months(datetime.date(2026, 11, 1), 2) == datetime.date(2027, 1, 1)
+        assert add_months(datetime.date(2026, 1, 1), -13) == datetime.date(2024, 12, 1)
+        assert partition_name(datetime.date(2026, 3, 1)) == "audits_auditlog_p202603"
+        assert partition_month("audits_auditlog_p202603") == datetime.date(2026, 3, 1)
+        assert partition_month("audits_auditlog_default") is None
+
+    def test_bounds_follow_local_months(self, settings):
+        import datetime
+        from audits.partitions import _bound
+
+        settings.TIME_ZONE = "Asia/Tokyo"
+        assert _bound(datetime.date(2026, 10, 1)) == "2026-10-01T00:00:00+09:00"
+
+    @pytest.mark.django_db
+    def test_create_partition_moves_rows_out_of_default(self):
+        import datetime
+        from django.contrib.auth.models import User
+        from django.db import connection
+        from django.utils import timezone
+        from audits import partitions
+        from audits.models import AuditLog
+
+        user = User.objects.create_user(username="auditor", password="testpass123")
+        month = partitions.add_months(partitions.month_start(timezone.localdate()), 24)
+        created_at = timezone.make_aware(datetime.datetime.combine(month, datetime.time(12)))
+        log = AuditLog.objects.create(user=user, event_type="login", created_at=created_at)
+        assert partitions.default_partition_rows() == 1
+
+        assert partitions.create_partition(month) is True
+
+        assert partitions.default_partition_rows() == 0
+        assert partitions.partition_name(month) in partitions.attached_partitions()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT event_id FROM {partitions.partition_name(month)}")
+            assert cursor.fetchall() == [(log.event_id,)]
+        assert partitions.create_partition(month) is False
+
+
+class TestIndexAdvisor:
+    """Tests for reading index candidates from normalized statements."""
+
+    SQL = (
+        'SELECT "tasks_task"."id" FROM "tasks_task" WHERE ("tasks_task"."status" IN ($1, $2) '
+        'AND "tasks_task"."user_id" = $3 AND "tasks_task"."due_at" < $4 AND "tasks_task"."tags" @> $5) '
+        'ORDER BY "tasks_task"."due_at" ASC, "tasks_task"."priority" DESC LIMIT $6'
+    )
+
+    def test_statement_indexes(self):
+        from core.index_advisor import statement_indexes
+
+        assert sorted(statement_indexes(self.SQL)) == [
+            ("tasks_task", ["status", "user_id", "due_at", "priority"], 2, "btree"),
+            ("tasks_task", ["tags"], 0, "gin"),
+        ]
+
+    def test_is_covered(self):
+        from core.index_advisor import is_covered
+
+        columns = ["status", "user_id", "due_at", "priority"]
+        assert is_covered(columns, 2, "btree", [(["user_id", "status", "due_at", "priority", "id"], "btree")])
+        assert not is_covered(columns, 2, "btree", [(["user_id", "due_at", "priority"], "btree")])
+        assert not is_covered(["tags"], 0, "gin", [(["tags"], "btree")])
+        assert is_covered(["tags"], 0, "gin", [(["tags"], "gin")])
+
+
+class TestNoteRendering:
+    """Tests for cached markdown rendering of notes."""
+
+    def test_sanitized_and_cached_per_version(self, settings):
+        import datetime
+        from types import SimpleNamespace
+        from notes.rendering import render_note
+
+        settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        updated_at = datetime.datetime(2026, 10, 1, tzinfo=datetime.timezone.utc)
+        note = SimpleNamespace(pk=1, body="**太字**<script>x</script>", updated_at=updated_at)
+        html = render_note(note)
+        assert "<strong>太字</strong>" in html
+        assert "<script>" not in html
+
+        # Same version is served from the cache; an edit changes updated_at and the key
+        note.body = "changed"
+        assert render_note(note) == html
+        note.updated_at = updated_at + datetime.timedelta(seconds=1)
+        assert render_note(note) == "<p>changed</p>"